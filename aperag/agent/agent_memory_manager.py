@@ -64,17 +64,14 @@ class AgentMemoryManager:
         memory = SimpleMemory()
 
         try:
-            # Get recent messages from history
-            messages = await history.messages
+            # Apply context limit - read only the most recent conversation turns
+            # Each turn = user message + AI response, so we take last (context_limit * 2) messages
+            recent_messages = await history.recent_messages(limit=context_limit * 2)
 
-            if not messages:
+            if not recent_messages:
                 logger.debug("No history found, returning empty memory")
                 return memory
 
-            # Apply context limit - take the most recent conversation turns
-            # Each turn = user message + AI response, so we take last (context_limit * 2) messages
-            recent_messages = messages[-(context_limit * 2) :] if len(messages) > context_limit * 2 else messages
-
             logger.debug(f"Retrieved {len(recent_messages)} recent messages from history")
 
             # Convert StoredChatMessage objects to OpenAI format
@@ -114,15 +111,12 @@ class AgentMemoryManager:
             str: Formatted context summary string
         """
         try:
-            # Get recent messages from history
-            messages = await history.messages
+            # Get recent messages from history (limit to recent messages)
+            recent_messages = await history.recent_messages(limit=limit)
 
-            if not messages:
+            if not recent_messages:
                 return ""
 
-            # Convert to context format (limit to recent messages)
-            recent_messages = messages[-limit:] if len(messages) > limit else messages
-
             context_lines = []
             for message in recent_messages:
                 # Get role from first part (StoredChatMessage uses parts structure)
@@ -38,6 +38,7 @@ from aperag.agent.agent_session_manager_lifecycle import agent_session_manager_l
 from aperag.exception_handlers import register_exception_handlers
 from aperag.llm.litellm_track import register_custom_llm_track
 from aperag.mcp import mcp_server
+from aperag.service.audit_service import audit_service
 from aperag.views.api_key import router as api_key_router
 from aperag.views.audit import router as audit_router
 from aperag.views.auth import router as auth_router
@@ -66,11 +67,20 @@ async def combined_lifespan(app: FastAPI):
     # Initialize the global proxy listener at startup
     await agent_event_listener.initialize()
 
-    # Start MCP server first
-    async with mcp_app.lifespan(app):
-        # Then start Agent session manager
-        async with agent_session_manager_lifespan(app):
-            yield
+    # Start the background audit writer, queued entries are written out on shutdown
+    audit_service.start()
+    try:
+        # Start MCP server first
+        async with mcp_app.lifespan(app):
+            # Then start Agent session manager
+            async with agent_session_manager_lifespan(app):
+                yield
+    finally:
+        await audit_service.shutdown()
+
+        from aperag.graph.lightrag_manager import lightrag_pool
+
+        await lightrag_pool.close()
 
 
 # Create the main FastAPI app with combined lifespan
@@ -41,6 +41,7 @@ Quick Start:
         await critical_work()
 """
 
+from .asyncio_lock import AsyncioLock  # noqa: F401  # Available for testing and advanced usage
 from .manager import (
     LockManager,  # noqa: F401  # Available for testing and advanced usage
     create_lock,  # Create new locks
@@ -49,7 +50,11 @@ from .manager import (
     get_or_create_lock,  # Get existing or create new (recommended)
 )
 from .protocols import LockProtocol  # noqa: F401  # Available for testing and advanced usage
-from .redis_lock import RedisLock  # noqa: F401  # Available for testing and advanced usage
+from .redis_lock import (  # noqa: F401  # Available for testing and advanced usage
+    RedisLock,
+    RedisLockGroup,
+    redis_lock_with_renewal,
+)
 from .threading_lock import ThreadingLock  # noqa: F401  # Available for testing and advanced usage
 from .utils import lock_context  # ⭐ Timeout support for locks
 
@@ -63,7 +68,7 @@ __all__ = [
     "get_default_lock_manager",  # Advanced lock management
 ]
 
-# Note: ThreadingLock, RedisLock, LockProtocol, LockManager are available
+# Note: ThreadingLock, RedisLock, RedisLockGroup, LockProtocol, LockManager are available
 # for testing and advanced usage but not in __all__ to keep public API simple
 
 __version__ = "1.0.0"
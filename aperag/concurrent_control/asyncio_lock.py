@@ -0,0 +1,107 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Asyncio-based lock implementation.
+
+This module contains the AsyncioLock implementation that wraps asyncio.Lock
+for code that runs entirely on one event loop.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Optional
+
+from .protocols import LockProtocol
+from .utils import LockAcquisitionError
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncioLock(LockProtocol):
+    """
+    Asyncio-native lock implementation.
+
+    Waiters are suspended on the event loop and woken in FIFO order on release,
+    instead of polling like ThreadingLock does.
+
+    Features:
+    - Works in single-process multi-coroutine environments on one event loop
+    - Does NOT work across threads or event loops (celery --pool=threads, asyncio.run per task)
+    - Does NOT work across multiple processes (celery --pool=prefork)
+
+    Performance:
+    - Lowest overhead of all lock types, no polling and no thread pool usage
+    """
+
+    def __init__(self, name: str = None):
+        """
+        Initialize the asyncio lock.
+
+        Args:
+            name: Descriptive name for the lock (used in logging).
+                 If None, a UUID will be generated.
+        """
+        self._lock = asyncio.Lock()
+        self._name = name or f"asyncio_lock_{uuid.uuid4().hex[:8]}"
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Acquire the lock, waiting on the event loop.
+
+        Args:
+            timeout: Maximum time to wait for the lock (seconds).
+                    None means wait indefinitely.
+
+        Returns:
+            True if lock was acquired, False if timeout occurred.
+        """
+        if timeout is None:
+            await self._lock.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout)
+            except asyncio.TimeoutError:
+                logger.debug(f"Lock '{self._name}' acquisition timed out after {timeout:.3f}s")
+                return False
+        logger.debug(f"Lock '{self._name}' acquired")
+        return True
+
+    async def release(self) -> None:
+        """Release the lock."""
+        try:
+            self._lock.release()
+            logger.debug(f"Lock '{self._name}' released")
+        except RuntimeError as e:
+            logger.error(f"Error releasing lock '{self._name}': {e}")
+
+    def is_locked(self) -> bool:
+        """Check if the lock is currently held."""
+        return self._lock.locked()
+
+    def get_name(self) -> str:
+        """Get the name/identifier of the lock."""
+        return self._name
+
+    async def __aenter__(self) -> "AsyncioLock":
+        """Async context manager entry."""
+        success = await self.acquire()
+        if not success:
+            raise LockAcquisitionError(f"Failed to acquire lock '{self._name}'")
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Async context manager exit."""
+        await self.release()
@@ -20,8 +20,11 @@ and managing lock instances across the application.
 """
 
 import threading
-from typing import Dict, Optional
+import weakref
+import zlib
+from typing import Dict, List, Optional
 
+from .asyncio_lock import AsyncioLock
 from .protocols import LockProtocol
 from .redis_lock import RedisLock
 from .threading_lock import ThreadingLock
@@ -35,9 +38,28 @@ class LockManager:
     of locks with consistent configuration and naming conventions.
     """
 
-    def __init__(self):
-        """Initialize the lock manager."""
-        self._locks: Dict[str, LockProtocol] = {}
+    def __init__(self, evict_idle_locks: bool = False, stripes: int = 0):
+        """
+        Initialize the lock manager.
+
+        By default every lock is kept until remove_lock() is called. For managers that create a
+        lock per data key (e.g. one per graph entity), two bounded modes are available:
+
+        Args:
+            evict_idle_locks: Keep locks only while they are referenced. A lock that is held,
+                waited for, or kept by a caller stays in the table and is returned for the same
+                lock_id; once nobody references it, it is dropped. The table size is bounded by
+                the number of locks in use.
+            stripes: If > 0, process-local locks come from a fixed table of this many locks per
+                lock type, chosen by a hash of lock_id. Memory stays constant, but unrelated
+                lock_ids may share a lock, so callers must not hold two lock_ids at the same time.
+                Redis locks are not striped.
+        """
+        if stripes < 0:
+            raise ValueError("stripes must not be negative")
+        self._locks: Dict[str, LockProtocol] = weakref.WeakValueDictionary() if evict_idle_locks else {}
+        self._stripe_count = stripes
+        self._stripes: Dict[str, List[LockProtocol]] = {}
         self._lock = threading.Lock()  # Thread safety for _locks dict operations
 
     def create_threading_lock(self, name: str = None) -> ThreadingLock:
@@ -52,6 +74,18 @@ class LockManager:
         """
         return ThreadingLock(name=name)
 
+    def create_asyncio_lock(self, name: str = None) -> AsyncioLock:
+        """
+        Create an asyncio lock for code running on a single event loop.
+
+        Args:
+            name: Optional name for the lock
+
+        Returns:
+            AsyncioLock instance
+        """
+        return AsyncioLock(name=name)
+
     def create_redis_lock(
         self, key: str, expire_time: int = 120, retry_times: int = 3, retry_delay: float = 0.1
     ) -> RedisLock:
@@ -80,20 +114,26 @@ class LockManager:
 
         Args:
             lock_id: Unique identifier for the lock
-            lock_type: Type of lock ('threading' or 'redis')
+            lock_type: Type of lock ('threading', 'asyncio' or 'redis')
             **kwargs: Additional arguments for lock creation
 
         Returns:
             Lock instance
         """
         with self._lock:  # Thread-safe check-and-set operation
+            if self._stripe_count and lock_type in ("threading", "asyncio"):
+                return self._get_stripe(lock_id, lock_type)
+
             # Check if lock already exists
-            if lock_id in self._locks:
-                return self._locks[lock_id]
+            lock = self._locks.get(lock_id)
+            if lock is not None:
+                return lock
 
             # Create new lock
             if lock_type == "threading":
                 lock = self.create_threading_lock(name=kwargs.get("name", lock_id))
+            elif lock_type == "asyncio":
+                lock = self.create_asyncio_lock(name=kwargs.get("name", lock_id))
             elif lock_type == "redis":
                 # For Redis locks, use lock_id as the key if no key is provided
                 key = kwargs.get("key", lock_id)
@@ -105,6 +145,15 @@ class LockManager:
             self._locks[lock_id] = lock
             return lock
 
+    def _get_stripe(self, lock_id: str, lock_type: str) -> LockProtocol:
+        """Return the striped lock for lock_id, must be called with self._lock held"""
+        stripes = self._stripes.get(lock_type)
+        if stripes is None:
+            create = self.create_threading_lock if lock_type == "threading" else self.create_asyncio_lock
+            stripes = [create(name=f"{lock_type}_stripe_{i}") for i in range(self._stripe_count)]
+            self._stripes[lock_type] = stripes
+        return stripes[zlib.crc32(lock_id.encode("utf-8")) % self._stripe_count]
+
     def remove_lock(self, lock_id: str) -> bool:
         """
         Remove a lock from the manager.
@@ -129,7 +178,7 @@ class LockManager:
             Dict mapping lock_id to lock type
         """
         with self._lock:  # Thread-safe read operation
-            return {lock_id: type(lock).__name__ for lock_id, lock in self._locks.items()}
+            return {lock_id: type(lock).__name__ for lock_id, lock in list(self._locks.items())}
 
 
 # Default global lock manager instance for convenience
@@ -144,7 +193,7 @@ def create_lock(lock_type: str = "threading", **kwargs) -> LockProtocol:
     in the default lock manager for later retrieval.
 
     Args:
-        lock_type: Type of lock to create ('threading' or 'redis')
+        lock_type: Type of lock to create ('threading', 'asyncio' or 'redis')
         name: Optional lock name (if provided, auto-registered for retrieval)
         **kwargs: Additional arguments passed to lock constructor
 
@@ -164,10 +213,12 @@ def create_lock(lock_type: str = "threading", **kwargs) -> LockProtocol:
     """
     if lock_type == "threading":
         lock_instance = ThreadingLock(**kwargs)
+    elif lock_type == "asyncio":
+        lock_instance = AsyncioLock(**kwargs)
     elif lock_type == "redis":
         lock_instance = RedisLock(**kwargs)
     else:
-        raise ValueError(f"Unknown lock type: {lock_type}. Use 'threading' or 'redis'.")
+        raise ValueError(f"Unknown lock type: {lock_type}. Use 'threading', 'asyncio' or 'redis'.")
 
     # Auto-register named locks in default manager (thread-safe)
     lock_name = kwargs.get("name") or getattr(lock_instance, "_name", None)
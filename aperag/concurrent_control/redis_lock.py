@@ -24,7 +24,7 @@ import logging
 import time
 import uuid
 from contextlib import asynccontextmanager
-from typing import Any, Optional
+from typing import Any, Iterable, Optional, Union
 
 import redis.asyncio as async_redis
 
@@ -33,6 +33,9 @@ from .utils import LockAcquisitionError
 
 logger = logging.getLogger(__name__)
 
+# Releases are published on this prefix + key, so waiters can block instead of polling
+LOCK_RELEASE_CHANNEL_PREFIX = "lock_release:"
+
 
 class RedisLock(LockProtocol):
     """
@@ -57,10 +60,12 @@ class RedisLock(LockProtocol):
     - Higher latency compared to in-process locks
     """
 
-    # Lua script for safe lock release (atomic check-and-delete)
+    # Lua script for safe lock release (atomic check-and-delete), waking up group waiters on the key
     RELEASE_SCRIPT = """
     if redis.call("get", KEYS[1]) == ARGV[1] then
-        return redis.call("del", KEYS[1])
+        local deleted = redis.call("del", KEYS[1])
+        redis.call("publish", "lock_release:" .. KEYS[1], 1)
+        return deleted
     else
         return 0
     end
@@ -238,6 +243,18 @@ class RedisLock(LockProtocol):
         """
         return self._is_locked
 
+    async def _renew(self) -> bool:
+        """Extend the expiration of the held lock, returns False if the lock was lost."""
+        redis_client = await self._get_redis_client()
+        result = await redis_client.eval(
+            self.RENEW_SCRIPT,
+            1,
+            self._key,
+            self._lock_value,
+            self._expire_time,
+        )
+        return result == 1
+
     def get_name(self) -> str:
         """Get the name/identifier of the lock."""
         return self._name
@@ -270,46 +287,271 @@ class RedisLock(LockProtocol):
             )
 
 
+class RedisLockGroup(LockProtocol):
+    """
+    Redis-based distributed lock over a set of keys, held all-or-nothing.
+
+    All keys are checked and set in a single Lua call, so taking the locks of
+    hundreds of entities costs one round trip instead of one per key, and a
+    holder never ends up with part of the set. Keys are deduplicated and sorted
+    so that groups with overlapping keys always compare them in the same order.
+
+    Instead of sleep polling, a waiter subscribes to the release channel of the
+    key that blocked it and retries as soon as that key is released. Since a key
+    may also disappear by expiring, the wait never exceeds the remaining TTL of
+    the blocking key or ``max_wait``.
+
+    The group shares its keys and release notifications with RedisLock, so single
+    key holders and groups exclude each other. In Redis Cluster all keys of a
+    group must hash to the same slot (use a common hash tag).
+    """
+
+    # Returns {0, 0} if all keys were set, otherwise {index of first held key, its pttl}
+    ACQUIRE_SCRIPT = """
+    for i, key in ipairs(KEYS) do
+        if redis.call("exists", key) == 1 then
+            return {i, redis.call("pttl", key)}
+        end
+    end
+    for _, key in ipairs(KEYS) do
+        redis.call("set", key, ARGV[1], "ex", ARGV[2])
+    end
+    return {0, 0}
+    """
+
+    RELEASE_SCRIPT = """
+    local released = 0
+    for _, key in ipairs(KEYS) do
+        if redis.call("get", key) == ARGV[1] then
+            released = released + redis.call("del", key)
+            redis.call("publish", ARGV[2] .. key, 1)
+        end
+    end
+    return released
+    """
+
+    # Renews either every key or none, so a partially lost group is reported as lost
+    RENEW_SCRIPT = """
+    for _, key in ipairs(KEYS) do
+        if redis.call("get", key) ~= ARGV[1] then
+            return 0
+        end
+    end
+    for _, key in ipairs(KEYS) do
+        redis.call("expire", key, ARGV[2])
+    end
+    return 1
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str],
+        expire_time: int = 120,
+        max_wait: float = 1.0,
+        name: str = None,
+        redis_client: Optional[async_redis.Redis] = None,
+    ):
+        """
+        Initialize the Redis lock group.
+
+        Args:
+            keys: Redis keys to lock together (required)
+            expire_time: Lock expiration time in seconds (prevents deadlocks)
+            max_wait: Longest wait for a release notification before checking the keys again
+            name: Optional name for the lock group
+        """
+        self._keys = sorted(set(keys))
+        if not self._keys or not all(self._keys):
+            raise ValueError("Redis lock group keys are required")
+
+        self._name = name or f"redis_lock_group_{self._keys[0]}_{len(self._keys)}"
+        self._expire_time = expire_time
+        self._max_wait = max_wait
+        self._lock_value: Optional[str] = None
+        self._is_locked = False
+        self._redis_client = redis_client
+
+    async def _get_redis_client(self):
+        """Get Redis client from shared connection manager."""
+        if self._redis_client:
+            return self._redis_client
+
+        from aperag.db.redis_manager import RedisConnectionManager
+
+        self._redis_client = await RedisConnectionManager.get_async_client()
+        return self._redis_client
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Acquire all keys of the group atomically.
+
+        Args:
+            timeout: Maximum time to wait for the whole group (seconds).
+                    None means wait until the keys are available.
+
+        Returns:
+            True if every key was acquired, False on timeout or Redis error.
+        """
+        if self._is_locked:
+            logger.warning(f"Redis lock group '{self._name}' is already held by this instance")
+            return True
+
+        lock_value = str(uuid.uuid4())
+        redis_client = await self._get_redis_client()
+
+        start_time = time.time()
+        attempt = 0
+        pubsub = None
+        channel = None
+        try:
+            while True:
+                attempt += 1
+                blocked_index, ttl_ms = await redis_client.eval(
+                    self.ACQUIRE_SCRIPT,
+                    len(self._keys),
+                    *self._keys,
+                    lock_value,
+                    self._expire_time,
+                )
+                if int(blocked_index) == 0:
+                    self._lock_value = lock_value
+                    self._is_locked = True
+                    elapsed = time.time() - start_time
+                    logger.debug(
+                        f"Redis lock group '{self._name}' acquired {len(self._keys)} keys "
+                        f"after {elapsed:.3f}s (attempt {attempt})"
+                    )
+                    return True
+
+                remaining_timeout = None
+                if timeout is not None:
+                    remaining_timeout = timeout - (time.time() - start_time)
+                    if remaining_timeout <= 0:
+                        logger.debug(f"Redis lock group '{self._name}' acquisition timed out after {attempt} attempts")
+                        return False
+
+                blocking_channel = LOCK_RELEASE_CHANNEL_PREFIX + self._keys[int(blocked_index) - 1]
+                if blocking_channel != channel:
+                    # Subscribe first and check again, the key may have been released in between
+                    if pubsub is None:
+                        pubsub = redis_client.pubsub()
+                    elif channel:
+                        await pubsub.unsubscribe(channel)
+                    await pubsub.subscribe(blocking_channel)
+                    channel = blocking_channel
+                    continue
+
+                wait_time = self._max_wait
+                if int(ttl_ms) > 0:
+                    wait_time = min(wait_time, int(ttl_ms) / 1000)
+                if remaining_timeout is not None:
+                    wait_time = min(wait_time, remaining_timeout)
+                await pubsub.get_message(ignore_subscribe_messages=True, timeout=wait_time)
+        except Exception as e:
+            logger.error(f"Error acquiring Redis lock group '{self._name}' on attempt {attempt}: {e}")
+            return False
+        finally:
+            if pubsub is not None:
+                try:
+                    await pubsub.unsubscribe()
+                    await pubsub.close()
+                except Exception as e:
+                    logger.warning(f"Error closing pub/sub for Redis lock group '{self._name}': {e}")
+
+    async def release(self) -> None:
+        """Release every key of the group still held by this instance and notify waiters."""
+        if not self._is_locked:
+            logger.warning(f"Redis lock group '{self._name}' is not held by this instance")
+            return
+
+        try:
+            redis_client = await self._get_redis_client()
+            result = await redis_client.eval(
+                self.RELEASE_SCRIPT,
+                len(self._keys),
+                *self._keys,
+                self._lock_value,
+                LOCK_RELEASE_CHANNEL_PREFIX,
+            )
+            if result == len(self._keys):
+                logger.debug(f"Redis lock group '{self._name}' released successfully")
+            else:
+                logger.warning(
+                    f"Redis lock group '{self._name}' released {result} of {len(self._keys)} keys "
+                    f"(others may have expired)"
+                )
+        except Exception as e:
+            logger.error(f"Error releasing Redis lock group '{self._name}': {e}")
+        finally:
+            self._lock_value = None
+            self._is_locked = False
+
+    def is_locked(self) -> bool:
+        """Check if the group is currently held by this instance (local state only)."""
+        return self._is_locked
+
+    async def _renew(self) -> bool:
+        """Extend the expiration of every key, returns False if any key was lost."""
+        redis_client = await self._get_redis_client()
+        result = await redis_client.eval(
+            self.RENEW_SCRIPT,
+            len(self._keys),
+            *self._keys,
+            self._lock_value,
+            self._expire_time,
+        )
+        return result == 1
+
+    def get_name(self) -> str:
+        """Get the name/identifier of the lock group."""
+        return self._name
+
+    def get_keys(self) -> list[str]:
+        """Get the sorted keys of the lock group."""
+        return list(self._keys)
+
+    async def __aenter__(self) -> "RedisLockGroup":
+        """Async context manager entry."""
+        success = await self.acquire()
+        if not success:
+            raise LockAcquisitionError(f"Failed to acquire Redis lock group '{self._name}'")
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Async context manager exit."""
+        await self.release()
+
+
 # NOTE: This implementation might have issues if renewal fails; ensure your use case can tolerate such problems.
 @asynccontextmanager
-async def redis_lock_with_renewal(lock: RedisLock, renewal_interval: int = 10):
+async def redis_lock_with_renewal(lock: Union[RedisLock, RedisLockGroup], renewal_interval: int = 10):
     """
-    A context manager specifically for RedisLock that adds watchdog renewal.
-    It does not modify the LockProtocol.
+    A context manager specifically for RedisLock and RedisLockGroup that adds watchdog renewal.
+    It does not modify the LockProtocol. A group is renewed as a whole.
     """
-    if not isinstance(lock, RedisLock):
-        raise TypeError("This context manager only works with RedisLock instances.")
+    if not isinstance(lock, (RedisLock, RedisLockGroup)):
+        raise TypeError("This context manager only works with RedisLock or RedisLockGroup instances.")
 
     watchdog_task = None
     is_active = True
 
     async def watchdog():
         """Periodically renews the lock."""
-        lock_key = lock._key
-        lock_value = lock._lock_value
-        expire_time = lock._expire_time
-        redis_client = await lock._get_redis_client()
+        lock_name = lock.get_name()
 
         while is_active:
             await asyncio.sleep(renewal_interval)
             if not is_active:
                 break
             try:
-                result = await redis_client.eval(
-                    RedisLock.RENEW_SCRIPT,
-                    1,
-                    lock_key,
-                    lock_value,
-                    expire_time,
-                )
-                if result != 1:
-                    logger.error(f"Lock '{lock_key}' lost during renewal. Watchdog stopping.")
+                if not await lock._renew():
+                    logger.error(f"Lock '{lock_name}' lost during renewal. Watchdog stopping.")
                     lock._is_locked = False  # Mark lock as lost, for the main loop to detect
                     break
                 else:
-                    logger.debug(f"Lock '{lock_key}' renewed successfully.")
+                    logger.debug(f"Lock '{lock_name}' renewed successfully.")
             except Exception as e:
-                logger.error(f"Error renewing lock '{lock_key}': {e}")
+                logger.error(f"Error renewing lock '{lock_name}': {e}")
                 break
 
     try:
@@ -112,6 +112,15 @@ class Config(BaseSettings):
     # Embedding
     embedding_max_chunks_in_batch: int = Field(10, alias="EMBEDDING_MAX_CHUNKS_IN_BATCH")
 
+    # Per-text embedding cache, shared across collections
+    embedding_cache_enabled: bool = Field(True, alias="EMBEDDING_CACHE_ENABLED")
+    embedding_cache_backend: str = Field("memory", alias="EMBEDDING_CACHE_BACKEND")  # memory, redis or disk
+    embedding_cache_ttl: int = Field(7 * 86400, alias="EMBEDDING_CACHE_TTL")
+    # Bytes held by the memory backend of every process, ~20k vectors of 1536 dimensions
+    embedding_cache_max_bytes: int = Field(128 * 1024 * 1024, alias="EMBEDDING_CACHE_MAX_BYTES")
+    embedding_cache_dir: str = Field("/tmp/aperag_embedding_cache", alias="EMBEDDING_CACHE_DIR")
+    embedding_cache_disk_size_limit: int = Field(2 * 1024**3, alias="EMBEDDING_CACHE_DISK_SIZE_LIMIT")
+
     # Memory backend
     memory_redis_url: Optional[str] = Field(None, alias="MEMORY_REDIS_URL")
 
@@ -133,6 +142,19 @@ class Config(BaseSettings):
     max_document_size: int = Field(100 * 1024 * 1024, alias="MAX_DOCUMENT_SIZE")
     max_conversation_count: int = Field(100, alias="MAX_CONVERSATION_COUNT")
 
+    # PDF page rendering for the vision index
+    pdf_render_dpi: int = Field(72, alias="PDF_RENDER_DPI")
+    pdf_render_max_pages: int = Field(0, alias="PDF_RENDER_MAX_PAGES")  # 0 renders every page
+    pdf_render_workers: int = Field(0, alias="PDF_RENDER_WORKERS")  # 0 means min(4, cpu count), 1 disables the pool
+    pdf_render_memory_budget: int = Field(512 * 1024 * 1024, alias="PDF_RENDER_MEMORY_BUDGET")  # Bytes in flight
+
+    # Parsed documents are passed to index tasks by reference, see aperag/tasks/parsed_data_store.py
+    parsed_data_zstd_level: int = Field(3, alias="PARSED_DATA_ZSTD_LEVEL")
+    parsed_data_cache_dir: str = Field("/tmp/aperag_parsed_data", alias="PARSED_DATA_CACHE_DIR")  # Empty disables
+    parsed_data_cache_max_bytes: int = Field(2 * 1024 * 1024 * 1024, alias="PARSED_DATA_CACHE_MAX_BYTES")
+    # Unchanged documents are not parsed again, see aperag/index/parse_cache.py
+    parse_cache_enabled: bool = Field(True, alias="PARSE_CACHE_ENABLED")
+
     # Chunking
     chunk_size: int = Field(400, alias="CHUNK_SIZE")
     chunk_overlap_size: int = Field(20, alias="CHUNK_OVERLAP_SIZE")
@@ -141,6 +163,18 @@ class Config(BaseSettings):
     es_host: Optional[str] = Field(None, alias="ES_HOST")
     es_timeout: int = Field(30, alias="ES_TIMEOUT")  # ES request timeout in seconds
     es_max_retries: int = Field(3, alias="ES_MAX_RETRIES")  # Max retries for ES requests
+    es_bulk_chunk_size: int = Field(500, alias="ES_BULK_CHUNK_SIZE")  # Max chunks per _bulk request
+    es_bulk_max_bytes: int = Field(10 * 1024 * 1024, alias="ES_BULK_MAX_BYTES")  # Max body size per _bulk request
+    es_bulk_refresh: bool = Field(True, alias="ES_BULK_REFRESH")  # Refresh the index once a document is written
+
+    # Document summary
+    summary_map_concurrency: int = Field(4, alias="SUMMARY_MAP_CONCURRENCY")  # Concurrent chunk summary calls
+    summary_reduce_max_tokens: int = Field(4000, alias="SUMMARY_REDUCE_MAX_TOKENS")  # Summary tokens per reduce
+    summary_chunk_cache_ttl: int = Field(30 * 86400, alias="SUMMARY_CHUNK_CACHE_TTL")  # 0 disables the cache
+
+    # Vision index
+    vision_to_text_concurrency: int = Field(4, alias="VISION_TO_TEXT_CONCURRENCY")  # Concurrent vision LLM calls
+    vision_to_text_max_retries: int = Field(3, alias="VISION_TO_TEXT_MAX_RETRIES")  # Attempts per image
 
     # LLM keyword extraction
     llm_keyword_extraction_provider: str = Field("", alias="LLM_KEYWORD_EXTRACTION_PROVIDER")
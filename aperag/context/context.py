@@ -20,11 +20,11 @@ from aperag.vectorstore.connector import VectorStoreConnectorAdaptor
 
 
 class ContextManager(ABC):
-    def __init__(self, collection_name, embedding_model, vectordb_type, vectordb_ctx):
+    def __init__(self, collection_name, embedding_model, vectordb_type, vectordb_ctx, adaptor=None):
         self.collection_name = collection_name
         self.embedding_model = embedding_model
         self.vectordb_type = vectordb_type
-        self.adaptor = VectorStoreConnectorAdaptor(vectordb_type, vectordb_ctx)
+        self.adaptor = adaptor or VectorStoreConnectorAdaptor(vectordb_type, vectordb_ctx)
 
     def query(self, query, score_threshold=0.5, topk=3, vector=None, index_types=None, chat_id=None):
         """
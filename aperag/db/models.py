@@ -67,6 +67,26 @@ def EnumColumn(enum_class, **kwargs):
     return String(**kwargs)
 
 
+# Embedding dimensions that get an HNSW index on the LightRAG vector tables. The tables store the vectors
+# of every collection's embedding model, so each dimension is indexed by a typed partial expression index.
+# pgvector cannot build HNSW indexes over 2000 dimensions, larger embeddings are searched without an index.
+LIGHTRAG_VECTOR_INDEX_DIMENSIONS = (384, 512, 768, 1024, 1536)
+
+
+# Helper function for creating the per-dimension HNSW indexes of a LightRAG vector table
+def LightRAGVectorIndexes(table_name):
+    """Create cosine HNSW indexes on content_vector for each indexed embedding dimension"""
+    return tuple(
+        Index(
+            f"idx_{table_name}_vector_{dim}",
+            text(f"(content_vector::vector({dim})) vector_cosine_ops"),
+            postgresql_using="hnsw",
+            postgresql_where=text(f"vector_dims(content_vector) = {dim}"),
+        )
+        for dim in LIGHTRAG_VECTOR_INDEX_DIMENSIONS
+    )
+
+
 # Enums for choices
 class CollectionStatus(str, Enum):
     INACTIVE = "INACTIVE"
@@ -717,6 +737,10 @@ class LightRAGDocChunksModel(Base):
     """LightRAG Document Chunks Storage Model"""
 
     __tablename__ = "lightrag_doc_chunks"
+    __table_args__ = (
+        Index("idx_lightrag_doc_chunks_workspace_doc", "workspace", "full_doc_id"),
+        *LightRAGVectorIndexes("lightrag_doc_chunks"),
+    )
 
     id = Column(String(255), primary_key=True)
     workspace = Column(String(255), primary_key=True)
@@ -734,6 +758,10 @@ class LightRAGVDBEntityModel(Base):
     """LightRAG VDB Entity Storage Model"""
 
     __tablename__ = "lightrag_vdb_entity"
+    __table_args__ = (
+        Index("idx_lightrag_vdb_entity_chunk_ids", "chunk_ids", postgresql_using="gin"),
+        *LightRAGVectorIndexes("lightrag_vdb_entity"),
+    )
 
     id = Column(String(255), primary_key=True)
     workspace = Column(String(255), primary_key=True)
@@ -750,6 +778,10 @@ class LightRAGVDBRelationModel(Base):
     """LightRAG VDB Relation Storage Model"""
 
     __tablename__ = "lightrag_vdb_relation"
+    __table_args__ = (
+        Index("idx_lightrag_vdb_relation_chunk_ids", "chunk_ids", postgresql_using="gin"),
+        *LightRAGVectorIndexes("lightrag_vdb_relation"),
+    )
 
     id = Column(String(255), primary_key=True)
     workspace = Column(String(255), primary_key=True)
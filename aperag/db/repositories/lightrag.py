@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from sqlalchemy import select
+import logging
+
+from sqlalchemy import String, select
+from sqlalchemy.dialects.postgresql import array
 
 from aperag.db.models import (
     LightRAGDocChunksModel,
@@ -22,6 +25,41 @@ from aperag.db.models import (
 from aperag.db.repositories.base import SyncRepositoryProtocol
 from aperag.utils.utils import utc_now
 
+logger = logging.getLogger(__name__)
+
+# Restricts entity and relation records to those extracted from chunks of the given documents
+_RELEVANT_CHUNKS_FILTER = """EXISTS (
+    SELECT 1 FROM lightrag_doc_chunks c
+    WHERE c.workspace = :workspace AND c.full_doc_id = ANY(:doc_ids) AND c.id = ANY(t.chunk_ids)
+)"""
+
+
+# Default HNSW search breadth (hnsw.ef_search) of similarity queries, raised to top_k when smaller
+HNSW_EF_SEARCH = 100
+
+# Upper bound of the tuples one iterative HNSW scan visits before giving up
+HNSW_MAX_SCAN_TUPLES = 20000
+
+# Whether the vector extension supports hnsw.iterative_scan (pgvector >= 0.8), detected once per process
+_hnsw_iterative_scan = None
+
+
+def _supports_hnsw_iterative_scan(session) -> bool:
+    global _hnsw_iterative_scan
+    if _hnsw_iterative_scan is None:
+        from sqlalchemy import text
+
+        version = session.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+        try:
+            _hnsw_iterative_scan = tuple(int(part) for part in (version or "0").split(".")[:2]) >= (0, 8)
+        except ValueError:
+            _hnsw_iterative_scan = False
+        if not _hnsw_iterative_scan:
+            logger.warning(
+                f"pgvector {version} has no iterative HNSW scan, LightRAG similarity queries use exact scans"
+            )
+    return _hnsw_iterative_scan
+
 
 class LightragRepositoryMixin(SyncRepositoryProtocol):
     # LightRAG Doc Chunks Operations
@@ -61,6 +99,18 @@ class LightragRepositoryMixin(SyncRepositoryProtocol):
 
         return self._execute_query(_query)
 
+    def query_lightrag_doc_chunk_ids_by_doc_id(self, workspace: str, doc_id: str):
+        """Query the IDs of the LightRAG document chunks that belong to a document"""
+
+        def _query(session):
+            stmt = select(LightRAGDocChunksModel.id).where(
+                LightRAGDocChunksModel.workspace == workspace, LightRAGDocChunksModel.full_doc_id == doc_id
+            )
+            result = session.execute(stmt)
+            return [row[0] for row in result.fetchall()]
+
+        return self._execute_query(_query)
+
     def filter_lightrag_doc_chunks_keys(self, workspace: str, keys: list):
         """Filter existing keys for LightRAG document chunks"""
 
@@ -304,178 +354,154 @@ class LightragRepositoryMixin(SyncRepositoryProtocol):
         return self._execute_transaction(_operation)
 
     # Add vector similarity search methods
-    def query_lightrag_doc_chunks_similarity(
-        self, workspace: str, embedding: list, top_k: int, doc_ids: list = None, threshold: float = 0.2
+    def _query_lightrag_similarity(
+        self,
+        table: str,
+        columns: str,
+        doc_filter: str,
+        workspace: str,
+        embedding: list,
+        top_k: int,
+        doc_ids: list = None,
+        threshold: float = 0.2,
+        ef_search: int = HNSW_EF_SEARCH,
     ):
-        """Query similar document chunks using vector similarity"""
+        """
+        Nearest neighbour search on a LightRAG vector table.
+
+        The per-dimension HNSW indexes cover the rows of every workspace, while the workspace
+        and document filters are applied to what the index returns. The index is therefore
+        only used with pgvector's iterative scan, which keeps scanning until enough rows pass
+        the filters. Queries restricted to documents, servers without iterative scan, and
+        index scans that come back short (a small workspace, or one that is a small share of
+        the table) use an exact scan of the workspace instead.
+        """
 
         def _query(session):
             from sqlalchemy import text
 
+            dim = len(embedding)
             # Convert embedding to PostgreSQL array format
             embedding_string = ",".join(map(str, embedding))
+            cosine_distance = f"t.content_vector::vector({dim}) <=> '[{embedding_string}]'::vector({dim})"
 
+            params = {"workspace": workspace, "threshold": threshold, "top_k": top_k}
+            where = f"t.workspace = :workspace AND vector_dims(t.content_vector) = {dim}"
             if doc_ids:
-                # Query with document ID filter
+                where += f" AND {doc_filter}"
+                params["doc_ids"] = doc_ids
+
+            rows = None
+            if not doc_ids and _supports_hnsw_iterative_scan(session):
+                # hnsw.ef_search bounds the candidates of each scan step, it must cover top_k
+                session.execute(
+                    text(
+                        "SELECT set_config('hnsw.ef_search', :ef_search, true), "
+                        "set_config('hnsw.iterative_scan', 'relaxed_order', true), "
+                        "set_config('hnsw.max_scan_tuples', :max_scan_tuples, true)"
+                    ),
+                    {"ef_search": str(max(ef_search, top_k)), "max_scan_tuples": str(HNSW_MAX_SCAN_TUPLES)},
+                )
+                # Ordering by the indexed expression lets the HNSW index serve the query
                 sql = text(
-                    """
-                    WITH relevant_chunks AS (
-                        SELECT id as chunk_id
-                        FROM lightrag_doc_chunks
-                        WHERE workspace = :workspace AND full_doc_id = ANY(:doc_ids)
-                    )
-                    SELECT id, content, file_path, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_doc_chunks
-                    WHERE workspace = :workspace
-                    AND id IN (SELECT chunk_id FROM relevant_chunks)
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
+                    f"""
+                    SELECT {columns}, 1 - ({cosine_distance}) as distance
+                    FROM {table} t
+                    WHERE {where}
+                    ORDER BY {cosine_distance}
                     LIMIT :top_k
-                """.replace(":embedding", embedding_string)
+                """
                 )
+                rows = [dict(row._mapping) for row in session.execute(sql, params)]
+                if len(rows) < top_k:
+                    # The scan stopped at max_scan_tuples or the workspace has fewer rows
+                    rows = None
 
-                result = session.execute(
-                    sql, {"workspace": workspace, "doc_ids": doc_ids, "threshold": threshold, "top_k": top_k}
-                )
-            else:
-                # Query without document ID filter
+            if rows is None:
+                # Ordering by the similarity instead of the distance operator keeps the index out
                 sql = text(
-                    """
-                    SELECT id, content, file_path, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_doc_chunks
-                    WHERE workspace = :workspace
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
+                    f"""
+                    SELECT {columns}, 1 - ({cosine_distance}) as distance
+                    FROM {table} t
+                    WHERE {where} AND 1 - ({cosine_distance}) > :threshold
                     ORDER BY distance DESC
                     LIMIT :top_k
-                """.replace(":embedding", embedding_string)
+                """
                 )
+                rows = [dict(row._mapping) for row in session.execute(sql, params)]
 
-                result = session.execute(sql, {"workspace": workspace, "threshold": threshold, "top_k": top_k})
-
-            # Properly convert SQLAlchemy Row objects to dictionaries
-            return [dict(row._mapping) for row in result]
+            # Relaxed order scans may return candidates slightly out of order
+            rows = [row for row in rows if row["distance"] > threshold]
+            rows.sort(key=lambda row: row["distance"], reverse=True)
+            return rows
 
         return self._execute_query(_query)
 
+    def query_lightrag_doc_chunks_similarity(
+        self,
+        workspace: str,
+        embedding: list,
+        top_k: int,
+        doc_ids: list = None,
+        threshold: float = 0.2,
+        ef_search: int = HNSW_EF_SEARCH,
+    ):
+        """Query similar document chunks using vector similarity"""
+        return self._query_lightrag_similarity(
+            "lightrag_doc_chunks",
+            "t.id, t.content, t.file_path, EXTRACT(EPOCH FROM t.create_time)::BIGINT as created_at",
+            "t.full_doc_id = ANY(:doc_ids)",
+            workspace,
+            embedding,
+            top_k,
+            doc_ids,
+            threshold,
+            ef_search,
+        )
+
     def query_lightrag_vdb_entity_similarity(
-        self, workspace: str, embedding: list, top_k: int, doc_ids: list = None, threshold: float = 0.2
+        self,
+        workspace: str,
+        embedding: list,
+        top_k: int,
+        doc_ids: list = None,
+        threshold: float = 0.2,
+        ef_search: int = HNSW_EF_SEARCH,
     ):
         """Query similar entities using vector similarity"""
-
-        def _query(session):
-            from sqlalchemy import text
-
-            # Convert embedding to PostgreSQL array format
-            embedding_string = ",".join(map(str, embedding))
-
-            if doc_ids:
-                # Query with document ID filter
-                sql = text(
-                    """
-                    WITH relevant_chunks AS (
-                        SELECT id as chunk_id
-                        FROM lightrag_doc_chunks
-                        WHERE workspace = :workspace AND full_doc_id = ANY(:doc_ids)
-                    )
-                    SELECT entity_name, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_entity e
-                    WHERE e.workspace = :workspace
-                    AND EXISTS (
-                        SELECT 1 FROM relevant_chunks rc 
-                        WHERE rc.chunk_id = ANY(e.chunk_ids)
-                    )
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(
-                    sql, {"workspace": workspace, "doc_ids": doc_ids, "threshold": threshold, "top_k": top_k}
-                )
-            else:
-                # Query without document ID filter
-                sql = text(
-                    """
-                    SELECT entity_name, EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_entity
-                    WHERE workspace = :workspace
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(sql, {"workspace": workspace, "threshold": threshold, "top_k": top_k})
-
-            # Properly convert SQLAlchemy Row objects to dictionaries
-            return [dict(row._mapping) for row in result]
-
-        return self._execute_query(_query)
+        return self._query_lightrag_similarity(
+            "lightrag_vdb_entity",
+            "t.entity_name, EXTRACT(EPOCH FROM t.create_time)::BIGINT as created_at",
+            _RELEVANT_CHUNKS_FILTER,
+            workspace,
+            embedding,
+            top_k,
+            doc_ids,
+            threshold,
+            ef_search,
+        )
 
     def query_lightrag_vdb_relation_similarity(
-        self, workspace: str, embedding: list, top_k: int, doc_ids: list = None, threshold: float = 0.2
+        self,
+        workspace: str,
+        embedding: list,
+        top_k: int,
+        doc_ids: list = None,
+        threshold: float = 0.2,
+        ef_search: int = HNSW_EF_SEARCH,
     ):
         """Query similar relations using vector similarity"""
-
-        def _query(session):
-            from sqlalchemy import text
-
-            # Convert embedding to PostgreSQL array format
-            embedding_string = ",".join(map(str, embedding))
-
-            if doc_ids:
-                # Query with document ID filter
-                sql = text(
-                    """
-                    WITH relevant_chunks AS (
-                        SELECT id as chunk_id
-                        FROM lightrag_doc_chunks
-                        WHERE workspace = :workspace AND full_doc_id = ANY(:doc_ids)
-                    )
-                    SELECT source_id as src_id, target_id as tgt_id, 
-                           EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_relation r
-                    WHERE r.workspace = :workspace
-                    AND EXISTS (
-                        SELECT 1 FROM relevant_chunks rc 
-                        WHERE rc.chunk_id = ANY(r.chunk_ids)
-                    )
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(
-                    sql, {"workspace": workspace, "doc_ids": doc_ids, "threshold": threshold, "top_k": top_k}
-                )
-            else:
-                # Query without document ID filter
-                sql = text(
-                    """
-                    SELECT source_id as src_id, target_id as tgt_id,
-                           EXTRACT(EPOCH FROM create_time)::BIGINT as created_at,
-                           1 - (content_vector <=> '[:embedding]'::vector) as distance
-                    FROM lightrag_vdb_relation
-                    WHERE workspace = :workspace
-                    AND 1 - (content_vector <=> '[:embedding]'::vector) > :threshold
-                    ORDER BY distance DESC
-                    LIMIT :top_k
-                """.replace(":embedding", embedding_string)
-                )
-
-                result = session.execute(sql, {"workspace": workspace, "threshold": threshold, "top_k": top_k})
-
-            # Properly convert SQLAlchemy Row objects to dictionaries
-            return [dict(row._mapping) for row in result]
-
-        return self._execute_query(_query)
+        return self._query_lightrag_similarity(
+            "lightrag_vdb_relation",
+            "t.source_id as src_id, t.target_id as tgt_id, EXTRACT(EPOCH FROM t.create_time)::BIGINT as created_at",
+            _RELEVANT_CHUNKS_FILTER,
+            workspace,
+            embedding,
+            top_k,
+            doc_ids,
+            threshold,
+            ef_search,
+        )
 
     # Additional entity and relation operations
     def query_lightrag_vdb_entity_by_name(self, workspace: str, entity_name: str):
@@ -558,6 +584,36 @@ class LightragRepositoryMixin(SyncRepositoryProtocol):
 
         return self._execute_query(_query)
 
+    def query_lightrag_vdb_entity_by_chunk_ids(self, workspace: str, chunk_ids: list):
+        """Query entities that reference any of the given chunks"""
+
+        def _query(session):
+            if not chunk_ids:
+                return []
+            stmt = select(LightRAGVDBEntityModel).where(
+                LightRAGVDBEntityModel.workspace == workspace,
+                LightRAGVDBEntityModel.chunk_ids.op("&&")(array(chunk_ids, type_=String)),
+            )
+            result = session.execute(stmt)
+            return result.scalars().all()
+
+        return self._execute_query(_query)
+
+    def query_lightrag_vdb_relation_by_chunk_ids(self, workspace: str, chunk_ids: list):
+        """Query relations that reference any of the given chunks"""
+
+        def _query(session):
+            if not chunk_ids:
+                return []
+            stmt = select(LightRAGVDBRelationModel).where(
+                LightRAGVDBRelationModel.workspace == workspace,
+                LightRAGVDBRelationModel.chunk_ids.op("&&")(array(chunk_ids, type_=String)),
+            )
+            result = session.execute(stmt)
+            return result.scalars().all()
+
+        return self._execute_query(_query)
+
     def query_lightrag_vdb_entity_all(self, workspace: str):
         """Query all LightRAG VDB Entity records for workspace"""
 
@@ -68,6 +68,15 @@ class AssetBinPart(Part):
     metadata: dict[str, Any] = Field(default_factory=dict)
 
 
+class AssetRefPart(Part):
+    """An asset already stored in the object store, referenced by path instead of carrying its bytes"""
+
+    asset_id: str
+    path: str
+    mime_type: str | None = None
+    metadata: dict[str, Any] = Field(default_factory=dict)
+
+
 class BaseParser(ABC):
     def __init__(self, **kwargs):
         pass
@@ -19,9 +19,13 @@ from aperag.docparser.base import Part
 
 
 def rechunk(
-    parts: list[Part], chunk_size: int, chunk_overlap: int, tokenizer: Callable[[str], List[int]]
+    parts: list[Part],
+    chunk_size: int,
+    chunk_overlap: int,
+    tokenizer: Callable[[str], List[int]],
+    incremental: bool = False,
 ) -> list[Part]:
-    rechunker = Rechunker(chunk_size, chunk_overlap, tokenizer)
+    rechunker = Rechunker(chunk_size, chunk_overlap, tokenizer, incremental=incremental)
     return rechunker(parts)
 
 
@@ -34,10 +38,18 @@ class Group:
 
 
 class Rechunker:
-    def __init__(self, chunk_size: int, chunk_overlap: int, tokenizer: Callable[[str], List[int]]):
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        tokenizer: Callable[[str], List[int]],
+        incremental: bool = False,
+    ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.tokenizer = tokenizer
+        # See SimpleSemanticSplitter for the incremental tokenizer accounting mode
+        self.incremental = incremental
 
     def __call__(self, parts: list[Part]) -> list[Part]:
         groups = self._to_groups(parts)
@@ -177,7 +189,7 @@ class Rechunker:
                 tokens = self._count_tokens(part)
                 if tokens > self.chunk_size:
                     # If the single part is too large, split it into smaller chunks
-                    splitter = SimpleSemanticSplitter(self.tokenizer)
+                    splitter = SimpleSemanticSplitter(self.tokenizer, incremental=self.incremental)
                     chunks = splitter.split(part.content, self.chunk_size, self.chunk_overlap)
                     metadata = part.metadata.copy()
                     metadata.pop("tokens", None)
@@ -302,14 +314,39 @@ class SimpleSemanticSplitter:
         [" ", "\t"],
     ]
 
-    def __init__(self, tokenizer: Callable[[str], List[int]]):
+    def __init__(self, tokenizer: Callable[[str], List[int]], incremental: bool = False):
+        """
+        Args:
+            tokenizer: Function that encodes a string into tokens.
+            incremental: Enable incremental tokenizer accounting. Every piece produced by the
+                separators is tokenized once and its count is memoized. Merging small pieces starts
+                from the running sum of the piece counts and only verifies the chunk boundary with a
+                few galloping/binary-search encodes, and the overlap is searched from the right end
+                of the string instead of bisecting the whole string. The output is identical to the
+                default mode as long as the token count of a string never decreases when text is
+                appended to it, which is the same assumption `_cut_right_side` already relies on.
+        """
         self.tokenizer = tokenizer
+        self.incremental = incremental
+        self._token_counts: dict[str, int] = {}
 
     def split(self, s: str, chunk_size: int, chunk_overlap: int) -> list[str]:
-        return self._recursive_split(s, chunk_size, chunk_overlap, 0)
+        try:
+            return self._recursive_split(s, chunk_size, chunk_overlap, 0)
+        finally:
+            self._token_counts.clear()
+
+    def _count_tokens(self, s: str) -> int:
+        if not self.incremental:
+            return len(self.tokenizer(s))
+        tokens = self._token_counts.get(s)
+        if tokens is None:
+            tokens = len(self.tokenizer(s))
+            self._token_counts[s] = tokens
+        return tokens
 
     def _fit(self, s: str, chunk_size: int) -> bool:
-        return len(self.tokenizer(s)) <= chunk_size
+        return self._count_tokens(s) <= chunk_size
 
     def _recursive_split(self, s: str, chunk_size: int, chunk_overlap: int, level: int) -> list[str]:
         if len(s) == 0:
@@ -360,6 +397,8 @@ class SimpleSemanticSplitter:
             return s
         if len(s) <= 1:
             return ""
+        if self.incremental:
+            return self._cut_right_side_incremental(s, chunk_size)
         left = 0
         right = len(s)
         while left < right:
@@ -370,7 +409,29 @@ class SimpleSemanticSplitter:
                 left = mid + 1
         return s[left:]
 
+    def _cut_right_side_incremental(self, s: str, chunk_size: int) -> str:
+        # Gallop from the right end: the overlap is short, so only small suffixes get encoded.
+        # `good` is a suffix length known to fit, `bad` one known not to fit.
+        n = len(s)
+        good, bad = 0, n
+        length = 1
+        while length < bad:
+            if len(self.tokenizer(s[n - length :])) <= chunk_size:
+                good = length
+                length *= 2
+            else:
+                bad = length
+        while bad - good > 1:
+            mid = (good + bad) // 2
+            if len(self.tokenizer(s[n - mid :])) <= chunk_size:
+                good = mid
+            else:
+                bad = mid
+        return s[n - good :]
+
     def _merge_small_chunks(self, chunks: list[str], chunk_size: int) -> list[str]:
+        if self.incremental:
+            return self._merge_small_chunks_incremental(chunks, chunk_size)
         merged_chunks = []
         current_chunk = ""
         for chunk in chunks:
@@ -385,3 +446,63 @@ class SimpleSemanticSplitter:
         if len(current_chunk) > 0:
             merged_chunks.append(current_chunk)
         return merged_chunks
+
+    def _merge_small_chunks_incremental(self, chunks: list[str], chunk_size: int) -> list[str]:
+        counts = [self._count_tokens(chunk) for chunk in chunks]
+        merged_chunks = []
+        # Observed ratio between the tokens of a merged chunk and the sum of its pieces' tokens.
+        # BPE tokenizers merge across piece boundaries, so the plain sum overestimates.
+        ratio = 1.0
+        start = 0
+        while start < len(chunks):
+            # Estimate the end of the merged chunk from the running token sum
+            guess = start
+            tokens_sum = counts[start]
+            while guess + 1 < len(chunks) and (tokens_sum + counts[guess + 1]) * ratio <= chunk_size:
+                guess += 1
+                tokens_sum += counts[guess]
+            end, merged_tokens = self._find_merge_end(chunks, start, guess, chunk_size)
+            if merged_tokens is not None and end > start:
+                ratio = merged_tokens / max(sum(counts[start : end + 1]), 1)
+            merged_chunks.append("".join(chunks[start : end + 1]))
+            start = end + 1
+        return merged_chunks
+
+    def _find_merge_end(self, chunks: list[str], start: int, guess: int, chunk_size: int) -> tuple[int, int | None]:
+        """
+        Find the last index that the greedy merge starting at `start` would absorb, i.e. the
+        largest `end` such that chunks[start:end + 1] joined fits. The first chunk is always taken.
+
+        Returns the index and, if it was measured, the token count of the merged chunk.
+        """
+        measured: dict[int, int] = {}
+
+        def fits(end: int) -> bool:
+            if end == start:
+                return True
+            measured[end] = len(self.tokenizer("".join(chunks[start : end + 1])))
+            return measured[end] <= chunk_size
+
+        # `lo` is known to fit, `hi` is known not to fit (or is past the end)
+        step = 1
+        if fits(guess):
+            lo, hi = guess, guess + step
+            while hi < len(chunks) and fits(hi):
+                lo = hi
+                step *= 2
+                hi = lo + step
+            hi = min(hi, len(chunks))
+        else:
+            lo, hi = guess - step, guess
+            while lo > start and not fits(lo):
+                hi = lo
+                step *= 2
+                lo = hi - step
+            lo = max(lo, start)
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if fits(mid):
+                lo = mid
+            else:
+                hi = mid
+        return lo, measured.get(lo)
@@ -18,6 +18,7 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Tuple
 
 from aperag.flow.base.exceptions import CycleError
+from aperag.llm.embed.embedding_memo import EmbeddingMemo
 from aperag.utils.history import BaseChatMessageHistory
 
 
@@ -149,6 +150,8 @@ class SystemInput:
     chat_id: Optional[str] = None
     history: Optional[BaseChatMessageHistory] = None
     message_id: Optional[str] = None
+    # Query embeddings shared by all nodes of one flow execution
+    embedding_memo: Optional[EmbeddingMemo] = None
 
     def __init__(
         self,
@@ -156,12 +159,14 @@ class SystemInput:
         user: str,
         history: Optional[BaseChatMessageHistory] = None,
         message_id: Optional[str] = None,
+        embedding_memo: Optional[EmbeddingMemo] = None,
         **kwargs,
     ):
         self.query = query
         self.user = user
         self.history = history
         self.message_id = message_id
+        self.embedding_memo = embedding_memo
         # Set additional attributes from kwargs
         for key, value in kwargs.items():
             setattr(self, key, value)
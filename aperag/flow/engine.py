@@ -23,6 +23,7 @@ from jinja2 import Environment, StrictUndefined
 import aperag.flow.runners  # noqa: F401
 from aperag.flow.base.exceptions import CycleError, ValidationError
 from aperag.flow.base.models import NODE_RUNNER_REGISTRY, ExecutionContext, FlowInstance, NodeInstance, SystemInput
+from aperag.llm.embed.embedding_memo import EmbeddingMemo, reset_embedding_memo, set_embedding_memo
 from aperag.utils.utils import utc_now
 
 # Configure logging
@@ -78,6 +79,7 @@ class FlowEngine:
         self.execution_id = None
         self._event_queue = asyncio.Queue()
         self.jinja_env = Environment(undefined=StrictUndefined)
+        self.embedding_memo = EmbeddingMemo()
 
     async def emit_event(self, event: FlowEvent):
         """Emit an event to all consumers"""
@@ -114,6 +116,8 @@ class FlowEngine:
             f"Starting flow execution {self.execution_id} for flow {flow.name}",
             extra={"execution_id": self.execution_id},
         )
+        # Retrievers without access to SystemInput, like graph search, find the memo here
+        memo_token = set_embedding_memo(self.embedding_memo)
 
         try:
             # Emit flow start event
@@ -165,6 +169,12 @@ class FlowEngine:
                 )
             )
             raise e
+        finally:
+            reset_embedding_memo(memo_token)
+            logger.debug(
+                f"Embedding memo of flow execution {self.execution_id}: {self.embedding_memo.get_stats()}",
+                extra={"execution_id": self.execution_id},
+            )
 
     def _topological_sort(self, flow: FlowInstance) -> List[str]:
         """Perform topological sort to detect cycles
@@ -381,7 +391,7 @@ class FlowEngine:
             user_input = input_model.model_validate(resolved_inputs)
         except Exception as e:
             raise ValidationError(f"Input validation error for node {node.id}: {e}")
-        sys_input = SystemInput(**self.context.global_variables)
+        sys_input = SystemInput(**self.context.global_variables, embedding_memo=self.embedding_memo)
         return user_input, sys_input
 
     async def _execute_node(self, node: NodeInstance) -> None:
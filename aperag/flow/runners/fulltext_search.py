@@ -23,6 +23,7 @@ from aperag.db.ops import async_db_ops
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
 from aperag.index.fulltext_index import extract_keywords
 from aperag.query.query import DocumentWithScore
+from aperag.schema.utils import parseCollectionConfig
 from aperag.utils.utils import generate_vector_db_collection_name
 
 logger = logging.getLogger(__name__)
@@ -79,9 +80,13 @@ class FulltextSearchService:
 
         index = generate_vector_db_collection_name(collection.id)
         if not keywords:
-            # Create context for keyword extractor
+            from aperag.graph.lightrag_manager import LightRAGConfig
+
+            # Create context for keyword extractor, the language matches graph search so both share keywords
+            config = parseCollectionConfig(collection.config)
             extractor_ctx = {
                 "index_name": index,
+                "language": config.language or LightRAGConfig.DEFAULT_LANGUAGE,
                 "es_host": settings.es_host,
                 "es_timeout": settings.es_timeout,
                 "es_max_retries": settings.es_max_retries,
@@ -73,13 +73,14 @@ class GraphSearchService:
         from aperag.graph import lightrag_manager
         from aperag.graph.lightrag import QueryParam
 
-        rag = await lightrag_manager.create_lightrag_instance(collection)
         param: QueryParam = QueryParam(
             mode="hybrid",
             only_need_context=True,
             top_k=top_k,
         )
-        context = await rag.aquery_context(query=query, param=param)
+        # Pooled instances pay the storage setup once per collection instead of once per query
+        async with lightrag_manager.lightrag_pool.lease(collection) as rag:
+            context = await rag.aquery_context(query=query, param=param)
         if not context:
             return []
 
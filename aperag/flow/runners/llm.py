@@ -12,11 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import base64
+import io
 import json
 import logging
+import math
+import threading
 import uuid
-from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
 
 from litellm import BaseModel
 from pydantic import Field
@@ -26,6 +32,7 @@ from aperag.db.ops import async_db_ops
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
 from aperag.llm.completion.completion_service import CompletionService
 from aperag.llm.llm_error_types import InvalidConfigurationError
+from aperag.llm.provider_cache import provider_config_cache
 from aperag.objectstore.base import get_async_object_store
 from aperag.query.query import DocumentWithScore
 from aperag.schema.view_models import Reference
@@ -47,6 +54,15 @@ FALLBACK_MAX_CONTEXT_LENGTH = 50000
 # Max images to feed to LLM
 MAX_IMAGES_PER_QUERY = 5
 
+# Number of document texts whose token counts are remembered, retrieved chunks recur across queries
+TOKEN_COUNT_CACHE_SIZE = 8192
+
+# Longest image side sent to vision models, larger images are downscaled before encoding (0 keeps the original)
+MAX_IMAGE_SIDE = 2048
+
+# Total size of the base64 image data URIs kept in memory, keyed by asset path
+IMAGE_URI_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 
 async def add_human_message(history: BaseChatMessageHistory, message, message_id):
     if not message_id:
@@ -74,6 +90,9 @@ class LLMInput(BaseModel):
     prompt_template: str = Field(..., description="Prompt template")
     temperature: float = Field(..., description="Sampling temperature")
     docs: Optional[List[DocumentWithScore]] = Field(None, description="Documents")
+    context_source_quotas: Optional[Dict[str, float]] = Field(
+        None, description="Maximum share of the context token budget per recall type, e.g. {'graph_search': 0.5}"
+    )
 
 
 class LLMOutput(BaseModel):
@@ -100,8 +119,8 @@ async def calculate_model_token_limits(
     """
     # Get model configuration to determine token limits
     try:
-        model_config = await async_db_ops.query_llm_provider_model(
-            provider_name=model_service_provider, api=APIType.COMPLETION.value, model=model_name
+        model_config = await provider_config_cache.aget_provider_model(
+            model_service_provider, APIType.COMPLETION.value, model_name
         )
         if model_config:
             context_window = model_config.context_window
@@ -144,13 +163,207 @@ async def calculate_model_token_limits(
     return max_allowed_input, reserved_output_tokens
 
 
+class ContextPacker:
+    """
+    Packs retrieved documents into a prompt template up to an exact token budget.
+
+    Documents are taken in ranked order (the rerank node sorts them by score). A document
+    that does not fit is skipped so smaller ones further down can still use the budget,
+    and a recall type never takes more than its quota share of the budget.
+    """
+
+    def __init__(self, tokenizer: Optional[Callable[[str], List[int]]] = None):
+        self._tokenizer = tokenizer
+        self.count_tokens = lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)(self._count_tokens)
+
+    def _get_tokenizer(self) -> Callable[[str], List[int]]:
+        if self._tokenizer is None:
+            try:
+                from aperag.utils.tokenizer import get_default_tokenizer
+
+                self._tokenizer = get_default_tokenizer()
+            except Exception as e:
+                logger.warning(f"Failed to load tokenizer, estimating tokens from characters: {e}")
+                self._tokenizer = lambda text: range(math.ceil(len(text) / TOKEN_TO_CHAR_RATIO))
+        return self._tokenizer
+
+    def _count_tokens(self, text: str) -> int:
+        return len(self._get_tokenizer()(text))
+
+    def pack(
+        self,
+        prompt_template: str,
+        query: str,
+        docs: List[DocumentWithScore],
+        max_input_tokens: int,
+        source_quotas: Optional[Dict[str, float]] = None,
+    ) -> Tuple[str, List[DocumentWithScore]]:
+        """Return the formatted prompt and the documents packed into its context"""
+        budget = max_input_tokens - self._count_tokens(prompt_template.format(query=query, context=""))
+        quota_limits = {source: int(budget * share) for source, share in (source_quotas or {}).items()}
+
+        packed: List[DocumentWithScore] = []
+        used_tokens = 0
+        used_by_source: Dict[str, int] = defaultdict(int)
+        for doc in docs:
+            if not doc.text:
+                continue
+            tokens = self.count_tokens(doc.text)
+            if used_tokens + tokens > budget:
+                continue
+            source = (doc.metadata or {}).get("recall_type", "")
+            if source in quota_limits and used_by_source[source] + tokens > quota_limits[source]:
+                continue
+            packed.append(doc)
+            used_tokens += tokens
+            used_by_source[source] += tokens
+
+        prompt = prompt_template.format(query=query, context="".join(doc.text for doc in packed))
+        # Counts do not add up exactly across document boundaries, so check the final prompt once
+        prompt_tokens = self._count_tokens(prompt)
+        while packed and prompt_tokens > max_input_tokens:
+            packed.pop()
+            prompt = prompt_template.format(query=query, context="".join(doc.text for doc in packed))
+            prompt_tokens = self._count_tokens(prompt)
+
+        if prompt_tokens > max_input_tokens:
+            raise Exception(
+                f"Prompt requires {prompt_tokens} tokens, which exceeds the calculated "
+                f"input limit of {max_input_tokens} tokens"
+            )
+        return prompt, packed
+
+
+context_packer = ContextPacker()
+
+
+class ImageURICache:
+    """LRU of encoded image data URIs keyed by asset path, bounded by their total size"""
+
+    def __init__(self, max_bytes: int = IMAGE_URI_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, asset_path: str) -> Optional[str]:
+        with self._lock:
+            image_uri = self._data.get(asset_path)
+            if image_uri is not None:
+                self._data.move_to_end(asset_path)
+            return image_uri
+
+    def put(self, asset_path: str, image_uri: str) -> None:
+        if len(image_uri) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(asset_path, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._data[asset_path] = image_uri
+            self._size += len(image_uri)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+
+
+image_uri_cache = ImageURICache()
+
+
+def downscale_image(image_bytes: bytes, max_side: int = MAX_IMAGE_SIDE) -> bytes:
+    """Shrink an image so its longest side is at most max_side, keeping its format"""
+    if not max_side:
+        return image_bytes
+    try:
+        from PIL import Image
+
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            if max(image.size) <= max_side:
+                return image_bytes
+            image_format = image.format
+            image.thumbnail((max_side, max_side))
+            output = io.BytesIO()
+            image.save(output, format=image_format)
+            return output.getvalue()
+    except Exception as e:
+        logger.warning(f"Failed to downscale image, sending the original: {e}")
+        return image_bytes
+
+
+async def load_image_data_uris(
+    user, image_docs: List[DocumentWithScore], limit: int = MAX_IMAGES_PER_QUERY
+) -> List[Tuple[DocumentWithScore, str]]:
+    """
+    Load up to `limit` image assets as base64 data URIs, in the order of `image_docs`.
+
+    Assets are fetched concurrently, at most `limit` at a time, and the next documents are
+    only tried when some of them fail. Each document is looked up once for the user before
+    its asset is read, so cached data URIs are never served without that check.
+    """
+    object_store = get_async_object_store()
+    base_paths: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    async def get_base_path(coll_id: str, doc_id: str) -> Optional[str]:
+        doc = await async_db_ops.query_document(user=user, collection_id=coll_id, document_id=doc_id)
+        if not doc:
+            logger.warning(f"Document not found for collection_id={coll_id}, document_id={doc_id}")
+            return None
+        return doc.object_store_base_path()
+
+    async def load(doc_with_score: DocumentWithScore) -> Optional[str]:
+        asset_id = doc_with_score.metadata.get("asset_id", None)
+        mime_type = doc_with_score.metadata.get("mimetype", None)
+        coll_id = doc_with_score.metadata.get("collection_id", None)
+        doc_id = doc_with_score.metadata.get("document_id", None)
+        if not (asset_id and mime_type and coll_id and doc_id):
+            return None
+
+        try:
+            cache_key = (coll_id, doc_id)
+            if cache_key not in base_paths:
+                base_paths[cache_key] = asyncio.ensure_future(get_base_path(coll_id, doc_id))
+            base_path = await base_paths[cache_key]
+            if not base_path:
+                return None
+
+            asset_path = f"{base_path}/assets/{asset_id}"
+            image_uri = image_uri_cache.get(asset_path)
+            if image_uri:
+                return image_uri
+
+            image_stream_tuple = await object_store.get(asset_path)
+            if not image_stream_tuple:
+                logger.warning(f"Image not found in object store at path: {asset_path}")
+                return None
+
+            image_stream, _ = image_stream_tuple
+            image_bytes = b"".join([chunk async for chunk in image_stream])
+            image_bytes = await asyncio.to_thread(downscale_image, image_bytes)
+            encoded_string = base64.b64encode(image_bytes).decode("utf-8")
+            image_uri = f"data:{mime_type};base64,{encoded_string}"
+            image_uri_cache.put(asset_path, image_uri)
+            return image_uri
+        except Exception as e:
+            logger.error(f"Failed to process image asset {asset_id}: {e}", exc_info=True)
+            return None
+
+    loaded: List[Tuple[DocumentWithScore, str]] = []
+    pending = list(image_docs)
+    while pending and len(loaded) < limit:
+        batch = pending[: limit - len(loaded)]
+        pending = pending[len(batch) :]
+        image_uris = await asyncio.gather(*[load(doc) for doc in batch])
+        loaded.extend((doc, image_uri) for doc, image_uri in zip(batch, image_uris) if image_uri)
+    return loaded
+
+
 async def is_vision_model(
     model_service_provider: str,
     model_name: str,
 ) -> bool:
     try:
-        model_config = await async_db_ops.query_llm_provider_model(
-            provider_name=model_service_provider, api=APIType.COMPLETION.value, model=model_name
+        model_config = await provider_config_cache.aget_provider_model(
+            model_service_provider, APIType.COMPLETION.value, model_name
         )
         if model_config:
             return model_config.has_tag("vision")
@@ -185,16 +398,17 @@ class LLMService:
         prompt_template: str,
         temperature: float,
         docs: Optional[List[DocumentWithScore]] = None,
+        context_source_quotas: Optional[Dict[str, float]] = None,
     ) -> Tuple[str, Dict]:
         """Generate LLM response with given parameters"""
-        api_key = await async_db_ops.query_provider_api_key(model_service_provider, user)
+        api_key = await provider_config_cache.aget_api_key(model_service_provider, user)
         if not api_key:
             raise InvalidConfigurationError(
                 "api_key", None, f"API KEY not found for LLM Provider: {model_service_provider}"
             )
 
         try:
-            llm_provider = await async_db_ops.query_llm_provider_by_name(model_service_provider)
+            llm_provider = await provider_config_cache.aget_provider(model_service_provider)
             base_url = llm_provider.base_url
         except Exception:
             raise Exception(f"LLMProvider {model_service_provider} not found")
@@ -208,13 +422,11 @@ class LLMService:
         vision_model = await is_vision_model(model_service_provider, model_name)
 
         # Build context and references from documents
-        max_input_chars = max_input_tokens * TOKEN_TO_CHAR_RATIO
-        context = ""
         references: List[Reference] = []
         image_docs: List[DocumentWithScore] = []
+        text_docs: List[DocumentWithScore] = []
         if docs:
             # Filter out image content
-            text_docs: List[DocumentWithScore] = []
             for doc in docs:
                 if doc.metadata.get("indexer", "") == "vision":
                     image_docs.append(doc)
@@ -233,72 +445,38 @@ class LLMService:
                 else:
                     text_docs.append(doc)
 
-            for doc in text_docs:
-                # Estimate final prompt length: template + query + current context + new doc
-                estimated_prompt_length = len(prompt_template) + len(query) + len(context) + len(doc.text)
-                if estimated_prompt_length > max_input_chars:
-                    break
-                context += doc.text
-                ref_obj = Reference(text=doc.text, metadata=doc.metadata, score=doc.score)
-                references.append(ref_obj)
-
-        prompt = prompt_template.format(query=query, context=context)
-        if len(prompt) > max_input_chars:
-            raise Exception(
-                f"Prompt requires {len(prompt)} characters, which exceeds the calculated "
-                f"input limit of {max_input_chars} characters"
-            )
+        prompt, packed_docs = context_packer.pack(
+            prompt_template, query, text_docs, max_input_tokens, source_quotas=context_source_quotas
+        )
+        for doc in packed_docs:
+            references.append(Reference(text=doc.text, metadata=doc.metadata, score=doc.score))
 
         images = []
         if vision_model and image_docs:
-            base_path_cache: Dict[Tuple[str, str], str] = {}
-            object_store = get_async_object_store()
-            for doc_with_score in image_docs:
-                asset_id = doc_with_score.metadata.get("asset_id", None)
-                mime_type = doc_with_score.metadata.get("mimetype", None)
-                coll_id = doc_with_score.metadata.get("collection_id", None)
-                doc_id = doc_with_score.metadata.get("document_id", None)
-                if not (asset_id and mime_type and coll_id and doc_id):
-                    continue
+            for doc_with_score, image_uri in await load_image_data_uris(user, image_docs):
+                images.append(image_uri)
+                ref_obj = Reference(
+                    text=doc_with_score.text,
+                    image_uri=image_uri,
+                    metadata=doc_with_score.metadata,
+                    score=doc_with_score.score,
+                )
+                references.append(ref_obj)
 
-                try:
-                    cache_key = (coll_id, doc_id)
-                    if cache_key in base_path_cache:
-                        base_path = base_path_cache[cache_key]
-                    else:
-                        doc = await async_db_ops.query_document(user=user, collection_id=coll_id, document_id=doc_id)
-                        if not doc:
-                            logger.warning(f"Document not found for collection_id={coll_id}, document_id={doc_id}")
-                            continue
-                        base_path = doc.object_store_base_path()
-                        base_path_cache[cache_key] = base_path
-
-                    asset_path = f"{base_path}/assets/{asset_id}"
-                    image_stream_tuple = await object_store.get(asset_path)
-                    if not image_stream_tuple:
-                        logger.warning(f"Image not found in object store at path: {asset_path}")
-                        continue
-
-                    image_stream, _ = image_stream_tuple
-                    image_bytes = b"".join([chunk async for chunk in image_stream])
-                    encoded_string = base64.b64encode(image_bytes).decode("utf-8")
-                    image_uri = f"data:{mime_type};base64,{encoded_string}"
-                    images.append(image_uri)
-                    ref_obj = Reference(
-                        text=doc_with_score.text,
-                        image_uri=image_uri,
-                        metadata=doc_with_score.metadata,
-                        score=doc_with_score.score,
-                    )
-                    references.append(ref_obj)
-
-                    if len(images) > MAX_IMAGES_PER_QUERY:
-                        break
-                except Exception as e:
-                    logger.error(f"Failed to process image asset {asset_id}: {e}", exc_info=True)
-
-        cs = CompletionService(
-            custom_llm_provider, model_name, base_url, api_key, temperature, max_output_tokens, vision=vision_model
+        cs = provider_config_cache.get_service(
+            (
+                "completion",
+                custom_llm_provider,
+                model_name,
+                base_url,
+                api_key,
+                temperature,
+                max_output_tokens,
+                vision_model,
+            ),
+            lambda: CompletionService(
+                custom_llm_provider, model_name, base_url, api_key, temperature, max_output_tokens, vision=vision_model
+            ),
         )
 
         # Convert to plain dict objects
@@ -348,6 +526,7 @@ class LLMNodeRunner(BaseNodeRunner):
             prompt_template=ui.prompt_template,
             temperature=ui.temperature,
             docs=ui.docs,
+            context_source_quotas=ui.context_source_quotas,
         )
 
         return LLMOutput(text=text), system_output
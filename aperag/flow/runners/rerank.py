@@ -17,13 +17,13 @@ from typing import List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
-from aperag.db.ops import async_db_ops
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
 from aperag.llm.llm_error_types import (
     InvalidConfigurationError,
     ProviderNotFoundError,
     RerankError,
 )
+from aperag.llm.provider_cache import provider_config_cache
 from aperag.llm.rerank.rerank_service import RerankService
 from aperag.query.query import DocumentWithScore
 
@@ -127,14 +127,14 @@ class RerankNodeRunner(BaseNodeRunner):
             )
 
         # Get API key and base_url
-        api_key = await async_db_ops.query_provider_api_key(ui.model_service_provider, si.user)
+        api_key = await provider_config_cache.aget_api_key(ui.model_service_provider, si.user)
         if not api_key:
             raise InvalidConfigurationError(
                 "api_key", api_key, f"API KEY not found for LLM Provider:{ui.model_service_provider}"
             )
 
         try:
-            llm_provider = await async_db_ops.query_llm_provider_by_name(ui.model_service_provider)
+            llm_provider = await provider_config_cache.aget_provider(ui.model_service_provider)
             if not llm_provider:
                 raise ProviderNotFoundError(ui.model_service_provider, "Rerank")
             base_url = llm_provider.base_url
@@ -148,11 +148,14 @@ class RerankNodeRunner(BaseNodeRunner):
             )
 
         # Create and execute rerank service
-        rerank_service = RerankService(
-            rerank_provider=ui.custom_llm_provider,
-            rerank_model=ui.model,
-            rerank_service_url=base_url,
-            rerank_service_api_key=api_key,
+        rerank_service = provider_config_cache.get_service(
+            ("rerank", ui.custom_llm_provider, ui.model, base_url, api_key),
+            lambda: RerankService(
+                rerank_provider=ui.custom_llm_provider,
+                rerank_model=ui.model,
+                rerank_service_url=base_url,
+                rerank_service_api_key=api_key,
+            ),
         )
 
         rerank_service.validate_configuration()
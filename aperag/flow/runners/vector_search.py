@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 from typing import List, Optional, Tuple
@@ -23,16 +24,21 @@ from aperag.context.context import ContextManager
 from aperag.db.models import Collection
 from aperag.db.ops import async_db_ops
 from aperag.flow.base.models import BaseNodeRunner, SystemInput, register_node_runner
-from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
+from aperag.llm.embed.base_embedding import get_collection_embedding_service
+from aperag.llm.embed.embedding_memo import EmbeddingMemo
 from aperag.llm.llm_error_types import (
     EmbeddingError,
     ProviderNotFoundError,
 )
 from aperag.query.query import DocumentWithScore
 from aperag.utils.utils import generate_vector_db_collection_name
+from aperag.vectorstore.connector import get_connector_adaptor
 
 logger = logging.getLogger(__name__)
 
+# Longest wait for a single collection, slower collections are left out of the answer
+VECTOR_SEARCH_COLLECTION_TIMEOUT = 10.0
+
 
 # User input model for vector search node
 class VectorSearchInput(BaseModel):
@@ -71,26 +77,30 @@ class VectorSearchService:
         similarity_threshold: float,
         collection_ids: List[str],
         chat_id: Optional[str] = None,
+        embedding_memo: Optional[EmbeddingMemo] = None,
     ) -> List[DocumentWithScore]:
-        """Execute vector search with given parameters"""
-        collection = None
-        if collection_ids:
-            collection = await self.repository.get_collection(user, collection_ids[0])
-
-        if not collection:
+        """Execute vector search over all given collections and keep the global top_k"""
+        collection_ids = list(dict.fromkeys(collection_ids or []))
+        if not collection_ids:
             return []
 
-        try:
-            collection_name = generate_vector_db_collection_name(collection.id)
-            embedding_model, vector_size = get_collection_embedding_service_sync(collection)
-            vectordb_ctx = json.loads(settings.vector_db_context)
-            vectordb_ctx["collection"] = collection_name
-            context_manager = ContextManager(collection_name, embedding_model, settings.vector_db_type, vectordb_ctx)
+        collections = await asyncio.gather(
+            *(self.repository.get_collection(user, collection_id) for collection_id in collection_ids)
+        )
+        collections = [collection for collection in collections if collection]
+        if not collections:
+            return []
 
-            vector = embedding_model.embed_query(query)
+        # Collections sharing an embedding model share one query vector
+        memo = embedding_memo or EmbeddingMemo()
 
+        async def search_collection(collection) -> List[DocumentWithScore]:
+            embedding_model, _ = await get_collection_embedding_service(collection)
+            vector = await memo.aembed_query(embedding_model, query)
+            context_manager = self._get_context_manager(collection, embedding_model)
             # Query vector database for vector and vision indexes only (excluding summary)
-            results = context_manager.query(
+            return await asyncio.to_thread(
+                context_manager.query,
                 query,
                 score_threshold=similarity_threshold,
                 topk=top_k,
@@ -99,13 +109,30 @@ class VectorSearchService:
                 chat_id=chat_id,
             )
 
-            # Add recall type metadata
-            for item in results:
-                if item.metadata is None:
-                    item.metadata = {}
-                item.metadata["recall_type"] = "vector_search"
+        results = await asyncio.gather(
+            *(self._search_with_timeout(collection, search_collection(collection)) for collection in collections)
+        )
+
+        docs = [doc for collection_docs in results for doc in collection_docs]
+        docs.sort(key=lambda doc: doc.score if doc.score is not None else 0.0, reverse=True)
+        docs = docs[:top_k]
 
-            return results
+        # Add recall type metadata
+        for item in docs:
+            if item.metadata is None:
+                item.metadata = {}
+            item.metadata["recall_type"] = "vector_search"
+
+        return docs
+
+    async def _search_with_timeout(self, collection, search) -> List[DocumentWithScore]:
+        try:
+            return await asyncio.wait_for(search, timeout=VECTOR_SEARCH_COLLECTION_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Vector search skipped for collection {collection.id} after {VECTOR_SEARCH_COLLECTION_TIMEOUT}s"
+            )
+            return []
         except ProviderNotFoundError as e:
             # Configuration error - gracefully degrade by returning empty results
             logger.warning(f"Vector search skipped for collection {collection.id} due to provider not found: {str(e)}")
@@ -118,6 +145,13 @@ class VectorSearchService:
             logger.error(f"Vector search failed for collection {collection.id}: {str(e)}")
             return []
 
+    def _get_context_manager(self, collection, embedding_model) -> ContextManager:
+        collection_name = generate_vector_db_collection_name(collection.id)
+        vectordb_ctx = json.loads(settings.vector_db_context)
+        vectordb_ctx["collection"] = collection_name
+        adaptor = get_connector_adaptor(settings.vector_db_type, vectordb_ctx)
+        return ContextManager(collection_name, embedding_model, settings.vector_db_type, vectordb_ctx, adaptor=adaptor)
+
 
 @register_node_runner(
     "vector_search",
@@ -145,5 +179,6 @@ class VectorSearchNodeRunner(BaseNodeRunner):
             similarity_threshold=ui.similarity_threshold,
             collection_ids=collection_ids,
             chat_id=chat_id,
+            embedding_memo=si.embedding_memo,
         )
         return VectorSearchOutput(docs=docs), {}
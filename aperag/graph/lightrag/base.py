@@ -237,6 +237,22 @@ class BaseVectorStorage(StorageNameSpace, ABC):
         """
         pass
 
+    async def get_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict[str, Any]]:
+        """Get the entities or relations whose chunk_ids contain any of the given chunks
+
+        Default implementation scans all records.
+        Override this method for better performance in storage backends
+        that can look the chunk references up directly.
+        """
+        if not chunk_ids or not hasattr(self, "get_all"):
+            return []
+        wanted = set(chunk_ids)
+        return [
+            data
+            for data in (await self.get_all()).values()
+            if isinstance(data, dict) and wanted.intersection(data.get("chunk_ids") or [])
+        ]
+
     @abstractmethod
     async def delete(self, ids: list[str]):
         """Delete vectors with specified IDs
@@ -276,6 +292,21 @@ class BaseKVStorage(StorageNameSpace, ABC):
         2. update flags to notify other processes that data persistence is needed
         """
 
+    async def get_chunk_ids_by_doc_id(self, doc_id: str) -> list[str]:
+        """Get the IDs of the chunks that belong to a document
+
+        Default implementation scans all records.
+        Override this method for better performance in storage backends
+        that can look the document up directly.
+        """
+        if not hasattr(self, "get_all"):
+            return []
+        return [
+            chunk_id
+            for chunk_id, data in (await self.get_all()).items()
+            if isinstance(data, dict) and data.get("full_doc_id") == doc_id
+        ]
+
     @abstractmethod
     async def delete(self, ids: list[str]) -> None:
         """Delete specific records from storage by their IDs
@@ -141,6 +141,22 @@ class PGOpsSyncKVStorage(BaseKVStorage):
 
         return await asyncio.to_thread(_sync_get_by_ids)
 
+    async def get_chunk_ids_by_doc_id(self, doc_id: str) -> list[str]:
+        """Get the IDs of the chunks that belong to a document"""
+
+        def _sync_get_chunk_ids_by_doc_id():
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+            from aperag.graph.lightrag.namespace import NameSpace, is_namespace
+
+            if is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
+                return db_ops.query_lightrag_doc_chunk_ids_by_doc_id(self.workspace, doc_id)
+            else:
+                logger.error(f"Unknown namespace for get_chunk_ids_by_doc_id: {self.namespace}")
+                return []
+
+        return await asyncio.to_thread(_sync_get_chunk_ids_by_doc_id)
+
     async def filter_keys(self, keys: set[str]) -> set[str]:
         """Filter out existing keys"""
 
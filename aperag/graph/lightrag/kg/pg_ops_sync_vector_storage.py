@@ -33,12 +33,14 @@ Modifications by ApeRAG Team:
 
 import asyncio
 import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import timezone
 from typing import Any, final
 
 import numpy as np
 
+from aperag.db.repositories.lightrag import HNSW_EF_SEARCH
+
 from ..base import (
     BaseVectorStorage,
 )
@@ -50,6 +52,9 @@ from ..utils import logger
 class PGOpsSyncVectorStorage(BaseVectorStorage):
     """PostgreSQL Vector Storage using DatabaseOps with sync interface."""
 
+    ef_search: int = field(default=HNSW_EF_SEARCH)
+    """HNSW search breadth (hnsw.ef_search), higher values trade query latency for recall."""
+
     async def initialize(self):
         """Initialize storage."""
         logger.debug(f"PGOpsSyncVectorStorage initialized for workspace '{self.workspace}'")
@@ -234,7 +239,7 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
             # Use appropriate similarity search method based on namespace
             if is_namespace(self.namespace, NameSpace.VECTOR_STORE_CHUNKS):
                 results = db_ops.query_lightrag_doc_chunks_similarity(
-                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold
+                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold, self.ef_search
                 )
                 # Convert results to expected format for chunks
                 formatted_results = []
@@ -260,7 +265,7 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
 
             elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_ENTITIES):
                 results = db_ops.query_lightrag_vdb_entity_similarity(
-                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold
+                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold, self.ef_search
                 )
                 # Convert results to expected format for entities
                 formatted_results = []
@@ -281,7 +286,7 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
 
             elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_RELATIONSHIPS):
                 results = db_ops.query_lightrag_vdb_relation_similarity(
-                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold
+                    self.workspace, embedding_list, top_k, ids, self.cosine_better_than_threshold, self.ef_search
                 )
                 # Convert results to expected format for relationships
                 formatted_results = []
@@ -488,6 +493,50 @@ class PGOpsSyncVectorStorage(BaseVectorStorage):
 
         return await asyncio.to_thread(_sync_get_by_ids)
 
+    async def get_by_chunk_ids(self, chunk_ids: list[str]) -> list[dict[str, Any]]:
+        """Get the entities or relations whose chunk_ids contain any of the given chunks"""
+
+        def _sync_get_by_chunk_ids():
+            if not chunk_ids:
+                return []
+
+            # Import here to avoid circular imports
+            from aperag.db.ops import db_ops
+            from aperag.graph.lightrag.namespace import NameSpace, is_namespace
+
+            if is_namespace(self.namespace, NameSpace.VECTOR_STORE_ENTITIES):
+                models = db_ops.query_lightrag_vdb_entity_by_chunk_ids(self.workspace, chunk_ids)
+                return [
+                    {
+                        "id": model.id,
+                        "entity_name": model.entity_name,
+                        "content": model.content or "",
+                        "chunk_ids": model.chunk_ids or [],
+                        "file_path": model.file_path,
+                        "created_at": int(model.create_time.timestamp()) if model.create_time else None,
+                    }
+                    for model in models
+                ]
+            elif is_namespace(self.namespace, NameSpace.VECTOR_STORE_RELATIONSHIPS):
+                models = db_ops.query_lightrag_vdb_relation_by_chunk_ids(self.workspace, chunk_ids)
+                return [
+                    {
+                        "id": model.id,
+                        "source_id": model.source_id,
+                        "target_id": model.target_id,
+                        "content": model.content or "",
+                        "chunk_ids": model.chunk_ids or [],
+                        "file_path": model.file_path,
+                        "created_at": int(model.create_time.timestamp()) if model.create_time else None,
+                    }
+                    for model in models
+                ]
+            else:
+                logger.error(f"Unknown namespace for chunk IDs lookup: {self.namespace}")
+                return []
+
+        return await asyncio.to_thread(_sync_get_by_chunk_ids)
+
     async def drop(self) -> dict[str, str]:
         """Drop the storage - not implemented for safety"""
         return {"status": "error", "message": "Drop operation not supported for database-backed storage"}
@@ -111,6 +111,15 @@ class LightRAG:
         default=get_env_value("FORCE_LLM_SUMMARY_ON_MERGE", DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE, int)
     )
 
+    max_parallel_merge: int = field(default=4)
+    """Maximum number of connected components merged into the storages concurrently."""
+
+    merge_stream_chunks: int = field(default=64)
+    """
+    Number of extracted chunks after which their entities are merged while extraction of the
+    remaining chunks continues. 0 merges only once all chunks have been extracted.
+    """
+
     # Text chunking
     # ---
 
@@ -294,6 +303,7 @@ class LightRAG:
             cosine_better_than_threshold=self.cosine_better_than_threshold,
             _max_batch_size=self.max_batch_size,
             meta_fields={"entity_name", "source_id", "content", "file_path"},
+            **self.vector_db_storage_cls_kwargs,
         )
         self.relationships_vdb: BaseVectorStorage = self.vector_db_storage_cls(  # type: ignore
             namespace=NameSpace.VECTOR_STORE_RELATIONSHIPS,
@@ -302,6 +312,7 @@ class LightRAG:
             cosine_better_than_threshold=self.cosine_better_than_threshold,
             _max_batch_size=self.max_batch_size,
             meta_fields={"src_id", "tgt_id", "source_id", "content", "file_path"},
+            **self.vector_db_storage_cls_kwargs,
         )
         self.chunks_vdb: BaseVectorStorage = self.vector_db_storage_cls(  # type: ignore
             namespace=NameSpace.VECTOR_STORE_CHUNKS,
@@ -310,6 +321,7 @@ class LightRAG:
             cosine_better_than_threshold=self.cosine_better_than_threshold,
             _max_batch_size=self.max_batch_size,
             meta_fields={"full_doc_id", "content", "file_path"},
+            **self.vector_db_storage_cls_kwargs,
         )
 
         self._storages_status = StoragesStatus.CREATED
@@ -459,13 +471,18 @@ class LightRAG:
         self,
         chunk_results: List[tuple[dict, dict]],
         collection_id: str | None = None,
+        semaphore: asyncio.Semaphore | None = None,
     ) -> dict[str, Any]:
         """
         Process entities and relationships in groups based on connected components.
 
+        Components touch disjoint entity sets, so they are merged concurrently, largest first
+        to keep the slowest component from starting last.
+
         Args:
             chunk_results: List of (nodes_dict, edges_dict) from entity extraction
             collection_id: Optional collection ID for logging
+            semaphore: Optional semaphore bounding concurrent merges, shared between calls
 
         Returns:
             Dict with processing results
@@ -523,10 +540,16 @@ class LightRAG:
                 }
             )
 
+        # Largest components first, they dominate the total merge time
+        component_tasks.sort(key=lambda task_data: len(task_data["component"]), reverse=True)
+
         # Process components concurrently with semaphore
-        semaphore = asyncio.Semaphore(1)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(1, self.max_parallel_merge))
+        completed_components = 0
 
         async def _process_component_with_semaphore(task_data):
+            nonlocal completed_components
             async with semaphore:
                 self.lightrag_logger.debug(
                     f"Processing component {task_data['index'] + 1}/{task_data['total_components']} "
@@ -550,9 +573,9 @@ class LightRAG:
                     lightrag_logger=self.lightrag_logger,
                 )
 
-                self.lightrag_logger.debug(
-                    f"Completed component {task_data['index'] + 1}: "
-                    f"{result['entity_count']} entities, {result['relation_count']} relations"
+                completed_components += 1
+                self.lightrag_logger.log_merge_progress(
+                    completed_components, len(component_tasks), result["entity_count"], result["relation_count"]
                 )
 
                 return result
@@ -574,7 +597,14 @@ class LightRAG:
             }
 
         # Wait for all tasks to complete or for the first exception
-        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            # asyncio.wait leaves the awaited tasks running, stop them with the batch
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+            raise
 
         # Check if any task raised an exception
         for task in done:
@@ -755,20 +785,60 @@ class LightRAG:
 
             self.lightrag_logger.debug(f"Starting graph indexing for {len(chunks)} chunks")
 
-            # 1. Extract entities and relations from chunks (completely parallel, no lock)
-            chunk_results = await extract_entities(
-                chunks,
-                use_llm_func=self.llm_model_func,
-                entity_extract_max_gleaning=self.entity_extract_max_gleaning,
-                language=self.language,
-                entity_types=self.entity_types,
-                example_number=self.example_number,
-                llm_model_max_async=self.llm_model_max_async,
-                lightrag_logger=self.lightrag_logger,
-            )
+            # 1. Extract entities and relations from chunks (completely parallel, no lock).
+            # Every merge_stream_chunks extracted chunks are handed to the merge stage right away.
+            # Merging is incremental, a batch merged early is merged like a later document would be.
+            merge_semaphore = asyncio.Semaphore(max(1, self.max_parallel_merge))
+            merge_tasks = []
+            pending_results = []
+
+            def _start_merge(batch):
+                merge_tasks.append(
+                    asyncio.create_task(self._grouping_process_chunk_results(batch, collection_id, merge_semaphore))
+                )
+
+            async def _cancel_merges():
+                # A failed document must not leave batches writing to the storages behind it
+                for task in merge_tasks:
+                    task.cancel()
+                if merge_tasks:
+                    await asyncio.wait(merge_tasks)
+
+            async def _on_chunk_extracted(chunk_result):
+                # Stop extracting as soon as a merge has failed
+                for task in merge_tasks:
+                    if task.done() and not task.cancelled() and task.exception():
+                        raise task.exception()
+                pending_results.append(chunk_result)
+                if self.merge_stream_chunks > 0 and len(pending_results) >= self.merge_stream_chunks:
+                    _start_merge(pending_results[:])
+                    pending_results.clear()
+
+            try:
+                chunk_results = await extract_entities(
+                    chunks,
+                    use_llm_func=self.llm_model_func,
+                    entity_extract_max_gleaning=self.entity_extract_max_gleaning,
+                    language=self.language,
+                    entity_types=self.entity_types,
+                    example_number=self.example_number,
+                    llm_model_max_async=self.llm_model_max_async,
+                    lightrag_logger=self.lightrag_logger,
+                    on_chunk_extracted=_on_chunk_extracted,
+                )
+            except BaseException:
+                await _cancel_merges()
+                raise
 
             # 2. Process each component group with its own lock scope
-            result = await self._grouping_process_chunk_results(chunk_results, collection_id)
+            if pending_results:
+                _start_merge(pending_results)
+            try:
+                merge_results = await asyncio.gather(*merge_tasks)
+            except BaseException:
+                await _cancel_merges()
+                raise
+            result = {"groups_processed": sum(r["groups_processed"] for r in merge_results)}
 
             # Count total results
             entity_count = sum(len(nodes) for nodes, _ in chunk_results)
@@ -874,6 +944,9 @@ class LightRAG:
     async def adelete_by_doc_id(self, doc_id: str) -> None:
         """Delete a document and all its related data
 
+        Only the chunks of the document and the entities and relationships that reference
+        them are read, so the cost depends on the size of the document, not the workspace.
+
         Args:
             doc_id: Document ID to delete
         """
@@ -881,139 +954,131 @@ class LightRAG:
             self.lightrag_logger.info(f"Starting deletion for document {doc_id}")
 
             # ========== STEP 1: Get all chunks related to this document ==========
-            all_chunks = await self.text_chunks.get_all()
-            related_chunks = {
-                chunk_id: chunk_data
-                for chunk_id, chunk_data in all_chunks.items()
-                if isinstance(chunk_data, dict) and chunk_data.get("full_doc_id") == doc_id
-            }
+            chunk_ids = set(await self.text_chunks.get_chunk_ids_by_doc_id(doc_id))
 
-            if not related_chunks:
+            if not chunk_ids:
                 logger.warning(f"No chunks found for document {doc_id}")
                 return
 
-            chunk_ids = set(related_chunks.keys())
             self.lightrag_logger.info(f"Found {len(chunk_ids)} chunks to delete for document {doc_id}")
 
             # ========== STEP 2: Handle Vector Storage References (chunk_ids arrays) ==========
             # Process entities in vector storage
             entities_to_delete_from_vdb = []
             entities_to_update_in_vdb = {}
+            affected_entity_names = set()
 
-            if hasattr(self.entities_vdb, "get_all"):
-                all_entities = await self.entities_vdb.get_all()
-                for entity_id, entity_data in all_entities.items():
-                    if not isinstance(entity_data, dict) or "chunk_ids" not in entity_data:
-                        continue
-
-                    # Remove deleted chunks from entity's chunk_ids array
-                    old_chunk_ids = set(entity_data.get("chunk_ids", []))
-                    new_chunk_ids = old_chunk_ids - chunk_ids
-
-                    if not new_chunk_ids:
-                        # Entity has no remaining chunks, mark for deletion
-                        entity_name = entity_data.get("entity_name")
-                        if entity_name:
-                            entities_to_delete_from_vdb.append(entity_name)
-                            self.lightrag_logger.debug(
-                                f"Entity {entity_name} marked for deletion from VDB - no remaining chunks"
-                            )
-                    elif len(new_chunk_ids) != len(old_chunk_ids):
-                        # Entity has some remaining chunks, update chunk_ids array
-                        entity_data["chunk_ids"] = list(new_chunk_ids)
-                        entity_data["source_id"] = GRAPH_FIELD_SEP.join(new_chunk_ids)
-                        entities_to_update_in_vdb[entity_id] = entity_data
+            for entity_data in await self.entities_vdb.get_by_chunk_ids(list(chunk_ids)):
+                entity_name = entity_data.get("entity_name")
+                if entity_name:
+                    affected_entity_names.add(entity_name)
+
+                # Remove deleted chunks from entity's chunk_ids array
+                old_chunk_ids = set(entity_data.get("chunk_ids") or [])
+                new_chunk_ids = old_chunk_ids - chunk_ids
+
+                if not new_chunk_ids:
+                    # Entity has no remaining chunks, mark for deletion
+                    if entity_name:
+                        entities_to_delete_from_vdb.append(entity_name)
                         self.lightrag_logger.debug(
-                            f"Entity {entity_data.get('entity_name')} chunk_ids updated: {len(old_chunk_ids)} -> {len(new_chunk_ids)}"
+                            f"Entity {entity_name} marked for deletion from VDB - no remaining chunks"
                         )
+                elif len(new_chunk_ids) != len(old_chunk_ids):
+                    # Entity has some remaining chunks, update chunk_ids array
+                    entity_data["chunk_ids"] = list(new_chunk_ids)
+                    entity_data["source_id"] = GRAPH_FIELD_SEP.join(new_chunk_ids)
+                    entities_to_update_in_vdb[entity_data["id"]] = entity_data
+                    self.lightrag_logger.debug(
+                        f"Entity {entity_name} chunk_ids updated: {len(old_chunk_ids)} -> {len(new_chunk_ids)}"
+                    )
 
             # Process relationships in vector storage
             relationships_to_delete_from_vdb = []
             relationships_to_update_in_vdb = {}
-
-            if hasattr(self.relationships_vdb, "get_all"):
-                all_relationships = await self.relationships_vdb.get_all()
-                for rel_id, rel_data in all_relationships.items():
-                    if not isinstance(rel_data, dict) or "chunk_ids" not in rel_data:
-                        continue
-
-                    # Remove deleted chunks from relationship's chunk_ids array
-                    old_chunk_ids = set(rel_data.get("chunk_ids", []))
-                    new_chunk_ids = old_chunk_ids - chunk_ids
-
-                    if not new_chunk_ids:
-                        # Relationship has no remaining chunks, mark for deletion by calculating IDs
-                        src_id = rel_data.get("src_id") or rel_data.get("source_id")
-                        tgt_id = rel_data.get("tgt_id") or rel_data.get("target_id")
-                        if src_id and tgt_id:
-                            relationships_to_delete_from_vdb.append((src_id, tgt_id))
-                            self.lightrag_logger.debug(
-                                f"Relationship {src_id}-{tgt_id} marked for deletion from VDB - no remaining chunks"
-                            )
-                    elif len(new_chunk_ids) != len(old_chunk_ids):
-                        # Relationship has some remaining chunks, update chunk_ids array
-                        rel_data["chunk_ids"] = list(new_chunk_ids)
-                        rel_data["source_id"] = GRAPH_FIELD_SEP.join(new_chunk_ids)
-                        relationships_to_update_in_vdb[rel_id] = rel_data
-                        self.lightrag_logger.debug(
-                            f"Relationship {rel_data.get('src_id')}-{rel_data.get('tgt_id')} chunk_ids updated: {len(old_chunk_ids)} -> {len(new_chunk_ids)}"
-                        )
+            affected_relationships = set()
+
+            for rel_data in await self.relationships_vdb.get_by_chunk_ids(list(chunk_ids)):
+                # source_id/target_id of a relationship record are the entity names
+                src_id = rel_data.get("src_id") or rel_data.get("source_id")
+                tgt_id = rel_data.get("tgt_id") or rel_data.get("target_id")
+                if src_id and tgt_id:
+                    affected_relationships.add((src_id, tgt_id))
+
+                # Remove deleted chunks from relationship's chunk_ids array
+                old_chunk_ids = set(rel_data.get("chunk_ids") or [])
+                new_chunk_ids = old_chunk_ids - chunk_ids
+
+                if not new_chunk_ids:
+                    # Relationship has no remaining chunks, mark for deletion
+                    relationships_to_delete_from_vdb.append(rel_data["id"])
+                    self.lightrag_logger.debug(
+                        f"Relationship {src_id}-{tgt_id} marked for deletion from VDB - no remaining chunks"
+                    )
+                elif len(new_chunk_ids) != len(old_chunk_ids):
+                    # Relationship has some remaining chunks, update chunk_ids array
+                    rel_data["src_id"] = src_id
+                    rel_data["tgt_id"] = tgt_id
+                    rel_data["chunk_ids"] = list(new_chunk_ids)
+                    rel_data["source_id"] = GRAPH_FIELD_SEP.join(new_chunk_ids)
+                    relationships_to_update_in_vdb[rel_data["id"]] = rel_data
+                    self.lightrag_logger.debug(
+                        f"Relationship {src_id}-{tgt_id} chunk_ids updated: {len(old_chunk_ids)} -> {len(new_chunk_ids)}"
+                    )
 
             # ========== STEP 3: Handle Graph Storage References (source_id strings) ==========
-            # Process entities in graph storage
+            # The graph nodes and edges carry the same chunk references as their vector records,
+            # so only the ones found above need to be looked at.
             entities_to_delete_from_graph = set()
             entities_to_update_in_graph = {}
-
-            # Process relationships in graph storage
             relationships_to_delete_from_graph = set()
             relationships_to_update_in_graph = {}
 
-            # Get all labels from graph storage
-            all_labels = await self.chunk_entity_relation_graph.get_all_labels()
-
-            # Process each entity node
-            for node_label in all_labels:
-                node_data = await self.chunk_entity_relation_graph.get_node(node_label)
-                if node_data and "source_id" in node_data:
-                    # Parse source_id string (format: chunk1|chunk2|chunk3)
-                    sources = set(node_data["source_id"].split(GRAPH_FIELD_SEP))
-                    sources.difference_update(chunk_ids)
-
-                    if not sources:
-                        # Entity has no remaining source chunks
-                        entities_to_delete_from_graph.add(node_label)
-                        self.lightrag_logger.debug(
-                            f"Entity {node_label} marked for deletion from graph - no remaining sources"
-                        )
-                    else:
-                        # Entity has some remaining source chunks
-                        new_source_id = GRAPH_FIELD_SEP.join(sources)
-                        entities_to_update_in_graph[node_label] = new_source_id
-                        self.lightrag_logger.debug(f"Entity {node_label} source_id will be updated in graph")
-
-                # Process relationships for this entity
-                node_edges = await self.chunk_entity_relation_graph.get_node_edges(node_label)
-                if node_edges:
-                    for src, tgt in node_edges:
-                        edge_data = await self.chunk_entity_relation_graph.get_edge(src, tgt)
-                        if edge_data and "source_id" in edge_data:
-                            # Parse source_id string (format: chunk1|chunk2|chunk3)
-                            sources = set(edge_data["source_id"].split(GRAPH_FIELD_SEP))
-                            sources.difference_update(chunk_ids)
-
-                            if not sources:
-                                # Relationship has no remaining source chunks
-                                relationships_to_delete_from_graph.add((src, tgt))
-                                self.lightrag_logger.debug(
-                                    f"Relationship {src}-{tgt} marked for deletion from graph - no remaining sources"
-                                )
-                            else:
-                                # Relationship has some remaining source chunks
-                                new_source_id = GRAPH_FIELD_SEP.join(sources)
-                                relationships_to_update_in_graph[(src, tgt)] = new_source_id
-                                self.lightrag_logger.debug(
-                                    f"Relationship {src}-{tgt} source_id will be updated in graph"
-                                )
+            nodes = await self.chunk_entity_relation_graph.get_nodes_batch(sorted(affected_entity_names))
+            for node_label, node_data in nodes.items():
+                if not node_data or not node_data.get("source_id"):
+                    continue
+                # Parse source_id string (format: chunk1<SEP>chunk2<SEP>chunk3)
+                sources = set(node_data["source_id"].split(GRAPH_FIELD_SEP))
+                sources.difference_update(chunk_ids)
+
+                if not sources:
+                    # Entity has no remaining source chunks
+                    entities_to_delete_from_graph.add(node_label)
+                    self.lightrag_logger.debug(
+                        f"Entity {node_label} marked for deletion from graph - no remaining sources"
+                    )
+                else:
+                    # Entity has some remaining source chunks
+                    node_data["source_id"] = GRAPH_FIELD_SEP.join(sources)
+                    entities_to_update_in_graph[node_label] = node_data
+                    self.lightrag_logger.debug(f"Entity {node_label} source_id will be updated in graph")
+
+            # Edges are undirected, the graph may store one the other way round
+            edge_pairs = sorted(affected_relationships | {(tgt, src) for src, tgt in affected_relationships})
+            edges = await self.chunk_entity_relation_graph.get_edges_batch(
+                [{"src": src, "tgt": tgt} for src, tgt in edge_pairs]
+            )
+            for (src, tgt), edge_data in edges.items():
+                if not edge_data or not edge_data.get("source_id"):
+                    continue
+                if (tgt, src) in relationships_to_delete_from_graph or (tgt, src) in relationships_to_update_in_graph:
+                    continue
+                # Parse source_id string (format: chunk1<SEP>chunk2<SEP>chunk3)
+                sources = set(edge_data["source_id"].split(GRAPH_FIELD_SEP))
+                sources.difference_update(chunk_ids)
+
+                if not sources:
+                    # Relationship has no remaining source chunks
+                    relationships_to_delete_from_graph.add((src, tgt))
+                    self.lightrag_logger.debug(
+                        f"Relationship {src}-{tgt} marked for deletion from graph - no remaining sources"
+                    )
+                else:
+                    # Relationship has some remaining source chunks
+                    edge_data["source_id"] = GRAPH_FIELD_SEP.join(sources)
+                    relationships_to_update_in_graph[(src, tgt)] = edge_data
+                    self.lightrag_logger.debug(f"Relationship {src}-{tgt} source_id will be updated in graph")
 
             # ========== STEP 4: Execute all deletions and updates ==========
 
@@ -1029,12 +1094,7 @@ class LightRAG:
 
             # 4.2 Delete and update relationships in vector storage
             if relationships_to_delete_from_vdb:
-                rel_ids_to_delete = []
-                for src, tgt in relationships_to_delete_from_vdb:
-                    rel_id_0 = compute_mdhash_id(src + tgt, prefix="rel-", workspace=self.workspace)
-                    rel_id_1 = compute_mdhash_id(tgt + src, prefix="rel-", workspace=self.workspace)
-                    rel_ids_to_delete.extend([rel_id_0, rel_id_1])
-                await self.relationships_vdb.delete(rel_ids_to_delete)
+                await self.relationships_vdb.delete(relationships_to_delete_from_vdb)
                 self.lightrag_logger.info(
                     f"Deleted {len(relationships_to_delete_from_vdb)} relationships from vector storage"
                 )
@@ -1050,11 +1110,8 @@ class LightRAG:
                 await self.chunk_entity_relation_graph.remove_nodes(list(entities_to_delete_from_graph))
                 self.lightrag_logger.info(f"Deleted {len(entities_to_delete_from_graph)} entities from graph storage")
 
-            for entity_name, new_source_id in entities_to_update_in_graph.items():
-                node_data = await self.chunk_entity_relation_graph.get_node(entity_name)
-                if node_data:
-                    node_data["source_id"] = new_source_id
-                    await self.chunk_entity_relation_graph.upsert_node(entity_name, node_data)
+            for entity_name, node_data in entities_to_update_in_graph.items():
+                await self.chunk_entity_relation_graph.upsert_node(entity_name, node_data)
             if entities_to_update_in_graph:
                 self.lightrag_logger.info(f"Updated {len(entities_to_update_in_graph)} entities in graph storage")
 
@@ -1065,11 +1122,11 @@ class LightRAG:
                     f"Deleted {len(relationships_to_delete_from_graph)} relationships from graph storage"
                 )
 
-            for (src, tgt), new_source_id in relationships_to_update_in_graph.items():
-                edge_data = await self.chunk_entity_relation_graph.get_edge(src, tgt)
-                if edge_data:
-                    edge_data["source_id"] = new_source_id
-                    await self.chunk_entity_relation_graph.upsert_edge(src, tgt, edge_data)
+            for (src, tgt), edge_data in relationships_to_update_in_graph.items():
+                # Edges of deleted entities are already gone
+                if src in entities_to_delete_from_graph or tgt in entities_to_delete_from_graph:
+                    continue
+                await self.chunk_entity_relation_graph.upsert_edge(src, tgt, edge_data)
             if relationships_to_update_in_graph:
                 self.lightrag_logger.info(
                     f"Updated {len(relationships_to_update_in_graph)} relationships in graph storage"
@@ -1082,16 +1139,11 @@ class LightRAG:
 
             # ========== STEP 5: Simple verification ==========
             # Verify chunks were actually deleted
-            remaining_chunks = await self.text_chunks.get_all()
-            remaining_related_chunks = {
-                chunk_id: chunk_data
-                for chunk_id, chunk_data in remaining_chunks.items()
-                if isinstance(chunk_data, dict) and chunk_data.get("full_doc_id") == doc_id
-            }
+            remaining_chunk_ids = await self.text_chunks.get_chunk_ids_by_doc_id(doc_id)
 
-            if remaining_related_chunks:
+            if remaining_chunk_ids:
                 self.lightrag_logger.warning(
-                    f"Verification failed: {len(remaining_related_chunks)} chunks still exist for document {doc_id}"
+                    f"Verification failed: {len(remaining_chunk_ids)} chunks still exist for document {doc_id}"
                 )
             else:
                 self.lightrag_logger.info(
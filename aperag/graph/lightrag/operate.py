@@ -34,14 +34,15 @@ Modifications by ApeRAG Team:
 from __future__ import annotations
 
 import asyncio
-import json
 import os
 import re
 import time
 from collections import Counter, defaultdict
-from typing import Any
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable
 
-from aperag.concurrent_control import get_or_create_lock
+from aperag.concurrent_control import LockManager
+from aperag.llm.keyword_extraction import build_keywords_prompt, parse_keywords_response, query_keyword_cache
 
 from .base import (
     BaseGraphStorage,
@@ -68,6 +69,9 @@ from .utils import (
     truncate_list_by_token_size,
 )
 
+# One lock per entity and relationship being merged; a lock is dropped once no merge references it
+_merge_lock_manager = LockManager(evict_idle_locks=True)
+
 
 def chunking_by_token_size(
     tokenizer: Tokenizer,
@@ -552,14 +556,12 @@ async def _merge_nodes_and_edges_impl(
             sorted_edge_key = tuple(sorted(edge_key))
             all_edges[sorted_edge_key].extend(edges)
 
-    # Process entities with fine-grained locking
+    # Process entities with fine-grained locking, one entity lock at a time
     entity_count = 0
+    merged_entities = []
 
     for entity_name, entities in all_nodes.items():
-        # Create lock for this specific entity
-        entity_lock = get_or_create_lock(f"entity:{entity_name}:{workspace}")
-
-        async with entity_lock:
+        async with _merge_lock_manager.get_or_create_lock(f"entity:{entity_name}:{workspace}"):
             # Process and update entity in graph db
             entity_data = await _merge_nodes_then_upsert(
                 entity_name,
@@ -575,31 +577,17 @@ async def _merge_nodes_and_edges_impl(
                 workspace,
             )
 
-            # Update entity in vector db immediately under the same lock
-            if entity_vdb is not None and entity_data:
-                vdb_data = {
-                    compute_mdhash_id(entity_data["entity_name"], prefix="ent-", workspace=workspace): {
-                        "entity_name": entity_data["entity_name"],
-                        "entity_type": entity_data["entity_type"],
-                        "content": f"{entity_data['entity_name']}\n{entity_data['description']}",
-                        "source_id": entity_data["source_id"],
-                        "file_path": entity_data.get("file_path", "unknown_source"),
-                    }
-                }
-                await entity_vdb.upsert(vdb_data)
-
-            entity_count += 1
+        if entity_data:
+            merged_entities.append(entity_name)
+        entity_count += 1
 
-    # Process relationships with fine-grained locking
+    # Process relationships with fine-grained locking, one relationship lock at a time
     relation_count = 0
+    merged_edges = []
 
     for edge_key, edges in all_edges.items():
-        # Create lock for this specific relationship
-        # Sort edge key to ensure consistent lock naming
-        sorted_edge_key = tuple(sorted(edge_key))
-        relationship_lock = get_or_create_lock(f"relationship:{sorted_edge_key[0]}:{sorted_edge_key[1]}:{workspace}")
-
-        async with relationship_lock:
+        # Edge keys are sorted, so lock names are consistent for both directions
+        async with _merge_lock_manager.get_or_create_lock(f"relationship:{edge_key[0]}:{edge_key[1]}:{workspace}"):
             # Process and update relationship in graph db
             edge_data = await _merge_edges_then_upsert(
                 edge_key[0],
@@ -616,22 +604,60 @@ async def _merge_nodes_and_edges_impl(
                 workspace,
             )
 
-            # Update relationship in vector db immediately under the same lock
-            if relationships_vdb is not None and edge_data is not None:
-                vdb_data = {
-                    compute_mdhash_id(edge_data["src_id"] + edge_data["tgt_id"], prefix="rel-", workspace=workspace): {
-                        "src_id": edge_data["src_id"],
-                        "tgt_id": edge_data["tgt_id"],
-                        "keywords": edge_data["keywords"],
-                        "content": f"{edge_data['src_id']}\t{edge_data['tgt_id']}\n{edge_data['keywords']}\n{edge_data['description']}",
-                        "source_id": edge_data["source_id"],
-                        "file_path": edge_data.get("file_path", "unknown_source"),
-                    }
+        if edge_data is not None:
+            merged_edges.append(edge_key)
+            relation_count += 1
+
+    # The vector records of the component are written with one upsert per storage, which embeds
+    # them in max_batch_size batches instead of one embedding call per record. A concurrent merge
+    # may have changed an entity or relationship since this one released its lock, so the records
+    # are built from the graph state read again, and the locks of the component are held until the
+    # upsert has landed so that no older record can overwrite a newer one. Only this phase holds
+    # several locks, always in sorted order, entities before relationships, so it cannot deadlock.
+    if entity_vdb is None:
+        merged_entities = []
+    if relationships_vdb is None:
+        merged_edges = []
+    lock_names = [f"entity:{entity_name}:{workspace}" for entity_name in sorted(merged_entities)]
+    lock_names += [f"relationship:{src_id}:{tgt_id}:{workspace}" for src_id, tgt_id in sorted(merged_edges)]
+
+    if merged_entities or merged_edges:
+        async with AsyncExitStack() as held_locks:
+            for lock_name in lock_names:
+                await held_locks.enter_async_context(_merge_lock_manager.get_or_create_lock(lock_name))
+
+            entity_vdb_data = {}
+            for entity_name in merged_entities:
+                node = await knowledge_graph_inst.get_node(entity_name)
+                if not node:
+                    continue
+                entity_vdb_data[compute_mdhash_id(entity_name, prefix="ent-", workspace=workspace)] = {
+                    "entity_name": entity_name,
+                    "entity_type": node.get("entity_type"),
+                    "content": f"{entity_name}\n{node.get('description', '')}",
+                    "source_id": node.get("source_id"),
+                    "file_path": node.get("file_path", "unknown_source"),
+                }
+
+            relationship_vdb_data = {}
+            for src_id, tgt_id in merged_edges:
+                edge = await knowledge_graph_inst.get_edge(src_id, tgt_id)
+                if not edge:
+                    continue
+                keywords = edge.get("keywords", "")
+                relationship_vdb_data[compute_mdhash_id(src_id + tgt_id, prefix="rel-", workspace=workspace)] = {
+                    "src_id": src_id,
+                    "tgt_id": tgt_id,
+                    "keywords": keywords,
+                    "content": f"{src_id}\t{tgt_id}\n{keywords}\n{edge.get('description', '')}",
+                    "source_id": edge.get("source_id"),
+                    "file_path": edge.get("file_path", "unknown_source"),
                 }
-                await relationships_vdb.upsert(vdb_data)
 
-            if edge_data is not None:
-                relation_count += 1
+            if entity_vdb_data:
+                await entity_vdb.upsert(entity_vdb_data)
+            if relationship_vdb_data:
+                await relationships_vdb.upsert(relationship_vdb_data)
 
     return {"entity_count": entity_count, "relation_count": relation_count}
 
@@ -646,7 +672,15 @@ async def extract_entities(
     example_number: int | None,
     llm_model_max_async: int,
     lightrag_logger: LightRAGLogger,
+    on_chunk_extracted: Callable[[tuple[dict, dict]], Awaitable[None]] | None = None,
 ) -> list:
+    """
+    Extract entities and relationships from all chunks concurrently.
+
+    on_chunk_extracted is awaited with the (nodes, edges) of each chunk as soon as it is
+    extracted, so callers can start merging before the last chunk is done. The returned
+    list still holds the results of all chunks in chunk order.
+    """
     ordered_chunks = list(chunks.items())
     if example_number and example_number < len(PROMPTS["entity_extraction_examples"]):
         examples = "\n".join(PROMPTS["entity_extraction_examples"][: int(example_number)])
@@ -769,6 +803,9 @@ async def extract_entities(
 
         lightrag_logger.log_extraction_progress(processed_chunks, total_chunks, entities_count, relations_count)
 
+        if on_chunk_extracted is not None:
+            await on_chunk_extracted((maybe_nodes, maybe_edges))
+
         # Return the extracted nodes and edges for centralized processing
         return maybe_nodes, maybe_edges
 
@@ -910,47 +947,33 @@ async def extract_keywords_only(
     This method does NOT build the final RAG context or provide a final answer.
     It ONLY extracts keywords (hl_keywords, ll_keywords).
     """
-    # 2. Build the examples
-    if example_number and example_number < len(PROMPTS["keywords_extraction_examples"]):
-        examples = "\n".join(PROMPTS["keywords_extraction_examples"][: int(example_number)])
-    else:
-        examples = "\n".join(PROMPTS["keywords_extraction_examples"])
-
-    # 3. Process conversation history
+    # 1. Process conversation history
     history_context = ""
     if param.conversation_history:
         history_context = get_conversation_turns(param.conversation_history, param.history_turns)
 
-    # 4. Build the keyword-extraction prompt
-    kw_prompt = PROMPTS["keywords_extraction"].format(
-        query=text, examples=examples, language=language, history=history_context
-    )
-
-    len_of_prompts = len(tokenizer.encode(kw_prompt))
-    logger.debug(f"[kg_query]Prompt Tokens: {len_of_prompts}")
-
-    # 5. Call the LLM for keyword extraction
+    # 2. Pick the LLM for keyword extraction
     if param.model_func:
         use_model_func = param.model_func
     else:
         use_model_func = llm_model_func
 
-    result = await use_model_func(kw_prompt, keyword_extraction=True)
+    async def _extract() -> tuple[list[str], list[str]]:
+        kw_prompt = build_keywords_prompt(text, language, history_context, example_number)
 
-    # 6. Parse out JSON from the LLM response
-    match = re.search(r"\{.*\}", result, re.DOTALL)
-    if not match:
-        logger.error("No JSON-like structure found in the LLM respond.")
-        return [], []
-    try:
-        keywords_data = json.loads(match.group(0))
-    except json.JSONDecodeError as e:
-        logger.error(f"JSON parsing error: {e}")
-        return [], []
+        len_of_prompts = len(tokenizer.encode(kw_prompt))
+        logger.debug(f"[kg_query]Prompt Tokens: {len_of_prompts}")
 
-    hl_keywords = keywords_data.get("high_level_keywords", [])
-    ll_keywords = keywords_data.get("low_level_keywords", [])
+        result = await use_model_func(kw_prompt, keyword_extraction=True)
+        return parse_keywords_response(result)
 
+    # 3. Share the extraction with other retrievers asking about the same question
+    model_name = getattr(use_model_func, "model_name", None)
+    if model_name is None:
+        return await _extract()
+    hl_keywords, ll_keywords = await query_keyword_cache.get_or_extract(
+        text, history_context, language, model_name, _extract
+    )
     return hl_keywords, ll_keywords
 
 
@@ -1031,6 +1054,92 @@ async def _get_vector_context(
         return [], [], []
 
 
+class _GraphQueryMemo:
+    """Per-query memo in front of the graph storage.
+
+    The local and global paths look up the same nodes, adjacency lists and edges several times
+    while assembling one context. Each batch method only asks the storage for keys it has not
+    fetched yet during this query; everything else is delegated to the storage.
+    """
+
+    def __init__(self, graph: BaseGraphStorage):
+        self._graph = graph
+        self._nodes: dict[str, dict | None] = {}
+        self._node_degrees: dict[str, int | None] = {}
+        self._node_edges: dict[str, list[tuple[str, str]] | None] = {}
+        self._edges: dict[tuple[str, str], dict | None] = {}
+        self._edge_degrees: dict[tuple[str, str], int | None] = {}
+
+    def __getattr__(self, name):
+        return getattr(self._graph, name)
+
+    @staticmethod
+    async def _fetch_missing(memo: dict, keys: list, fetch) -> dict:
+        missing = list(dict.fromkeys(k for k in keys if k not in memo))
+        if missing:
+            fetched = await fetch(missing)
+            for k in missing:
+                memo[k] = fetched.get(k)
+        return {k: memo[k] for k in keys if memo.get(k) is not None}
+
+    async def get_nodes_batch(self, node_ids: list[str]) -> dict[str, dict]:
+        return await self._fetch_missing(self._nodes, node_ids, self._graph.get_nodes_batch)
+
+    async def node_degrees_batch(self, node_ids: list[str]) -> dict[str, int]:
+        return await self._fetch_missing(self._node_degrees, node_ids, self._graph.node_degrees_batch)
+
+    async def get_nodes_edges_batch(self, node_ids: list[str]) -> dict[str, list[tuple[str, str]]]:
+        return await self._fetch_missing(self._node_edges, node_ids, self._graph.get_nodes_edges_batch)
+
+    async def get_edges_batch(self, pairs: list[dict[str, str]]) -> dict[tuple[str, str], dict]:
+        return await self._fetch_missing(
+            self._edges,
+            [(p["src"], p["tgt"]) for p in pairs],
+            lambda missing: self._graph.get_edges_batch([{"src": src, "tgt": tgt} for src, tgt in missing]),
+        )
+
+    async def edge_degrees_batch(self, edge_pairs: list[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        return await self._fetch_missing(self._edge_degrees, list(edge_pairs), self._graph.edge_degrees_batch)
+
+
+class _TextChunksQueryMemo:
+    """Per-query memo in front of the text chunk storage, fetching missing chunks with one get_by_ids"""
+
+    def __init__(self, text_chunks_db: BaseKVStorage):
+        self._db = text_chunks_db
+        self._chunks: dict[str, dict | None] = {}
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    async def get_chunks(self, chunk_ids: list[str]) -> dict[str, dict]:
+        """Get the chunks with the given ids that exist, keyed by chunk id"""
+        missing = list(dict.fromkeys(c_id for c_id in chunk_ids if c_id not in self._chunks))
+        if missing:
+            fetched = await self._db.get_by_ids(missing)
+            found = {chunk["id"]: chunk for chunk in fetched if chunk is not None and "id" in chunk}
+            for c_id in missing:
+                self._chunks[c_id] = found.get(c_id)
+        return {c_id: self._chunks[c_id] for c_id in chunk_ids if self._chunks.get(c_id) is not None}
+
+    async def get_by_ids(self, ids: list[str]) -> list[dict[str, Any]]:
+        chunks = await self.get_chunks(ids)
+        return [chunks[c_id] for c_id in dict.fromkeys(ids) if c_id in chunks]
+
+    async def get_by_id(self, id: str) -> dict[str, Any] | None:
+        return (await self.get_chunks([id])).get(id)
+
+
+async def _get_text_chunks(text_chunks_db: BaseKVStorage, chunk_ids: list[str]) -> dict[str, dict]:
+    """Fetch text chunks with a single storage lookup, keyed by chunk id"""
+    if not chunk_ids:
+        return {}
+    if isinstance(text_chunks_db, _TextChunksQueryMemo):
+        return await text_chunks_db.get_chunks(chunk_ids)
+    fetched = await text_chunks_db.get_by_ids(list(dict.fromkeys(chunk_ids)))
+    return {chunk["id"]: chunk for chunk in fetched if chunk is not None and "id" in chunk}
+
+
 async def _build_query_context_from_keywords(
     ll_keywords: str,
     hl_keywords: str,
@@ -1044,6 +1153,10 @@ async def _build_query_context_from_keywords(
 ):
     logger.info(f"Process {os.getpid()} building query context...")
 
+    # Graph nodes, edges and chunks are shared between the local and global paths of one query
+    knowledge_graph_inst = _GraphQueryMemo(knowledge_graph_inst)
+    text_chunks_db = _TextChunksQueryMemo(text_chunks_db)
+
     # Handle local and global modes as before
     if query_param.mode == "local":
         entities_context, relations_context, text_units_context = await _get_node_data(
@@ -1311,18 +1424,12 @@ async def _find_most_related_text_unit_from_entities(
                 all_text_units_lookup[c_id] = index
                 tasks.append((c_id, index, this_edges))
 
-    # Process in batches tasks at a time to avoid overwhelming resources
-    batch_size = 5
-    results = []
-
-    for i in range(0, len(tasks), batch_size):
-        batch_tasks = tasks[i : i + batch_size]
-        batch_results = await asyncio.gather(*[text_chunks_db.get_by_id(c_id) for c_id, _, _ in batch_tasks])
-        results.extend(batch_results)
+    # Fetch all chunks with one lookup
+    chunks = await _get_text_chunks(text_chunks_db, [c_id for c_id, _, _ in tasks])
 
-    for (c_id, index, this_edges), data in zip(tasks, results):
+    for c_id, index, this_edges in tasks:
         all_text_units_lookup[c_id] = {
-            "data": data,
+            "data": chunks.get(c_id),
             "order": index,
             "relation_counts": 0,
         }
@@ -1616,23 +1723,19 @@ async def _find_related_text_unit_from_relationships(
     ]
     all_text_units_lookup = {}
 
-    async def fetch_chunk_data(c_id, index):
-        if c_id not in all_text_units_lookup:
-            chunk_data = await text_chunks_db.get_by_id(c_id)
+    # Fetch all chunks with one lookup
+    chunks = await _get_text_chunks(text_chunks_db, [c_id for unit_list in text_units for c_id in unit_list])
+
+    for index, unit_list in enumerate(text_units):
+        for c_id in unit_list:
+            chunk_data = chunks.get(c_id)
             # Only store valid data
-            if chunk_data is not None and "content" in chunk_data:
+            if c_id not in all_text_units_lookup and chunk_data is not None and "content" in chunk_data:
                 all_text_units_lookup[c_id] = {
                     "data": chunk_data,
                     "order": index,
                 }
 
-    tasks = []
-    for index, unit_list in enumerate(text_units):
-        for c_id in unit_list:
-            tasks.append(fetch_chunk_data(c_id, index))
-
-    await asyncio.gather(*tasks)
-
     if not all_text_units_lookup:
         logger.warning("No valid text chunks found")
         return []
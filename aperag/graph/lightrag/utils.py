@@ -666,6 +666,15 @@ class LightRAGLogger:
         message = f"Chunk {current_chunk} of {total_chunks} extracted {entities_count} Ent + {relations_count} Rel"
         self.debug(message)
 
+    def log_merge_progress(
+        self, current_component: int, total_components: int, entities_count: int, relations_count: int
+    ):
+        """Log connected component merge progress."""
+        message = (
+            f"Component {current_component} of {total_components} merged {entities_count} Ent + {relations_count} Rel"
+        )
+        self.info(message)
+
     def log_entity_merge(
         self, entity_name: str, total_fragments: int, new_fragments: int, is_llm_summary: bool = False
     ):
@@ -13,23 +13,30 @@
 # limitations under the License.
 
 import asyncio
+import hashlib
 import logging
 import os
-from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import numpy
 
 from aperag.db.models import Collection
-from aperag.db.ops import db_ops
+from aperag.db.repositories.lightrag import HNSW_EF_SEARCH
 from aperag.graph.lightrag import LightRAG
 from aperag.graph.lightrag.prompt import PROMPTS
 from aperag.graph.lightrag.utils import EmbeddingFunc
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
+from aperag.llm.embed.embedding_memo import aembed_documents
 from aperag.llm.llm_error_types import (
     EmbeddingError,
     ProviderNotFoundError,
 )
+from aperag.llm.provider_cache import provider_config_cache
 from aperag.schema.utils import parseCollectionConfig
+from aperag.utils.single_flight import fail_future
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +49,18 @@ class LightRAGConfig:
     CHUNK_OVERLAP_TOKEN_SIZE = 100
     LLM_MODEL_MAX_ASYNC = 20
     COSINE_BETTER_THAN_THRESHOLD = 0.2
+    VECTOR_EF_SEARCH = HNSW_EF_SEARCH
     MAX_BATCH_SIZE = 32
     ENTITY_EXTRACT_MAX_GLEANING = 0
     SUMMARY_TO_MAX_TOKENS = 2000
     FORCE_LLM_SUMMARY_ON_MERGE = 10
+    MAX_PARALLEL_MERGE = 4
+    MERGE_STREAM_CHUNKS = 64
     EMBEDDING_MAX_TOKEN_SIZE = 8192
     DEFAULT_LANGUAGE = "simplified chinese"
+    # Initialized instances kept for graph search, and how long an unused one survives
+    POOL_MAX_SIZE = 32
+    POOL_IDLE_TTL = 600
 
 
 class LightRAGError(Exception):
@@ -104,11 +117,16 @@ async def create_lightrag_instance(collection: Collection) -> LightRAG:
                 func=embed_func,
             ),
             cosine_better_than_threshold=LightRAGConfig.COSINE_BETTER_THAN_THRESHOLD,
+            vector_db_storage_cls_kwargs=(
+                {"ef_search": LightRAGConfig.VECTOR_EF_SEARCH} if vector_storage == "PGOpsSyncVectorStorage" else {}
+            ),
             max_batch_size=LightRAGConfig.MAX_BATCH_SIZE,
             llm_model_max_async=LightRAGConfig.LLM_MODEL_MAX_ASYNC,
             entity_extract_max_gleaning=LightRAGConfig.ENTITY_EXTRACT_MAX_GLEANING,
             summary_to_max_tokens=LightRAGConfig.SUMMARY_TO_MAX_TOKENS,
             force_llm_summary_on_merge=LightRAGConfig.FORCE_LLM_SUMMARY_ON_MERGE,
+            max_parallel_merge=LightRAGConfig.MAX_PARALLEL_MERGE,
+            merge_stream_chunks=LightRAGConfig.MERGE_STREAM_CHUNKS,
             language=language,
             entity_types=entity_types,
             kv_storage=kv_storage,
@@ -124,6 +142,143 @@ async def create_lightrag_instance(collection: Collection) -> LightRAG:
         raise LightRAGError(f"Failed to create LightRAG instance: {str(e)}") from e
 
 
+class _PooledLightRAG:
+    def __init__(self, config_key: str, rag: LightRAG):
+        self.config_key = config_key
+        self.rag = rag
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.evicted = False
+
+
+class LightRAGPool:
+    """
+    Bounded LRU pool of initialized LightRAG instances for query-time use.
+
+    Instances are keyed by collection id and a hash of everything they are built from, so
+    a changed collection or provider configuration gets a fresh instance. Evicted instances
+    have their storages finalized as soon as no query is using them anymore.
+    """
+
+    def __init__(self, max_size: int = LightRAGConfig.POOL_MAX_SIZE, idle_ttl: float = LightRAGConfig.POOL_IDLE_TTL):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._entries: "OrderedDict[str, _PooledLightRAG]" = OrderedDict()
+        self._creating: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @asynccontextmanager
+    async def lease(self, collection: Collection) -> AsyncIterator[LightRAG]:
+        """Borrow the pooled LightRAG instance of a collection for the duration of the block"""
+        entry = await self._acquire(collection)
+        try:
+            yield entry.rag
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            if entry.evicted and entry.in_use == 0:
+                await self._finalize(entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._stats.copy()
+        total = stats["hits"] + stats["misses"]
+        stats["size"] = len(self._entries)
+        stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+        return stats
+
+    async def close(self):
+        """Finalize every pooled instance, used on shutdown"""
+        entries = list(self._entries.values())
+        self._entries.clear()
+        for entry in entries:
+            entry.evicted = True
+            if entry.in_use == 0:
+                await self._finalize(entry)
+
+    async def _acquire(self, collection: Collection) -> _PooledLightRAG:
+        collection_id = str(collection.id)
+        config_key = _lightrag_config_key(collection)
+        await self._evict_idle()
+
+        entry = self._entries.get(collection_id)
+        if entry is not None and entry.config_key == config_key:
+            self._entries.move_to_end(collection_id)
+            self._stats["hits"] += 1
+            entry.in_use += 1
+            return entry
+
+        # Concurrent misses for the same instance wait for a single creation
+        creating_key = (collection_id, config_key)
+        future = self._creating.get(creating_key)
+        if future is not None:
+            entry = await asyncio.shield(future)
+            self._stats["hits"] += 1
+            entry.in_use += 1
+            return entry
+
+        self._stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._creating[creating_key] = future
+        try:
+            entry = _PooledLightRAG(config_key, await create_lightrag_instance(collection))
+        except BaseException as e:
+            fail_future(future, e)
+            raise
+        finally:
+            self._creating.pop(creating_key, None)
+
+        entry.in_use += 1
+        future.set_result(entry)
+        stale = self._entries.pop(collection_id, None)
+        if stale is not None:
+            await self._evict(stale)
+        self._entries[collection_id] = entry
+        while len(self._entries) > self.max_size:
+            _, oldest = self._entries.popitem(last=False)
+            await self._evict(oldest)
+        return entry
+
+    async def _evict_idle(self):
+        deadline = time.monotonic() - self.idle_ttl
+        idle = [
+            collection_id
+            for collection_id, entry in self._entries.items()
+            if entry.in_use == 0 and entry.last_used < deadline
+        ]
+        for collection_id in idle:
+            await self._evict(self._entries.pop(collection_id))
+
+    async def _evict(self, entry: _PooledLightRAG):
+        entry.evicted = True
+        self._stats["evictions"] += 1
+        if entry.in_use == 0:
+            await self._finalize(entry)
+
+    async def _finalize(self, entry: _PooledLightRAG):
+        try:
+            await entry.rag.finalize_storages()
+        except Exception as e:
+            logger.warning(f"Failed to finalize pooled LightRAG instance for workspace {entry.rag.workspace}: {e}")
+
+
+def _lightrag_config_key(collection: Collection) -> str:
+    """Hash of everything create_lightrag_instance builds an instance from"""
+    parts = [
+        collection.config or "",
+        str(collection.user),
+        os.environ.get("GRAPH_INDEX_KV_STORAGE") or "",
+        os.environ.get("GRAPH_INDEX_VECTOR_STORAGE") or "",
+        os.environ.get("GRAPH_INDEX_GRAPH_STORAGE") or "",
+        # Provider configuration changes invalidate the embedding and LLM functions
+        str(provider_config_cache.version),
+    ]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+# Global pool of LightRAG instances used by graph search
+lightrag_pool = LightRAGPool()
+
+
 # --- Celery Support Functions ---
 
 
@@ -256,7 +411,8 @@ async def _gen_embed_func(
         embedding_svc, dim = get_collection_embedding_service_sync(collection)
 
         async def embed_func(texts: list[str]) -> numpy.ndarray:
-            embeddings = await embedding_svc.aembed_documents(texts)
+            # Inside a flow execution, query texts are shared with the other retrievers
+            embeddings = await aembed_documents(embedding_svc, texts)
             return numpy.array(embeddings)
 
         return embed_func, dim
@@ -274,12 +430,12 @@ async def _gen_llm_func(collection: Collection) -> Callable[..., Awaitable[str]]
     try:
         config = parseCollectionConfig(collection.config)
         llm_provider_name = config.completion.model_service_provider
-        api_key = db_ops.query_provider_api_key(llm_provider_name, collection.user)
+        api_key = provider_config_cache.get_api_key(llm_provider_name, collection.user)
         if not api_key:
             raise Exception(f"API KEY not found for LLM Provider:{llm_provider_name}")
 
         # Get base_url from LLMProvider
-        llm_provider = db_ops.query_llm_provider_by_name(llm_provider_name)
+        llm_provider = provider_config_cache.get_provider(llm_provider_name)
         base_url = llm_provider.base_url
 
         async def llm_func(
@@ -291,13 +447,24 @@ async def _gen_llm_func(collection: Collection) -> Callable[..., Awaitable[str]]
         ) -> str:
             from aperag.llm.completion.completion_service import CompletionService
 
-            completion_service = CompletionService(
-                provider=config.completion.custom_llm_provider,
-                model=config.completion.model,
-                base_url=base_url,
-                api_key=api_key,
-                temperature=config.completion.temperature,
-                max_tokens=max_tokens,
+            completion_service = provider_config_cache.get_service(
+                (
+                    "completion",
+                    config.completion.custom_llm_provider,
+                    config.completion.model,
+                    base_url,
+                    api_key,
+                    config.completion.temperature,
+                    max_tokens,
+                ),
+                lambda: CompletionService(
+                    provider=config.completion.custom_llm_provider,
+                    model=config.completion.model,
+                    base_url=base_url,
+                    api_key=api_key,
+                    temperature=config.completion.temperature,
+                    max_tokens=max_tokens,
+                ),
             )
 
             messages = []
@@ -312,6 +479,8 @@ async def _gen_llm_func(collection: Collection) -> Callable[..., Awaitable[str]]
 
             return full_response
 
+        # Lets keyword extraction share its results with other retrievers asking the same question
+        llm_func.model_name = f"{llm_provider_name}/{config.completion.model}"
         return llm_func
 
     except Exception as e:
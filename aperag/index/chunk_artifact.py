@@ -0,0 +1,177 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared chunk artifact for "chunk once, index many".
+
+The vector and fulltext indexers both rechunk the same doc_parts with the same tokenizer,
+chunk_size and overlap. The parse stage runs ``rechunk()`` once and stores the result in the
+object store; index tasks load it instead of tokenizing and splitting the document again.
+
+The artifact key is a hash over the input parts and the chunking parameters, so a changed
+document, a changed chunk size or a new artifact format version always produces a new artifact.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from aperag.config import settings
+from aperag.docparser.base import Part
+from aperag.docparser.chunking import rechunk
+from aperag.utils.tokenizer import get_default_tokenizer, get_default_tokenizer_name
+
+logger = logging.getLogger(__name__)
+
+# Bump when the chunking algorithm or the artifact layout changes
+CHUNK_ARTIFACT_VERSION = 1
+
+
+@dataclass
+class ChunkArtifact:
+    """Rechunked text parts together with the parameters that produced them"""
+
+    key: str
+    chunk_size: int
+    chunk_overlap: int
+    tokenizer: str
+    chunks: List[Part] = field(default_factory=list)
+    version: int = CHUNK_ARTIFACT_VERSION
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                "version": self.version,
+                "key": self.key,
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap,
+                "tokenizer": self.tokenizer,
+                "chunks": [{"content": c.content, "metadata": c.metadata} for c in self.chunks],
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ChunkArtifact":
+        raw = json.loads(data)
+        return cls(
+            key=raw["key"],
+            chunk_size=raw["chunk_size"],
+            chunk_overlap=raw["chunk_overlap"],
+            tokenizer=raw["tokenizer"],
+            chunks=[Part(content=c["content"], metadata=c["metadata"]) for c in raw["chunks"]],
+            version=raw["version"],
+        )
+
+
+def _text_parts(doc_parts: List[Any]) -> List[Any]:
+    return [part for part in doc_parts if hasattr(part, "content") and part.content]
+
+
+def _part_fingerprint(part: Any) -> Dict[str, Any]:
+    # Token counts are cached in metadata by the rechunker and must not affect the key
+    metadata = {k: v for k, v in (getattr(part, "metadata", None) or {}).items() if k != "tokens"}
+    return {"content": part.content, "level": getattr(part, "level", None), "metadata": metadata}
+
+
+def chunk_artifact_key(doc_parts: List[Any], chunk_size: int, chunk_overlap: int, tokenizer: str) -> str:
+    """Compute the artifact key from the document parts and chunking parameters"""
+    h = hashlib.sha256()
+    h.update(f"v{CHUNK_ARTIFACT_VERSION}:{chunk_size}:{chunk_overlap}:{tokenizer}".encode("utf-8"))
+    for part in _text_parts(doc_parts):
+        h.update(json.dumps(_part_fingerprint(part), sort_keys=True, default=str, ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+
+def chunk_artifact_path(object_store_base_path: str, key: str) -> str:
+    return f"{object_store_base_path}/chunks/{key}.json"
+
+
+def build_chunk_artifact(
+    doc_parts: List[Any], chunk_size: int = None, chunk_overlap: int = None, key: str = None
+) -> ChunkArtifact:
+    """Rechunk the text parts of a document"""
+    chunk_size = chunk_size or settings.chunk_size
+    chunk_overlap = chunk_overlap or settings.chunk_overlap_size
+    tokenizer_name = get_default_tokenizer_name()
+    key = key or chunk_artifact_key(doc_parts, chunk_size, chunk_overlap, tokenizer_name)
+
+    chunks = rechunk(_text_parts(doc_parts), chunk_size, chunk_overlap, get_default_tokenizer(), incremental=True)
+    return ChunkArtifact(
+        key=key, chunk_size=chunk_size, chunk_overlap=chunk_overlap, tokenizer=tokenizer_name, chunks=chunks
+    )
+
+
+def save_chunk_artifact(doc_parts: List[Any], object_store_base_path: str) -> str:
+    """
+    Build the chunk artifact for a document and store it in the object store.
+
+    The artifact is reused as-is when one with the same key already exists.
+
+    Returns:
+        The object store path of the artifact
+    """
+    from aperag.objectstore.base import get_object_store
+
+    chunk_size = settings.chunk_size
+    chunk_overlap = settings.chunk_overlap_size
+    key = chunk_artifact_key(doc_parts, chunk_size, chunk_overlap, get_default_tokenizer_name())
+    path = chunk_artifact_path(object_store_base_path, key)
+
+    obj_store = get_object_store()
+    if obj_store.obj_exists(path):
+        logger.info(f"Reusing chunk artifact {path}")
+        return path
+
+    artifact = build_chunk_artifact(doc_parts, chunk_size, chunk_overlap, key=key)
+    # Old artifacts of this document are stale now
+    obj_store.delete_objects_by_prefix(f"{object_store_base_path}/chunks/")
+    data = artifact.to_bytes()
+    obj_store.put(path, data)
+    logger.info(f"Saved chunk artifact with {len(artifact.chunks)} chunks to {path}, size: {len(data)}")
+    return path
+
+
+def load_chunk_artifact(path: Optional[str]) -> Optional[ChunkArtifact]:
+    """
+    Load a chunk artifact, returning None if it is missing, unreadable, or was produced
+    with chunking parameters other than the current settings.
+    """
+    if not path:
+        return None
+
+    from aperag.objectstore.base import get_object_store
+
+    try:
+        stream = get_object_store().get(path)
+        if stream is None:
+            logger.warning(f"Chunk artifact {path} not found")
+            return None
+        with stream:
+            artifact = ChunkArtifact.from_bytes(stream.read())
+    except Exception as e:
+        logger.warning(f"Failed to load chunk artifact {path}: {e}")
+        return None
+
+    if (
+        artifact.version != CHUNK_ARTIFACT_VERSION
+        or artifact.chunk_size != settings.chunk_size
+        or artifact.chunk_overlap != settings.chunk_overlap_size
+        or artifact.tokenizer != get_default_tokenizer_name()
+    ):
+        logger.info(f"Chunk artifact {path} was built with different chunking parameters, ignoring it")
+        return None
+    return artifact
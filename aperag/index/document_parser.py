@@ -12,16 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import atexit
+import hashlib
 import io
 import logging
 import mimetypes
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import pikepdf
 import pypdfium2 as pdfium
 
-from aperag.docparser.base import AssetBinPart, MarkdownPart, PdfPart
+from aperag.config import settings
+from aperag.docparser.base import AssetBinPart, AssetRefPart, MarkdownPart, Part, PdfPart
 from aperag.docparser.doc_parser import DocParser
 from aperag.objectstore.base import get_object_store
 
@@ -32,6 +42,75 @@ def is_image_file(suffix_name: str) -> bool:
     return suffix_name.lower() in [".jpg", ".jpeg", ".png", ".bmp", ".tiff", ".tif"]
 
 
+def _render_page_png(pdf_doc: pdfium.PdfDocument, page_idx: int, scale: float) -> bytes:
+    page = pdf_doc[page_idx]
+    try:
+        image = page.render(scale=scale).to_pil()
+        with io.BytesIO() as buffer:
+            image.save(buffer, format="PNG")
+            return buffer.getvalue()
+    finally:
+        page.close()
+
+
+# PDFs opened by a render worker process, kept open across the pages of a document. A worker
+# serves the pages of several documents rendered at the same time, so a few stay open.
+_worker_pdfs: "OrderedDict[tuple, pdfium.PdfDocument]" = OrderedDict()
+_WORKER_MAX_OPEN_PDFS = 4
+
+
+def _render_page_png_in_worker(pdf_path: str, page_idx: int, scale: float) -> bytes:
+    stat = os.stat(pdf_path)
+    # Temporary paths may be reused by a later document, the inode and mtime tell them apart
+    key = (pdf_path, stat.st_ino, stat.st_mtime_ns)
+    pdf_doc = _worker_pdfs.get(key)
+    if pdf_doc is None:
+        pdf_doc = pdfium.PdfDocument(pdf_path)
+        _worker_pdfs[key] = pdf_doc
+        while len(_worker_pdfs) > _WORKER_MAX_OPEN_PDFS:
+            _worker_pdfs.popitem(last=False)[1].close()
+    _worker_pdfs.move_to_end(key)
+    return _render_page_png(pdf_doc, page_idx, scale)
+
+
+@atexit.register
+def _close_worker_pdfs():
+    # Runs before pdfium's own exit handler, which was registered earlier at import
+    while _worker_pdfs:
+        _worker_pdfs.popitem()[1].close()
+
+
+# Render processes shared by all documents parsed in this process, created on first use.
+# Celery runs tasks in threads, so one pool bounds the render processes of all of them.
+_render_executor: Optional[ProcessPoolExecutor] = None
+_render_executor_lock = threading.Lock()
+
+
+def _get_render_executor() -> ProcessPoolExecutor:
+    global _render_executor
+    with _render_executor_lock:
+        if _render_executor is None:
+            # Forking a process that runs other threads can copy locks they hold and deadlock
+            # the child, spawned workers start from a clean interpreter instead
+            _render_executor = ProcessPoolExecutor(
+                max_workers=_get_render_pool_size(), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_executor
+
+
+def _discard_render_executor(executor: ProcessPoolExecutor):
+    """Drop a broken pool, the next document starts a new one"""
+    global _render_executor
+    with _render_executor_lock:
+        if _render_executor is executor:
+            _render_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_render_pool_size() -> int:
+    return settings.pdf_render_workers or min(4, os.cpu_count() or 1)
+
+
 class DocumentParsingResult:
     """Result of document parsing operation"""
 
@@ -48,7 +127,11 @@ class DocumentParser:
     MAX_EXTRACTED_SIZE = 5000 * 1024 * 1024  # 5 GB
 
     def parse_document(
-        self, filepath: str, file_metadata: Dict[str, Any], parser_config: Optional[Dict[str, Any]] = None
+        self,
+        filepath: str,
+        file_metadata: Dict[str, Any],
+        parser_config: Optional[Dict[str, Any]] = None,
+        object_store_base_path: Optional[str] = None,
     ) -> List[Any]:
         """
         Parse document into parts using DocParser.
@@ -57,9 +140,10 @@ class DocumentParser:
             filepath: Path to the document file
             file_metadata: Metadata associated with the document
             parser_config: Configuration for the parser
+            object_store_base_path: Where rendered PDF pages are stored, if None they are kept in memory
 
         Returns:
-            List of document parts (MarkdownPart, AssetBinPart, etc.)
+            List of document parts (MarkdownPart, AssetBinPart, AssetRefPart, etc.)
 
         Raises:
             ValueError: If the file type is unsupported
@@ -103,41 +187,117 @@ class DocumentParser:
             # Convert PdfPart to image assets
             pdf_parts = [p for p in parts if isinstance(p, PdfPart)]
             for pdf_part in pdf_parts:
+                page_count = 0
                 try:
-                    pdf_doc = pdfium.PdfDocument(pdf_part.data)
-                    for i, page in enumerate(pdf_doc):
-                        # Render page to a PIL image
-                        image = page.render(scale=1).to_pil()
-                        # Save image to a bytes buffer
-                        with io.BytesIO() as buffer:
-                            image.save(buffer, format="PNG")
-                            image_data = buffer.getvalue()
-
-                        # Create a new AssetBinPart for each page
-                        metadata = file_metadata.copy()
-                        metadata.update(
-                            {
-                                "page_idx": i,
-                                "converted_from": "pdf",
-                                "vision_index": True,
-                            }
-                        )
-                        asset_id = f"page_{i}.png"
-                        asset_part = AssetBinPart(
-                            asset_id=asset_id,
-                            data=image_data,
-                            metadata=metadata,
-                            mime_type="image/png",
-                        )
+                    for asset_part in self.render_pdf_pages(pdf_part.data, file_metadata, object_store_base_path):
                         parts.append(asset_part)
-
-                    logger.info(f"Converted {len(pdf_doc)} pages from a PDF part to image assets.")
+                        page_count += 1
+                    logger.info(f"Converted {page_count} pages from a PDF part to image assets.")
                 except Exception as e:
                     logger.warning(f"Failed to convert PDF part to images: {e}", exc_info=True)
 
         logger.info(f"Parsed document {filepath} into {len(parts)} parts")
         return parts
 
+    def render_pdf_pages(
+        self, pdf_data: bytes, file_metadata: Dict[str, Any], object_store_base_path: Optional[str] = None
+    ) -> Iterator[Part]:
+        """
+        Lazily render PDF pages to PNG assets, in page order.
+
+        Pages are rendered at PDF_RENDER_DPI, up to PDF_RENDER_MAX_PAGES pages if it is set, by
+        a pool of PDF_RENDER_WORKERS spawned processes shared by all documents parsed in this
+        process. Pages are submitted only while the estimated bitmap size of the pages in flight
+        stays within PDF_RENDER_MEMORY_BUDGET. When object_store_base_path is given, every page
+        is written to the object store as soon as it is rendered and an AssetRefPart is yielded
+        instead of an AssetBinPart holding the bytes.
+        """
+        scale = settings.pdf_render_dpi / 72
+        pdf_doc = pdfium.PdfDocument(pdf_data)
+        try:
+            page_count = len(pdf_doc)
+            max_pages = settings.pdf_render_max_pages
+            if max_pages > 0 and page_count > max_pages:
+                logger.warning(f"PDF has {page_count} pages, only the first {max_pages} are rendered")
+                page_count = max_pages
+
+            workers = self._get_render_workers(page_count)
+            if workers <= 1:
+                for page_idx in range(page_count):
+                    image_data = _render_page_png(pdf_doc, page_idx, scale)
+                    yield self._make_page_asset(page_idx, image_data, file_metadata, object_store_base_path)
+                return
+
+            # Raw bitmap size of each page, a bound for the memory a page takes while rendering
+            page_bytes = []
+            for page_idx in range(page_count):
+                width, height = pdf_doc.get_page_size(page_idx)
+                page_bytes.append(int(width * scale) * int(height * scale) * 4)
+        finally:
+            pdf_doc.close()
+
+        budget = settings.pdf_render_memory_budget
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Workers open the PDF from disk instead of receiving its bytes with every page
+            pdf_path = os.path.join(tmpdir, "document.pdf")
+            with open(pdf_path, "wb") as f:
+                f.write(pdf_data)
+
+            executor = _get_render_executor()
+            pending = deque()
+            in_flight_bytes = 0
+            next_idx = 0
+            try:
+                while next_idx < page_count or pending:
+                    while (
+                        next_idx < page_count
+                        and len(pending) < workers * 2
+                        and (not pending or in_flight_bytes + page_bytes[next_idx] <= budget)
+                    ):
+                        future = executor.submit(_render_page_png_in_worker, pdf_path, next_idx, scale)
+                        pending.append((next_idx, future))
+                        in_flight_bytes += page_bytes[next_idx]
+                        next_idx += 1
+
+                    page_idx, future = pending.popleft()
+                    image_data = future.result()
+                    in_flight_bytes -= page_bytes[page_idx]
+                    yield self._make_page_asset(page_idx, image_data, file_metadata, object_store_base_path)
+            except BrokenProcessPool:
+                _discard_render_executor(executor)
+                raise
+            finally:
+                # The pool outlives this document, pages nobody will read must not keep it busy
+                for _, future in pending:
+                    future.cancel()
+
+    def _get_render_workers(self, page_count: int) -> int:
+        workers = _get_render_pool_size()
+        if multiprocessing.current_process().daemon:
+            # Daemonic processes are not allowed to have children
+            return 1
+        return max(1, min(workers, page_count))
+
+    def _make_page_asset(
+        self, page_idx: int, image_data: bytes, file_metadata: Dict[str, Any], object_store_base_path: Optional[str]
+    ) -> Part:
+        metadata = file_metadata.copy()
+        metadata.update(
+            {
+                "page_idx": page_idx,
+                "converted_from": "pdf",
+                "vision_index": True,
+                "content_hash": hashlib.sha256(image_data).hexdigest(),
+            }
+        )
+        asset_id = f"page_{page_idx}.png"
+        if object_store_base_path is None:
+            return AssetBinPart(asset_id=asset_id, data=image_data, metadata=metadata, mime_type="image/png")
+
+        path = f"{object_store_base_path}/assets/{asset_id}"
+        get_object_store().put(path, image_data)
+        return AssetRefPart(asset_id=asset_id, path=path, metadata=metadata, mime_type="image/png")
+
     def linearize_pdf(self, data: bytes) -> bytes:
         with pikepdf.open(io.BytesIO(data)) as pdf:
             with io.BytesIO() as buffer:
@@ -256,7 +416,7 @@ class DocumentParser:
         """
         try:
             # Parse document into parts
-            doc_parts = self.parse_document(filepath, file_metadata, parser_config)
+            doc_parts = self.parse_document(filepath, file_metadata, parser_config, object_store_base_path)
 
             # Save processed content and assets to object storage
             content = self.save_processed_content_and_assets(doc_parts, object_store_base_path)
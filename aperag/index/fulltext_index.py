@@ -12,19 +12,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import logging
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from elasticsearch import AsyncElasticsearch, Elasticsearch
+from elasticsearch.helpers import streaming_bulk
 
 from aperag.config import settings
 from aperag.db.ops import db_ops
 from aperag.docparser.chunking import rechunk
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
 from aperag.llm.completion.completion_service import CompletionService
+from aperag.llm.keyword_extraction import build_keywords_prompt, parse_keywords_response, query_keyword_cache
+from aperag.llm.provider_cache import provider_config_cache
 from aperag.query.query import DocumentWithScore
 from aperag.utils.tokenizer import get_default_tokenizer
 from aperag.utils.utils import generate_fulltext_index_name
@@ -68,33 +70,58 @@ class FulltextIndexer(BaseIndexer):
         return chunk_content, title_text, chunk_metadata
 
     def _process_chunks(
-        self, document_id: int, doc_parts: List[Any], document_name: str, index_name: str
+        self,
+        document_id: int,
+        doc_parts: List[Any],
+        document_name: str,
+        index_name: str,
+        chunked_parts: Optional[List[Any]] = None,
     ) -> Tuple[int, int]:
-        """Process and insert all chunks for a document. Returns (chunk_count, total_content_length)"""
-        chunk_count = 0
-        total_content_length = 0
-
-        chunk_size = settings.chunk_size
-        chunk_overlap_size = settings.chunk_overlap_size
-        tokenizer = get_default_tokenizer()
-
-        # Rechunk the document parts (resulting in text parts)
+        """Process and bulk insert all chunks for a document. Returns (chunk_count, total_content_length)"""
+        # Rechunk the document parts (resulting in text parts) unless the shared chunks are given
         # After rechunk(), parts only contains TextPart
-        chunked_parts = rechunk(doc_parts, chunk_size, chunk_overlap_size, tokenizer)
-
-        for chunk_idx, part in enumerate(chunked_parts):
-            chunk_content, title_text, chunk_metadata = self._extract_chunk_data(part)
-            if not chunk_content:
-                continue
+        if chunked_parts is None:
+            chunk_size = settings.chunk_size
+            chunk_overlap_size = settings.chunk_overlap_size
+            tokenizer = get_default_tokenizer()
+            chunked_parts = rechunk(doc_parts, chunk_size, chunk_overlap_size, tokenizer)
+
+        if not self.es.indices.exists(index=index_name).body:
+            logger.warning("index %s not exists", index_name)
+            return 0, 0
+
+        stats = {"chunk_count": 0, "total_content_length": 0}
+
+        def generate_actions():
+            for chunk_idx, part in enumerate(chunked_parts):
+                chunk_content, title_text, chunk_metadata = self._extract_chunk_data(part)
+                if not chunk_content:
+                    continue
+
+                chunk_id = f"{document_id}_{chunk_idx}"
+                stats["chunk_count"] += 1
+                stats["total_content_length"] += len(chunk_content)
+                yield {
+                    "_index": index_name,
+                    "_id": chunk_id,
+                    "_source": self._build_chunk_doc(
+                        chunk_id, document_id, document_name, chunk_content, title_text, chunk_metadata
+                    ),
+                }
 
-            chunk_id = f"{document_id}_{chunk_idx}"
-            self._insert_chunk(
-                index_name, chunk_id, document_id, document_name, chunk_content, title_text, chunk_metadata
+        failed_chunks = self._bulk_insert_chunks(generate_actions())
+        if failed_chunks:
+            details = "; ".join(f"{chunk_id}: {error}" for chunk_id, error in list(failed_chunks.items())[:5])
+            raise Exception(
+                f"{len(failed_chunks)} of {stats['chunk_count']} chunks failed to index for document "
+                f"{document_id} ({details})"
             )
-            chunk_count += 1
-            total_content_length += len(chunk_content)
 
-        return chunk_count, total_content_length
+        # Make the whole document searchable at once instead of refreshing per request
+        if settings.es_bulk_refresh and stats["chunk_count"] > 0:
+            self.es.indices.refresh(index=index_name)
+
+        return stats["chunk_count"], stats["total_content_length"]
 
     def _create_success_result(
         self,
@@ -136,7 +163,9 @@ class FulltextIndexer(BaseIndexer):
                 raise Exception(f"Document {document_id} not found")
 
             index_name = generate_fulltext_index_name(collection.id)
-            chunk_count, total_content_length = self._process_chunks(document_id, doc_parts, document.name, index_name)
+            chunk_count, total_content_length = self._process_chunks(
+                document_id, doc_parts, document.name, index_name, kwargs.get("chunks")
+            )
 
             logger.info(f"Fulltext index created for document {document_id} with {chunk_count} chunks")
             return self._create_success_result(index_name, document.name, chunk_count, total_content_length, "created")
@@ -169,7 +198,7 @@ class FulltextIndexer(BaseIndexer):
             # Create new chunks if there are doc_parts
             if doc_parts:
                 chunk_count, total_content_length = self._process_chunks(
-                    document_id, doc_parts, document.name, index_name
+                    document_id, doc_parts, document.name, index_name, kwargs.get("chunks")
                 )
                 logger.info(f"Fulltext index updated for document {document_id} with {chunk_count} chunks")
                 return self._create_success_result(
@@ -226,22 +255,17 @@ class FulltextIndexer(BaseIndexer):
             logger.error(f"Failed to remove chunks for document {doc_id} from index {index}: {str(e)}")
             return 0
 
-    def _insert_chunk(
+    def _build_chunk_doc(
         self,
-        index: str,
         chunk_id: str,
         doc_id: int,
         doc_name: str,
         content: str,
         title_text: str = "",
         metadata: Dict[str, Any] = None,
-    ):
-        """Insert a document chunk into the fulltext index"""
-        if not self.es.indices.exists(index=index).body:
-            logger.warning("index %s not exists", index)
-            return
-
-        doc = {
+    ) -> Dict[str, Any]:
+        """Build the ES source document of a chunk"""
+        return {
             "document_id": doc_id,
             "chunk_id": chunk_id,
             "name": doc_name,
@@ -249,7 +273,33 @@ class FulltextIndexer(BaseIndexer):
             "title": title_text,
             "metadata": metadata or {},
         }
-        self.es.index(index=index, id=chunk_id, document=doc)
+
+    def _bulk_insert_chunks(self, actions: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Stream index actions through the _bulk API in batches bounded by ES_BULK_CHUNK_SIZE
+        and ES_BULK_MAX_BYTES. Requests rejected with 429 are retried with backoff.
+
+        Returns:
+            Mapping of chunk_id to error for every chunk that failed to index
+        """
+        failed_chunks = {}
+        for ok, item in streaming_bulk(
+            self.es,
+            actions,
+            chunk_size=settings.es_bulk_chunk_size,
+            max_chunk_bytes=settings.es_bulk_max_bytes,
+            max_retries=settings.es_max_retries,
+            raise_on_error=False,
+            raise_on_exception=False,
+            yield_ok=False,
+        ):
+            if ok:
+                continue
+            info = next(iter(item.values()))
+            chunk_id = info.get("_id", "")
+            failed_chunks[chunk_id] = str(info.get("error", "unknown error"))
+            logger.warning(f"Failed to index chunk {chunk_id}: {failed_chunks[chunk_id]}")
+        return failed_chunks
 
     async def search_document(
         self, index: str, keywords: List[str], topk=3, chat_id: str = None
@@ -375,7 +425,7 @@ class IKKeywordExtractor(KeywordExtractor):
 
 
 class LLMKeywordExtractor(KeywordExtractor):
-    """Extract keywords from text using LLM with tool calling for stable output format"""
+    """Extract keywords from text using LLM, sharing the extraction with graph search"""
 
     def __init__(self, ctx: Dict[str, Any]):
         super().__init__(ctx)
@@ -389,7 +439,7 @@ class LLMKeywordExtractor(KeywordExtractor):
                 return None
 
             # Get provider information from database
-            llm_provider = db_ops.query_llm_provider_by_name(settings.llm_keyword_extraction_provider)
+            llm_provider = provider_config_cache.get_provider(settings.llm_keyword_extraction_provider)
             if not llm_provider:
                 logger.warning(f"LLM provider '{settings.llm_keyword_extraction_provider}' not found")
                 return None
@@ -399,7 +449,7 @@ class LLMKeywordExtractor(KeywordExtractor):
             if not user_id:
                 logger.warning("User ID not available in context for LLM keyword extraction")
                 return None
-            api_key = db_ops.query_provider_api_key(
+            api_key = provider_config_cache.get_api_key(
                 settings.llm_keyword_extraction_provider, user_id=user_id, need_public=True
             )
             if not api_key:
@@ -407,11 +457,15 @@ class LLMKeywordExtractor(KeywordExtractor):
                 return None
 
             # Create completion service
-            return CompletionService(
-                provider=llm_provider.completion_dialect or "openai",
-                model=settings.llm_keyword_extraction_model,
-                base_url=llm_provider.base_url,
-                api_key=api_key,
+            provider = llm_provider.completion_dialect or "openai"
+            return provider_config_cache.get_service(
+                ("completion", provider, settings.llm_keyword_extraction_model, llm_provider.base_url, api_key),
+                lambda: CompletionService(
+                    provider=provider,
+                    model=settings.llm_keyword_extraction_model,
+                    base_url=llm_provider.base_url,
+                    api_key=api_key,
+                ),
             )
 
         except Exception as e:
@@ -419,78 +473,32 @@ class LLMKeywordExtractor(KeywordExtractor):
             return None
 
     async def extract(self, text: str) -> List[str]:
-        """Extract keywords using LLM with structured JSON output"""
+        """Extract keywords using the keyword extraction shared with graph search"""
         if not self.completion_service:
             raise Exception("LLM completion service not available")
 
-        prompt = f"""Extract the most important keywords from the following text. Focus on:
-1. Nouns, verbs, and adjectives that capture the main concepts
-2. Remove stop words and meaningless terms
-3. Keywords should be in the same language as the input text
-
-Text: {text}
-
-Please respond with ONLY a JSON object in the following format:
-{{"keywords": ["keyword1", "keyword2", "keyword3", ...]}}
-
-Do not include any other text or explanation, just the JSON object."""
+        language = self.ctx.get("language") or ""
+        model_name = f"{settings.llm_keyword_extraction_provider}/{settings.llm_keyword_extraction_model}"
 
-        try:
+        async def _extract():
+            prompt = build_keywords_prompt(text, language)
             response = await self.completion_service.agenerate([], prompt)
+            return parse_keywords_response(response)
 
-            # Try to extract and parse JSON from response
-            keywords = self._parse_json_response(response)
-            if keywords:
-                return keywords[:10]  # Limit to 10 keywords
-
-            # Fallback to simple parsing if JSON parsing failed
-            logger.warning("JSON parsing failed, falling back to simple parsing")
-            return self._parse_keywords_fallback(response)
-
+        try:
+            hl_keywords, ll_keywords = await query_keyword_cache.get_or_extract(
+                text, "", language, model_name, _extract
+            )
         except Exception as e:
             logger.error(f"LLM keyword extraction failed: {str(e)}")
             raise
 
-    def _parse_json_response(self, response: str) -> List[str]:
-        """Parse JSON response to extract keywords"""
-
-        # Clean up the response
-        response = response.strip()
-
-        # Try to find JSON object in the response
-        start_idx = response.find("{")
-        end_idx = response.rfind("}") + 1
-
-        if start_idx != -1 and end_idx != -1:
-            json_str = response[start_idx:end_idx]
-            try:
-                data = json.loads(json_str)
-                if isinstance(data, dict) and "keywords" in data:
-                    keywords = data["keywords"]
-                    if isinstance(keywords, list):
-                        # Filter out empty strings and ensure all items are strings
-                        filtered_keywords = [str(k).strip() for k in keywords if k and str(k).strip()]
-                        return filtered_keywords[:10]  # Limit to 10 keywords
-            except json.JSONDecodeError as e:
-                logger.warning(f"JSON decode error: {str(e)}, response: {json_str}")
-        else:
-            logger.warning(f"JSON object not found in response: {response}")
-
-        return []
-
-    def _parse_keywords_fallback(self, response: str) -> List[str]:
-        """Fallback keyword parsing method"""
+        # Specific terms match documents better than overarching themes
         keywords = []
-        for line in response.strip().split("\n"):
-            keyword = line.strip()
-            # Remove common prefixes and clean up
-            keyword = keyword.lstrip("- *•").strip()
-            if keyword and not keyword.startswith(("1.", "2.", "3.", "4.", "5.", "6.", "7.", "8.", "9.", "10.")):
-                # Remove quotes if present
-                keyword = keyword.strip("\"'")
-                if keyword:
-                    keywords.append(keyword)
-
+        for keyword in ll_keywords + hl_keywords:
+            keyword = str(keyword).strip()
+            if keyword and keyword not in keywords:
+                keywords.append(keyword)
         return keywords[:10]  # Limit to 10 keywords
 
     async def __aenter__(self):
@@ -0,0 +1,165 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Content-addressed cache of document parse results.
+
+Parsing a document (MinerU, DocRay or markitdown, plus PDF page rendering) is by far the
+slowest part of indexing, and rebuilding the indexes of a document parses the same bytes
+again. After a successful parse the content and parts are stored next to ``parsed.md`` and
+the assets under the document's ``object_store_base_path()``. The entry key is a hash over
+the file content, the file metadata and everything that selects or tunes the parser, so a
+changed file, a changed parser setting or a new cache format version always parses again.
+
+Asset bytes are not stored twice: parts whose asset was already uploaded to
+``{base}/assets/`` are cached as ``AssetRefPart`` pointing at it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import zstandard
+
+from aperag.config import settings
+from aperag.docparser.base import (
+    AssetBinPart,
+    AssetRefPart,
+    CodePart,
+    ImagePart,
+    MarkdownPart,
+    MediaPart,
+    Part,
+    TextPart,
+    TitlePart,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when parsing output or the cache layout changes
+PARSE_CACHE_VERSION = 1
+
+# Part types a cache entry may contain, by class name
+_PART_TYPES = {
+    cls.__name__: cls for cls in (Part, MarkdownPart, TextPart, TitlePart, CodePart, MediaPart, ImagePart, AssetRefPart)
+}
+
+# Environment variables read by the parsers themselves
+_PARSER_ENV_VARS = ("USE_MINERU_API", "MINERU_API_TOKEN")
+
+
+def file_content_hash(filepath: str) -> str:
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def parser_config_hash(parser_config: Optional[Dict[str, Any]]) -> str:
+    """Hash of everything that selects or tunes the parsers, secrets only enter as part of the digest"""
+    config = {
+        "parser_config": parser_config or {},
+        "env": {name: os.getenv(name) for name in _PARSER_ENV_VARS},
+        "docray_host": settings.docray_host,
+        "paddleocr_host": settings.paddleocr_host,
+        "whisper_host": settings.whisper_host,
+        "pdf_render_dpi": settings.pdf_render_dpi,
+        "pdf_render_max_pages": settings.pdf_render_max_pages,
+    }
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def parse_cache_key(filepath: str, file_metadata: Dict[str, Any], parser_config: Optional[Dict[str, Any]]) -> str:
+    h = hashlib.sha256()
+    h.update(f"v{PARSE_CACHE_VERSION}:{os.path.splitext(filepath)[1].lower()}".encode("utf-8"))
+    h.update(file_content_hash(filepath).encode("utf-8"))
+    # Parts carry a copy of the file metadata
+    h.update(json.dumps(file_metadata or {}, sort_keys=True, default=str).encode("utf-8"))
+    h.update(parser_config_hash(parser_config).encode("utf-8"))
+    return h.hexdigest()
+
+
+def parse_cache_path(object_store_base_path: str, key: str) -> str:
+    return f"{object_store_base_path}/parse_cache/{key}.json.zst"
+
+
+def _to_cached_part(part: Any, object_store_base_path: str) -> Dict[str, Any]:
+    if isinstance(part, AssetBinPart):
+        # The asset was uploaded by save_processed_content_and_assets
+        part = AssetRefPart(
+            content=part.content,
+            asset_id=part.asset_id,
+            path=f"{object_store_base_path}/assets/{part.asset_id}",
+            mime_type=part.mime_type,
+            metadata=part.metadata,
+        )
+    type_name = type(part).__name__
+    if _PART_TYPES.get(type_name) is not type(part):
+        raise TypeError(f"Part type {type_name} can not be cached")
+    return {"_type": type_name, **part.model_dump()}
+
+
+def load_parse_result(key: str, object_store_base_path: str) -> Optional[Tuple[str, List[Any]]]:
+    """Return the cached (content, doc_parts) for key, or None if there is no usable entry"""
+    from aperag.objectstore.base import get_object_store
+
+    path = parse_cache_path(object_store_base_path, key)
+    try:
+        obj_store = get_object_store()
+        stream = obj_store.get(path)
+        if stream is None:
+            return None
+        with stream:
+            raw = json.loads(zstandard.ZstdDecompressor().decompress(stream.read()))
+        if raw.get("version") != PARSE_CACHE_VERSION:
+            return None
+        # The parts refer to parsed.md and the assets, which must still be there
+        if not obj_store.obj_exists(f"{object_store_base_path}/parsed.md"):
+            logger.info(f"Ignoring parse cache {path}, the parsed content is gone")
+            return None
+        doc_parts = []
+        for part in raw["doc_parts"]:
+            part = dict(part)
+            doc_parts.append(_PART_TYPES[part.pop("_type")](**part))
+        return raw["content"], doc_parts
+    except Exception as e:
+        logger.warning(f"Failed to load parse cache {path}: {e}")
+        return None
+
+
+def save_parse_result(key: str, object_store_base_path: str, content: str, doc_parts: List[Any]):
+    """Store a parse result, a failure only costs the next parse"""
+    from aperag.objectstore.base import get_object_store
+
+    path = parse_cache_path(object_store_base_path, key)
+    try:
+        payload = {
+            "version": PARSE_CACHE_VERSION,
+            "key": key,
+            "content": content,
+            "doc_parts": [_to_cached_part(part, object_store_base_path) for part in doc_parts],
+        }
+        raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        data = zstandard.ZstdCompressor(level=settings.parsed_data_zstd_level).compress(raw)
+
+        obj_store = get_object_store()
+        # Parse results of older file versions or parser settings are stale now
+        obj_store.delete_objects_by_prefix(f"{object_store_base_path}/parse_cache/")
+        obj_store.put(path, data)
+        logger.info(f"Saved parse cache with {len(doc_parts)} parts to {path}, size: {len(data)}")
+    except Exception as e:
+        logger.warning(f"Failed to save parse cache {path}: {e}")
@@ -12,11 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import hashlib
 import json
 import logging
-from typing import Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
 
-from aperag.config import get_vector_db_connector
+from aperag.config import get_vector_db_connector, settings
 from aperag.db.ops import db_ops
 from aperag.docparser.base import TextPart
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
@@ -24,10 +26,22 @@ from aperag.llm.completion.base_completion import get_collection_completion_serv
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
 from aperag.llm.embed.embedding_utils import create_embeddings_and_store
 from aperag.llm.llm_error_types import CompletionError, InvalidConfigurationError
+from aperag.utils.tokenizer import get_default_tokenizer
 from aperag.utils.utils import generate_vector_db_collection_name
 
 logger = logging.getLogger(__name__)
 
+# Bump when the chunk summary prompt changes so cached chunk summaries are not reused
+CHUNK_SUMMARY_CACHE_PREFIX = "aperag:summary:chunk:v1"
+
+REDUCE_SEPARATOR = "\n\n"
+
+
+def make_chunk_summary_cache_key(provider: str, model: str, text: str) -> str:
+    """Build the cache key of a chunk summary produced by ``model``"""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{CHUNK_SUMMARY_CACHE_PREFIX}:{provider}:{model}:{digest}"
+
 
 class SummaryIndexer(BaseIndexer):
     """Summary index implementation using map-reduce strategy"""
@@ -272,6 +286,10 @@ class SummaryIndexer(BaseIndexer):
         """
         Generate document summary using map-reduce strategy
 
+        The map phase summarizes parts concurrently (SUMMARY_MAP_CONCURRENCY) and reuses cached
+        summaries of unchanged parts. The reduce phase combines the part summaries in a tree so
+        that no reduce prompt holds more than SUMMARY_REDUCE_MAX_TOKENS tokens of summaries.
+
         Args:
             content: Document content
             doc_parts: Parsed document parts
@@ -291,28 +309,13 @@ class SummaryIndexer(BaseIndexer):
                 return self._summarize_text(content, completion_service)
 
             # Map phase: summarize each chunk
-            chunk_summaries = []
-            for part in doc_parts:
-                if hasattr(part, "content") and part.content:
-                    chunk_text = part.content
-                elif hasattr(part, "text") and part.text:
-                    chunk_text = part.text
-                else:
-                    # If part is a dict or other format, try to extract text
-                    chunk_text = str(part)
-
-                if chunk_text.strip():
-                    chunk_summary = self._summarize_text(chunk_text, completion_service, is_chunk=True)
-                    if chunk_summary:
-                        chunk_summaries.append(chunk_summary)
+            chunk_texts = [text for text in (self._get_part_text(part) for part in doc_parts) if text.strip()]
+            chunk_summaries = self._map_summaries(chunk_texts, completion_service)
 
             # If we have chunk summaries, reduce them
             if chunk_summaries:
-                # Combine chunk summaries
-                combined_summaries = "\n\n".join(chunk_summaries)
-
                 # Reduce phase: create final summary from chunk summaries
-                return self._reduce_summaries(combined_summaries, completion_service)
+                return self._reduce_summary_tree(chunk_summaries, completion_service)
             else:
                 # Fallback to direct summarization
                 return self._summarize_text(content, completion_service)
@@ -321,6 +324,132 @@ class SummaryIndexer(BaseIndexer):
             logger.error(f"Failed to generate document summary: {str(e)}")
             return ""
 
+    def _get_part_text(self, part: Any) -> str:
+        if hasattr(part, "content") and part.content:
+            return part.content
+        elif hasattr(part, "text") and part.text:
+            return part.text
+        else:
+            # If part is a dict or other format, try to extract text
+            return str(part)
+
+    def _run_concurrently(self, func: Callable[[Any], str], items: List[Any]) -> List[str]:
+        """Apply func to items with at most SUMMARY_MAP_CONCURRENCY LLM calls in flight, keeping order"""
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        max_workers = max(1, min(settings.summary_map_concurrency, len(items)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(func, items))
+
+    def _map_summaries(self, chunk_texts: List[str], completion_service) -> List[str]:
+        """Summarize chunks concurrently, skipping chunks whose summary is cached"""
+        keys = [
+            make_chunk_summary_cache_key(completion_service.provider, completion_service.model, text)
+            for text in chunk_texts
+        ]
+        summaries = self._get_cached_chunk_summaries(keys)
+
+        # Identical chunks are summarized once
+        pending = {}
+        for key, text in zip(keys, chunk_texts):
+            if key not in summaries and key not in pending:
+                pending[key] = text
+        if pending:
+            logger.info(
+                f"Summarizing {len(pending)} chunks ({len(chunk_texts) - len(pending)} cached) "
+                f"with concurrency {settings.summary_map_concurrency}"
+            )
+            results = self._run_concurrently(
+                lambda text: self._summarize_text(text, completion_service, is_chunk=True), list(pending.values())
+            )
+            new_summaries = {key: summary for key, summary in zip(pending.keys(), results) if summary}
+            self._set_cached_chunk_summaries(new_summaries)
+            summaries.update(new_summaries)
+
+        return [summaries[key] for key in keys if summaries.get(key)]
+
+    def _get_cached_chunk_summaries(self, keys: List[str]) -> Dict[str, str]:
+        if not keys or settings.summary_chunk_cache_ttl <= 0:
+            return {}
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            values = get_sync_redis_client().mget(keys)
+            return {key: value for key, value in zip(keys, values) if value}
+        except Exception as e:
+            # The cache is an optimization, summarize everything when it is unavailable
+            logger.warning(f"Failed to read chunk summary cache: {str(e)}")
+            return {}
+
+    def _set_cached_chunk_summaries(self, summaries: Dict[str, str]):
+        if not summaries or settings.summary_chunk_cache_ttl <= 0:
+            return
+        try:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            pipe = get_sync_redis_client().pipeline(transaction=False)
+            for key, summary in summaries.items():
+                pipe.set(key, summary, ex=settings.summary_chunk_cache_ttl)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to write chunk summary cache: {str(e)}")
+
+    def _reduce_summary_tree(self, summaries: List[str], completion_service) -> str:
+        """
+        Reduce chunk summaries level by level until one group fits SUMMARY_REDUCE_MAX_TOKENS,
+        then produce the final summary from that group
+        """
+        tokenizer = get_default_tokenizer()
+        max_tokens = settings.summary_reduce_max_tokens
+        level = 0
+        while True:
+            groups = self._group_summaries(summaries, tokenizer, max_tokens)
+            if len(groups) == 1:
+                return self._reduce_summaries(REDUCE_SEPARATOR.join(groups[0]), completion_service)
+
+            level += 1
+            logger.info(f"Reducing {len(summaries)} summaries into {len(groups)} groups (level {level})")
+            reduced = self._run_concurrently(
+                lambda group: self._reduce_summaries(REDUCE_SEPARATOR.join(group), completion_service), groups
+            )
+            summaries = [summary for summary in reduced if summary]
+            if len(summaries) <= 1:
+                return summaries[0] if summaries else ""
+
+    def _group_summaries(
+        self, summaries: List[str], tokenizer: Callable[[str], List[int]], max_tokens: int
+    ) -> List[List[str]]:
+        """
+        Pack consecutive summaries into groups of at most max_tokens tokens.
+
+        Every summary is truncated to half of the budget first, so any two summaries fit in one
+        group and each level of the reduce tree at least halves the number of summaries.
+        """
+        separator_tokens = len(tokenizer(REDUCE_SEPARATOR))
+        item_limit = max(1, (max_tokens - separator_tokens) // 2)
+
+        groups = []
+        current, current_tokens = [], 0
+        for summary in summaries:
+            summary, tokens = self._truncate_to_tokens(summary, tokenizer, item_limit)
+            if current and current_tokens + separator_tokens + tokens > max_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            if current:
+                current_tokens += separator_tokens
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _truncate_to_tokens(self, text: str, tokenizer: Callable[[str], List[int]], limit: int) -> Tuple[str, int]:
+        tokens = len(tokenizer(text))
+        while tokens > limit and text:
+            text = text[: max(0, min(len(text) - 1, int(len(text) * limit / tokens)))]
+            tokens = len(tokenizer(text))
+        return text, tokens
+
     def _summarize_text(self, text: str, completion_service, is_chunk: bool = False) -> str:
         """
         Summarize a single text using LLM
@@ -14,11 +14,12 @@
 
 import json
 import logging
-from typing import Any, List
+from typing import Any, List, Optional, Tuple
 
 from sqlalchemy import and_, select
 
 from aperag.config import get_vector_db_connector, settings
+from aperag.docparser.base import Part
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
 from aperag.llm.embed.embedding_utils import create_embeddings_and_store
@@ -38,6 +39,24 @@ class VectorIndexer(BaseIndexer):
         """Vector indexing is always enabled"""
         return True
 
+    def _prepare_parts(
+        self, doc_parts: List[Any], chunks: Optional[List[Part]]
+    ) -> Tuple[List[Any], Optional[List[Part]]]:
+        """Tag parts (or the pre-chunked parts from the shared chunk artifact) with the vector indexer"""
+        if chunks is not None:
+            chunks = [Part(content=c.content, metadata={**c.metadata, "indexer": "vector"}) for c in chunks]
+            return chunks, chunks
+
+        # Filter out non-text parts
+        doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
+
+        # Add indexer metadata to parts for proper identification
+        for part in doc_parts:
+            if not hasattr(part, "metadata"):
+                part.metadata = {}
+            part.metadata["indexer"] = "vector"
+        return doc_parts, None
+
     def create_index(self, document_id: str, content: str, doc_parts: List[Any], collection, **kwargs) -> IndexResult:
         """
         Create vector index for document
@@ -47,7 +66,7 @@ class VectorIndexer(BaseIndexer):
             content: Document content
             doc_parts: Parsed document parts
             collection: Collection object
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters, ``chunks`` holds the shared pre-chunked parts if available
 
         Returns:
             IndexResult: Result of vector index creation
@@ -59,14 +78,7 @@ class VectorIndexer(BaseIndexer):
                 collection=generate_vector_db_collection_name(collection_id=collection.id)
             )
 
-            # Filter out non-text parts
-            doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
-
-            # Add indexer metadata to parts for proper identification
-            for part in doc_parts:
-                if not hasattr(part, "metadata"):
-                    part.metadata = {}
-                part.metadata["indexer"] = "vector"
+            doc_parts, chunks = self._prepare_parts(doc_parts, kwargs.get("chunks"))
 
             # Generate embeddings and store in vector database
             ctx_ids = create_embeddings_and_store(
@@ -76,6 +88,7 @@ class VectorIndexer(BaseIndexer):
                 chunk_size=settings.chunk_size,
                 chunk_overlap=settings.chunk_overlap_size,
                 tokenizer=get_default_tokenizer(),
+                chunked_parts=chunks,
             )
 
             logger.info(f"Vector index created for document {document_id}: {len(ctx_ids)} vectors")
@@ -107,7 +120,7 @@ class VectorIndexer(BaseIndexer):
             content: Document content
             doc_parts: Parsed document parts
             collection: Collection object
-            **kwargs: Additional parameters
+            **kwargs: Additional parameters, ``chunks`` holds the shared pre-chunked parts if available
 
         Returns:
             IndexResult: Result of vector index update
@@ -140,14 +153,7 @@ class VectorIndexer(BaseIndexer):
                 vector_store_adaptor.connector.delete(ids=old_ctx_ids)
                 logger.info(f"Deleted {len(old_ctx_ids)} old vectors for document {document_id}")
 
-            # Filter out non-text parts
-            doc_parts = [part for part in doc_parts if hasattr(part, "content") and part.content]
-
-            # Add indexer metadata to parts for proper identification
-            for part in doc_parts:
-                if not hasattr(part, "metadata"):
-                    part.metadata = {}
-                part.metadata["indexer"] = "vector"
+            doc_parts, chunks = self._prepare_parts(doc_parts, kwargs.get("chunks"))
 
             # Create new vectors
             embedding_model, vector_size = get_collection_embedding_service_sync(collection)
@@ -158,6 +164,7 @@ class VectorIndexer(BaseIndexer):
                 chunk_size=settings.chunk_size,
                 chunk_overlap=settings.chunk_overlap_size,
                 tokenizer=get_default_tokenizer(),
+                chunked_parts=chunks,
             )
 
             logger.info(f"Vector index updated for document {document_id}: {len(ctx_ids)} vectors")
@@ -12,17 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import base64
+import hashlib
 import json
 import logging
-import time
-from typing import Any, List
+from typing import Any, Dict, List, Optional
 
 from llama_index.core.schema import TextNode
 from sqlalchemy import and_, select
 
-from aperag.config import get_vector_db_connector
+from aperag.config import get_vector_db_connector, settings
 from aperag.db.models import Collection
+from aperag.db.ops import db_ops
 from aperag.index.base import BaseIndexer, IndexResult, IndexType
 from aperag.llm.completion.base_completion import get_collection_completion_service_sync
 from aperag.llm.embed.base_embedding import get_collection_embedding_service_sync
@@ -37,6 +39,85 @@ from aperag.utils.utils import generate_vector_db_collection_name
 
 logger = logging.getLogger(__name__)
 
+# Bump when VISION_TO_TEXT_PROMPT changes so stored results are not reused
+VISION_TO_TEXT_VERSION = 1
+
+VISION_TO_TEXT_PROMPT = """Analyze the provided image and extract its content with high fidelity. Follow these instructions precisely and use Markdown for formatting your entire response. Do not include any introductory or conversational text.
+
+1.  **Overall Summary:**
+    *   Provide a brief, one-paragraph overview of the image's main subject, setting, and any depicted activities.
+
+2.  **Detailed Text Extraction:**
+    *   Extract all text from the image, preserving the original language. Do not translate.
+    *   **Crucially, maintain the visual reading order.** For multi-column layouts, process the text column by column (e.g., left column top-to-bottom, then right column top-to-bottom).
+    *   **Exclude headers and footers:** Do not extract repetitive content from the top (headers) or bottom (footers) of the page, such as page numbers, book titles, or chapter names.
+    *   Replicate the original formatting using Markdown as much as possible (e.g., headings, lists, bold/italic text).
+    *   For mathematical formulas or equations, represent them using LaTeX syntax (e.g., `$$...$$` for block equations, `$...$` for inline equations).
+    *   For tables, reproduce them accurately using GitHub Flavored Markdown (GFM) table syntax.
+
+3.  **Chart/Graph Analysis:**
+    *   If the image contains charts, graphs, or complex tables, identify their type (e.g., bar chart, line graph, pie chart).
+    *   Explain the data presented, including axes, labels, and legends.
+    *   Summarize the key insights, trends, or comparisons revealed by the data.
+
+4.  **Object and Scene Recognition:**
+    *   List all significant objects, entities, and scene elements visible in the image."""
+
+
+class VisionToTextError(Exception):
+    """Raised when vision-to-text generation fails for an image"""
+
+
+def make_vision_text_cache_key(provider: str, model: str, image_digest: str) -> str:
+    """Key of a vision-to-text result: the image sha256 combined with the model that described it"""
+    return hashlib.sha256(f"v{VISION_TO_TEXT_VERSION}:{provider}:{model}:{image_digest}".encode("utf-8")).hexdigest()
+
+
+def get_image_digest(part: Any) -> str:
+    """sha256 of an image part, taken from the metadata when the renderer already computed it"""
+    digest = (getattr(part, "metadata", None) or {}).get("content_hash")
+    return digest or hashlib.sha256(get_image_data(part)).hexdigest()
+
+
+def get_image_data(part: Any) -> bytes:
+    """Bytes of an image part, loaded from the object store for parts that only hold a reference"""
+    data = getattr(part, "data", None)
+    if data:
+        return data
+
+    from aperag.objectstore.base import get_object_store
+
+    path = getattr(part, "path", None)
+    stream = get_object_store().get(path) if path else None
+    if stream is None:
+        raise ValueError(f"Image data of asset {getattr(part, 'asset_id', '')} not found")
+    with stream:
+        return stream.read()
+
+
+def vision_text_path(object_store_base_path: str, key: str) -> str:
+    return f"{object_store_base_path}/vision_text/{key}.md"
+
+
+def _load_vision_text(path: str) -> Optional[str]:
+    from aperag.objectstore.base import get_object_store
+
+    try:
+        stream = get_object_store().get(path)
+        if stream is None:
+            return None
+        with stream:
+            return stream.read().decode("utf-8")
+    except Exception as e:
+        logger.warning(f"Failed to load vision-to-text result {path}: {e}")
+        return None
+
+
+def _save_vision_text(path: str, description: str):
+    from aperag.objectstore.base import get_object_store
+
+    get_object_store().put(path, description.encode("utf-8"))
+
 
 class VisionIndexer(BaseIndexer):
     """Indexer for creating vision-based indexes."""
@@ -102,7 +183,7 @@ class VisionIndexer(BaseIndexer):
                 nodes: List[TextNode] = []
                 image_uris = []
                 for part in image_parts:
-                    b64_image = base64.b64encode(part.data).decode("utf-8")
+                    b64_image = base64.b64encode(get_image_data(part)).decode("utf-8")
                     mime_type = part.mime_type or "image/png"
                     data_uri = f"data:{mime_type};base64,{b64_image}"
                     image_uris.append(data_uri)
@@ -137,82 +218,27 @@ class VisionIndexer(BaseIndexer):
         # Path B: Vision-to-Text
         if completion_svc and completion_svc.is_vision_model():
             try:
-                text_nodes: List[TextNode] = []
-                for part in image_parts:
-                    b64_image = base64.b64encode(part.data).decode("utf-8")
-                    mime_type = part.mime_type or "image/png"
-                    data_uri = f"data:{mime_type};base64,{b64_image}"
-
-                    prompt = """Analyze the provided image and extract its content with high fidelity. Follow these instructions precisely and use Markdown for formatting your entire response. Do not include any introductory or conversational text.
-
-1.  **Overall Summary:**
-    *   Provide a brief, one-paragraph overview of the image's main subject, setting, and any depicted activities.
-
-2.  **Detailed Text Extraction:**
-    *   Extract all text from the image, preserving the original language. Do not translate.
-    *   **Crucially, maintain the visual reading order.** For multi-column layouts, process the text column by column (e.g., left column top-to-bottom, then right column top-to-bottom).
-    *   **Exclude headers and footers:** Do not extract repetitive content from the top (headers) or bottom (footers) of the page, such as page numbers, book titles, or chapter names.
-    *   Replicate the original formatting using Markdown as much as possible (e.g., headings, lists, bold/italic text).
-    *   For mathematical formulas or equations, represent them using LaTeX syntax (e.g., `$$...$$` for block equations, `$...$` for inline equations).
-    *   For tables, reproduce them accurately using GitHub Flavored Markdown (GFM) table syntax.
-
-3.  **Chart/Graph Analysis:**
-    *   If the image contains charts, graphs, or complex tables, identify their type (e.g., bar chart, line graph, pie chart).
-    *   Explain the data presented, including axes, labels, and legends.
-    *   Summarize the key insights, trends, or comparisons revealed by the data.
-
-4.  **Object and Scene Recognition:**
-    *   List all significant objects, entities, and scene elements visible in the image."""
-
-                    description = None
-                    max_retries = 3
-                    retry_delay = 5  # seconds
-                    for attempt in range(max_retries):
-                        try:
-                            description = completion_svc.generate(history=[], prompt=prompt, images=[data_uri])
-                            break  # Success
-                        except LLMError as e:
-                            if attempt < max_retries - 1 and is_retryable_error(e):
-                                logger.warning(
-                                    f"Retryable error generating vision-to-text for asset {part.asset_id}: {e}. "
-                                    f"Retrying in {retry_delay}s... (Attempt {attempt + 1}/{max_retries})"
-                                )
-                                time.sleep(retry_delay)
-                                retry_delay *= 2  # Exponential backoff
-                            else:
-                                logger.error(
-                                    f"Non-retryable error or max retries exceeded for asset {part.asset_id}: {e}",
-                                    exc_info=True,
-                                )
-                                return IndexResult(
-                                    success=False,
-                                    index_type=self.index_type,
-                                    metadata={
-                                        "message": f"Non-retryable error or max retries exceeded for asset {part.asset_id}: {e}",
-                                        "status": "failed",
-                                    },
-                                )
-                        except Exception as e:
-                            logger.error(
-                                f"Unexpected error generating vision-to-text for asset {part.asset_id}: {e}",
-                                exc_info=True,
-                            )
-                            return IndexResult(
-                                success=False,
-                                index_type=self.index_type,
-                                metadata={
-                                    "message": f"Unexpected error generating vision-to-text for asset {part.asset_id}: {e}",
-                                    "status": "failed",
-                                },
-                            )
+                descriptions = asyncio.run(
+                    self._describe_images(image_parts, completion_svc, self._get_vision_text_base_path(document_id))
+                )
+            except VisionToTextError as e:
+                logger.error(str(e), exc_info=True)
+                return IndexResult(
+                    success=False,
+                    index_type=self.index_type,
+                    metadata={"message": str(e), "status": "failed"},
+                )
 
+            try:
+                text_nodes: List[TextNode] = []
+                for part, description in zip(image_parts, descriptions):
                     if description:
                         metadata = part.metadata.copy()
                         metadata["collection_id"] = collection.id
                         metadata["document_id"] = document_id
                         metadata["source"] = metadata.get("name", "")
                         metadata["asset_id"] = part.asset_id
-                        metadata["mimetype"] = mime_type
+                        metadata["mimetype"] = part.mime_type or "image/png"
                         metadata["indexer"] = "vision"
                         metadata["index_method"] = "vision_to_text"
                         text_nodes.append(TextNode(text=description, metadata=metadata))
@@ -244,6 +270,99 @@ class VisionIndexer(BaseIndexer):
             metadata={"vector_count": len(all_ctx_ids), "vector_size": vector_size},
         )
 
+    def _get_vision_text_base_path(self, document_id: str) -> Optional[str]:
+        """Object store prefix for the document's vision-to-text results, None disables persistence"""
+        try:
+            document = db_ops.query_document_by_id(document_id)
+            return document.object_store_base_path() if document else None
+        except Exception as e:
+            logger.warning(f"Failed to resolve object store path for document {document_id}: {e}")
+            return None
+
+    async def _describe_images(
+        self, image_parts: List[Any], completion_svc, base_path: Optional[str]
+    ) -> List[Optional[str]]:
+        """
+        Run vision-to-text for all images with at most VISION_TO_TEXT_CONCURRENCY calls in flight.
+
+        Each description is stored in the object store as soon as it is generated, keyed by the
+        image hash and the model. Images described by an earlier (possibly failed) attempt are
+        loaded instead of calling the LLM again, so a retried task resumes where it stopped.
+
+        Raises:
+            VisionToTextError: if any image could not be described. Completed images stay persisted.
+        """
+        semaphore = asyncio.Semaphore(max(1, settings.vision_to_text_concurrency))
+        # Identical images share one call
+        tasks: Dict[str, asyncio.Task] = {}
+        keys = []
+        for part in image_parts:
+            key = make_vision_text_cache_key(completion_svc.provider, completion_svc.model, get_image_digest(part))
+            keys.append(key)
+            if key not in tasks:
+                tasks[key] = asyncio.create_task(self._describe_image(part, key, completion_svc, base_path, semaphore))
+
+        # Let in-flight calls finish even if one fails, so their results are persisted for the retry
+        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        descriptions = dict(zip(tasks.keys(), results))
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            completed = len(results) - len(errors)
+            raise VisionToTextError(
+                f"Vision-to-text failed for {len(errors)} of {len(results)} images "
+                f"({completed} completed and saved): {errors[0]}"
+            ) from errors[0]
+        return [descriptions[key] for key in keys]
+
+    async def _describe_image(
+        self, part: Any, key: str, completion_svc, base_path: Optional[str], semaphore: asyncio.Semaphore
+    ) -> Optional[str]:
+        path = vision_text_path(base_path, key) if base_path else None
+        if path:
+            cached = await asyncio.to_thread(_load_vision_text, path)
+            if cached is not None:
+                logger.debug(f"Reusing vision-to-text result for asset {part.asset_id}")
+                return cached
+
+        # Referenced images are loaded only when they are about to be described
+        image_data = await asyncio.to_thread(get_image_data, part)
+        b64_image = base64.b64encode(image_data).decode("utf-8")
+        data_uri = f"data:{part.mime_type or 'image/png'};base64,{b64_image}"
+
+        max_retries = max(1, settings.vision_to_text_max_retries)
+        retry_delay = 5  # seconds
+        for attempt in range(max_retries):
+            try:
+                async with semaphore:
+                    description = await completion_svc.agenerate(
+                        history=[], prompt=VISION_TO_TEXT_PROMPT, images=[data_uri]
+                    )
+                break  # Success
+            except LLMError as e:
+                if attempt < max_retries - 1 and is_retryable_error(e):
+                    logger.warning(
+                        f"Retryable error generating vision-to-text for asset {part.asset_id}: {e}. "
+                        f"Retrying in {retry_delay}s... (Attempt {attempt + 1}/{max_retries})"
+                    )
+                    # Back off outside the semaphore so other images keep the slots busy
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                else:
+                    raise VisionToTextError(
+                        f"Non-retryable error or max retries exceeded for asset {part.asset_id}: {e}"
+                    ) from e
+            except Exception as e:
+                raise VisionToTextError(
+                    f"Unexpected error generating vision-to-text for asset {part.asset_id}: {e}"
+                ) from e
+
+        if description and path:
+            try:
+                await asyncio.to_thread(_save_vision_text, path, description)
+            except Exception as e:
+                logger.warning(f"Failed to persist vision-to-text result for asset {part.asset_id}: {e}")
+        return description
+
     def update_index(
         self, document_id: str, content: str, doc_parts: List[Any], collection: Collection, **kwargs
     ) -> IndexResult:
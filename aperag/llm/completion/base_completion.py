@@ -16,7 +16,6 @@ import logging
 from threading import Lock
 
 from aperag.db.models import APIType
-from aperag.db.ops import db_ops
 from aperag.llm.completion.completion_service import CompletionService
 from aperag.llm.llm_error_types import (
     CompletionError,
@@ -24,6 +23,7 @@ from aperag.llm.llm_error_types import (
     ModelNotFoundError,
     ProviderNotFoundError,
 )
+from aperag.llm.provider_cache import provider_config_cache
 from aperag.schema.utils import parseCollectionConfig
 
 logger = logging.getLogger(__name__)
@@ -130,14 +130,14 @@ def get_completion_service(
             "custom_llm_provider", custom_llm_provider, "Custom LLM provider cannot be empty"
         )
 
-    completion_service_api_key = db_ops.query_provider_api_key(model_service_provider, user_id)
+    completion_service_api_key = provider_config_cache.get_api_key(model_service_provider, user_id)
     if not completion_service_api_key:
         raise InvalidConfigurationError(
             "api_key", None, f"API KEY not found for LLM Provider: {model_service_provider}"
         )
 
     try:
-        llm_provider = db_ops.query_llm_provider_by_name(model_service_provider)
+        llm_provider = provider_config_cache.get_provider(model_service_provider)
         if not llm_provider:
             raise ModelNotFoundError(model_name, model_service_provider, "Completion")
         completion_service_url = llm_provider.base_url
@@ -154,7 +154,9 @@ def get_completion_service(
 
     try:
         is_vision_model = False
-        model_info = db_ops.query_llm_provider_model(model_service_provider, APIType.COMPLETION.value, model_name)
+        model_info = provider_config_cache.get_provider_model(
+            model_service_provider, APIType.COMPLETION.value, model_name
+        )
         if model_info:
             is_vision_model = model_info.has_tag("vision")
     except Exception as e:
@@ -162,13 +164,16 @@ def get_completion_service(
         raise
 
     try:
-        return _get_completion_service(
-            completion_provider=custom_llm_provider,
-            completion_model=model_name,
-            completion_service_url=completion_service_url,
-            completion_service_api_key=completion_service_api_key,
-            temperature=temperature,
-            vision=is_vision_model,
+        kwargs = {
+            "completion_provider": custom_llm_provider,
+            "completion_model": model_name,
+            "completion_service_url": completion_service_url,
+            "completion_service_api_key": completion_service_api_key,
+            "temperature": temperature,
+            "vision": is_vision_model,
+        }
+        return provider_config_cache.get_service(
+            ("completion",) + tuple(sorted(kwargs.items())), lambda: _get_completion_service(**kwargs)
         )
     except CompletionError:
         # Re-raise completion errors
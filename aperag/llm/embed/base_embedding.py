@@ -14,12 +14,12 @@
 # limitations under the License.
 
 # -*- coding: utf-8 -*-
+import asyncio
 import logging
 from threading import Lock
 
 from aperag.config import settings
 from aperag.db.models import APIType
-from aperag.db.ops import db_ops
 from aperag.llm.embed.embedding_service import EmbeddingService
 from aperag.llm.llm_error_types import (
     EmbeddingError,
@@ -27,6 +27,7 @@ from aperag.llm.llm_error_types import (
     ModelNotFoundError,
     ProviderNotFoundError,
 )
+from aperag.llm.provider_cache import provider_config_cache
 from aperag.schema.utils import parseCollectionConfig
 
 logger = logging.getLogger(__name__)
@@ -131,22 +132,8 @@ def _get_embedding_model(
         ) from e
 
 
-def get_collection_embedding_service_sync(collection) -> tuple[EmbeddingService, int]:
-    """
-    Get embedding service for a collection synchronously.
-
-    Args:
-        collection: The collection object with configuration
-
-    Returns:
-        tuple: (Embeddings instance, embedding dimension)
-
-    Raises:
-        ProviderNotFoundError: If the embedding provider is not found
-        ModelNotFoundError: If the embedding model is not found
-        InvalidConfigurationError: If configuration is invalid
-        EmbeddingError: If embedding service creation fails
-    """
+def _parse_embedding_config(collection) -> tuple[str, str, str]:
+    """Return the validated (model service provider, model, custom LLM provider) of a collection"""
     try:
         config = parseCollectionConfig(collection.config)
     except Exception as e:
@@ -175,28 +162,14 @@ def get_collection_embedding_service_sync(collection) -> tuple[EmbeddingService,
             "embedding.custom_llm_provider", custom_llm_provider, "Custom LLM provider cannot be empty"
         )
 
-    embedding_service_api_key = db_ops.query_provider_api_key(embedding_msp, collection.user)
-    if not embedding_service_api_key:
-        raise InvalidConfigurationError("api_key", None, f"API KEY not found for LLM Provider: {embedding_msp}")
+    return embedding_msp, embedding_model_name, custom_llm_provider
 
-    try:
-        llm_provider = db_ops.query_llm_provider_by_name(embedding_msp)
-        if not llm_provider:
-            raise ModelNotFoundError(embedding_model_name, embedding_msp, "Embedding")
-        embedding_service_url = llm_provider.base_url
-    except Exception as e:
-        logger.error(f"Failed to query LLM provider '{embedding_msp}': {str(e)}")
-        raise ProviderNotFoundError(embedding_msp, "Embedding") from e
-
-    try:
-        multimodal = False
-        model = db_ops.query_llm_provider_model(embedding_msp, APIType.EMBEDDING.value, embedding_model_name)
-        if model:
-            multimodal = model.has_tag("multimodal")
-    except Exception:
-        logger.error(f"Failed to query embedding model '{embedding_msp}/{embedding_model_name}'", exc_info=True)
-        raise
 
+def _embedding_model_kwargs(
+    embedding_msp: str, embedding_model_name: str, custom_llm_provider: str, api_key: str, llm_provider, model
+) -> dict:
+    """Build the arguments of _get_embedding_model from the resolved provider configuration"""
+    embedding_service_url = llm_provider.base_url
     if not embedding_service_url:
         raise InvalidConfigurationError(
             "base_url", embedding_service_url, f"Base URL not configured for provider '{embedding_msp}'"
@@ -204,14 +177,22 @@ def get_collection_embedding_service_sync(collection) -> tuple[EmbeddingService,
 
     logger.info("get_collection_embedding_model %s", embedding_service_url)
 
+    return {
+        "embedding_provider": custom_llm_provider,
+        "embedding_model": embedding_model_name,
+        "embedding_service_url": embedding_service_url,
+        "embedding_service_api_key": api_key,
+        "multimodal": bool(model and model.has_tag("multimodal")),
+    }
+
+
+def _embedding_service_key(kwargs: dict) -> tuple:
+    return ("embedding",) + tuple(sorted(kwargs.items()))
+
+
+def _create_embedding_model(collection, embedding_msp: str, kwargs: dict) -> tuple[EmbeddingService, int]:
     try:
-        return _get_embedding_model(
-            embedding_provider=custom_llm_provider,
-            embedding_model=embedding_model_name,
-            embedding_service_url=embedding_service_url,
-            embedding_service_api_key=embedding_service_api_key,
-            multimodal=multimodal,
-        )
+        return provider_config_cache.get_service(_embedding_service_key(kwargs), lambda: _get_embedding_model(**kwargs))
     except EmbeddingError:
         # Re-raise embedding errors
         raise
@@ -222,6 +203,89 @@ def get_collection_embedding_service_sync(collection) -> tuple[EmbeddingService,
             {
                 "collection_id": getattr(collection, "id", "unknown"),
                 "provider": embedding_msp,
-                "model": embedding_model_name,
+                "model": kwargs["embedding_model"],
             },
         ) from e
+
+
+def get_collection_embedding_service_sync(collection) -> tuple[EmbeddingService, int]:
+    """
+    Get embedding service for a collection synchronously.
+
+    Args:
+        collection: The collection object with configuration
+
+    Returns:
+        tuple: (Embeddings instance, embedding dimension)
+
+    Raises:
+        ProviderNotFoundError: If the embedding provider is not found
+        ModelNotFoundError: If the embedding model is not found
+        InvalidConfigurationError: If configuration is invalid
+        EmbeddingError: If embedding service creation fails
+    """
+    embedding_msp, embedding_model_name, custom_llm_provider = _parse_embedding_config(collection)
+
+    embedding_service_api_key = provider_config_cache.get_api_key(embedding_msp, collection.user)
+    if not embedding_service_api_key:
+        raise InvalidConfigurationError("api_key", None, f"API KEY not found for LLM Provider: {embedding_msp}")
+
+    try:
+        llm_provider = provider_config_cache.get_provider(embedding_msp)
+        if not llm_provider:
+            raise ModelNotFoundError(embedding_model_name, embedding_msp, "Embedding")
+    except Exception as e:
+        logger.error(f"Failed to query LLM provider '{embedding_msp}': {str(e)}")
+        raise ProviderNotFoundError(embedding_msp, "Embedding") from e
+
+    try:
+        model = provider_config_cache.get_provider_model(embedding_msp, APIType.EMBEDDING.value, embedding_model_name)
+    except Exception:
+        logger.error(f"Failed to query embedding model '{embedding_msp}/{embedding_model_name}'", exc_info=True)
+        raise
+
+    kwargs = _embedding_model_kwargs(
+        embedding_msp, embedding_model_name, custom_llm_provider, embedding_service_api_key, llm_provider, model
+    )
+    return _create_embedding_model(collection, embedding_msp, kwargs)
+
+
+async def get_collection_embedding_service(collection) -> tuple[EmbeddingService, int]:
+    """
+    Get embedding service for a collection without blocking the event loop.
+
+    Configuration lookups go through the async provider cache. Only a service that is not
+    cached yet is created in a worker thread, since that probes the embedding dimension.
+
+    Raises:
+        The same errors as get_collection_embedding_service_sync.
+    """
+    embedding_msp, embedding_model_name, custom_llm_provider = _parse_embedding_config(collection)
+
+    embedding_service_api_key = await provider_config_cache.aget_api_key(embedding_msp, collection.user)
+    if not embedding_service_api_key:
+        raise InvalidConfigurationError("api_key", None, f"API KEY not found for LLM Provider: {embedding_msp}")
+
+    try:
+        llm_provider = await provider_config_cache.aget_provider(embedding_msp)
+        if not llm_provider:
+            raise ModelNotFoundError(embedding_model_name, embedding_msp, "Embedding")
+    except Exception as e:
+        logger.error(f"Failed to query LLM provider '{embedding_msp}': {str(e)}")
+        raise ProviderNotFoundError(embedding_msp, "Embedding") from e
+
+    try:
+        model = await provider_config_cache.aget_provider_model(
+            embedding_msp, APIType.EMBEDDING.value, embedding_model_name
+        )
+    except Exception:
+        logger.error(f"Failed to query embedding model '{embedding_msp}/{embedding_model_name}'", exc_info=True)
+        raise
+
+    kwargs = _embedding_model_kwargs(
+        embedding_msp, embedding_model_name, custom_llm_provider, embedding_service_api_key, llm_provider, model
+    )
+    cached = provider_config_cache.get_service(_embedding_service_key(kwargs))
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(_create_embedding_model, collection, embedding_msp, kwargs)
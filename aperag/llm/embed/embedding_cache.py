@@ -0,0 +1,273 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Content-addressed embedding cache.
+
+Unlike the LiteLLM request cache (see ``aperag/llm/litellm_cache.py``), which keys on the
+whole ``input`` list of an embedding request, this cache stores one vector per text keyed by
+``(provider, model, sha256(text))``. Identical chunks therefore hit the cache regardless of
+which batch, document or collection they appear in.
+
+Backends:
+- ``memory``: in-process LRU with TTL (default)
+- ``redis``:  shared Redis keys with TTL, eviction delegated to Redis
+- ``disk``:   local on-disk LRU via ``diskcache``
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "aperag:embedding"
+
+
+def make_cache_key(provider: str, model: str, content: str) -> str:
+    """Build the cache key for a single embedding input."""
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{provider}:{model}:{digest}"
+
+
+class EmbeddingCache:
+    """Base class for per-text embedding caches with hit/miss counters."""
+
+    backend = "base"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "added": 0}
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for ``keys``; missing keys are absent from the result."""
+        if not keys:
+            return {}
+        try:
+            found = self._get_many(keys)
+        except Exception as e:
+            # A broken cache must never fail indexing, treat it as a full miss
+            logger.warning(f"Embedding cache ({self.backend}) lookup failed: {e}")
+            found = {}
+        with self._stats_lock:
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        try:
+            self._set_many(items)
+        except Exception as e:
+            logger.warning(f"Embedding cache ({self.backend}) store failed: {e}")
+            return
+        with self._stats_lock:
+            self._stats["added"] += len(items)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = self._stats.copy()
+        total = stats["hits"] + stats["misses"]
+        stats["total_requests"] = total
+        stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+        stats["cache_type"] = self.backend
+        return stats
+
+    def clear_stats(self) -> None:
+        with self._stats_lock:
+            self._stats = {"hits": 0, "misses": 0, "added": 0}
+
+    def _get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        raise NotImplementedError
+
+    def _set_many(self, items: Dict[str, List[float]]) -> None:
+        raise NotImplementedError
+
+
+class MemoryEmbeddingCache(EmbeddingCache):
+    """
+    In-process LRU cache with per-entry TTL, bounded by the bytes it holds.
+
+    Vectors are kept as float32 arrays: 4 bytes per dimension instead of the ~32 a list of
+    Python floats takes.
+    """
+
+    backend = "memory"
+
+    # Approximate size of the key string, the entry tuple, the array header and the LRU node
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024, ttl: Optional[int] = None):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_bytes = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Tuple[float, array]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @classmethod
+    def entry_size(cls, key: str, vector: array) -> int:
+        return len(key) + vector.itemsize * len(vector) + cls.ENTRY_OVERHEAD
+
+    def _get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                expires_at, vector = entry
+                if expires_at and expires_at < now:
+                    self._remove(key)
+                    continue
+                self._data.move_to_end(key)
+                found[key] = vector.tolist()
+        return found
+
+    def _set_many(self, items: Dict[str, List[float]]) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            for key, vector in items.items():
+                vector = array("f", vector)
+                if self.entry_size(key, vector) > self.max_bytes:
+                    continue
+                if key in self._data:
+                    self._remove(key)
+                self._data[key] = (expires_at, vector)
+                self.size_bytes += self.entry_size(key, vector)
+            while self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+
+    def _remove(self, key: str) -> None:
+        _, vector = self._data.pop(key)
+        self.size_bytes -= self.entry_size(key, vector)
+
+
+class RedisEmbeddingCache(EmbeddingCache):
+    """Redis-backed cache shared by all workers. Entries expire after ``ttl`` seconds."""
+
+    backend = "redis"
+
+    def __init__(self, ttl: Optional[int] = None, client=None):
+        super().__init__()
+        self.ttl = ttl
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from aperag.db.redis_manager import get_sync_redis_client
+
+            self._client = get_sync_redis_client()
+        return self._client
+
+    def _get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        values = self.client.mget(keys)
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def _set_many(self, items: Dict[str, List[float]]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, vector in items.items():
+            pipe.set(key, json.dumps(vector), ex=self.ttl or None)
+        pipe.execute()
+
+
+class DiskEmbeddingCache(EmbeddingCache):
+    """
+    Local on-disk cache using ``diskcache`` with least-recently-used eviction, storing float32 bytes.
+
+    Requires the ``embedding-cache-disk`` extra.
+    """
+
+    backend = "disk"
+
+    def __init__(self, directory: str, size_limit: int, ttl: Optional[int] = None):
+        super().__init__()
+        try:
+            import diskcache
+        except ImportError as e:
+            raise ImportError(
+                "The 'disk' embedding cache backend requires the 'diskcache' package, "
+                "install the 'embedding-cache-disk' extra"
+            ) from e
+
+        self.ttl = ttl
+        self._cache = diskcache.Cache(directory, size_limit=size_limit, eviction_policy="least-recently-used")
+
+    def _get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        for key in keys:
+            value = self._cache.get(key)
+            if value is not None:
+                found[key] = array("f", value).tolist()
+        return found
+
+    def _set_many(self, items: Dict[str, List[float]]) -> None:
+        with self._cache.transact():
+            for key, vector in items.items():
+                self._cache.set(key, array("f", vector).tobytes(), expire=self.ttl or None)
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def create_embedding_cache(backend: str) -> EmbeddingCache:
+    from aperag.config import settings
+
+    ttl = settings.embedding_cache_ttl
+    if backend == "memory":
+        return MemoryEmbeddingCache(max_bytes=settings.embedding_cache_max_bytes, ttl=ttl)
+    if backend == "redis":
+        return RedisEmbeddingCache(ttl=ttl)
+    if backend == "disk":
+        return DiskEmbeddingCache(
+            directory=settings.embedding_cache_dir,
+            size_limit=settings.embedding_cache_disk_size_limit,
+            ttl=ttl,
+        )
+    raise ValueError(f"Unsupported EMBEDDING_CACHE_BACKEND: {backend}. Supported types are: memory, redis, disk.")
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the process-wide embedding cache, or None when it is disabled."""
+    global _embedding_cache
+
+    from aperag.config import settings
+
+    if not settings.embedding_cache_enabled:
+        return None
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = create_embedding_cache(settings.embedding_cache_backend)
+                logger.info(f"Embedding cache initialized with backend: {_embedding_cache.backend}")
+    return _embedding_cache
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """Hit/miss statistics of the process-wide embedding cache."""
+    if _embedding_cache is None:
+        return {"hits": 0, "misses": 0, "added": 0, "total_requests": 0, "hit_rate": 0.0, "cache_type": "disabled"}
+    return _embedding_cache.get_stats()
@@ -0,0 +1,148 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Request-scoped embedding memo.
+
+In one search flow the same text is embedded several times: by the vector, summary and
+vision runners, and by the entity, relationship and chunk queries of graph search. A
+``FlowEngine`` owns one ``EmbeddingMemo`` for its execution. It is handed to runners
+through ``SystemInput.embedding_memo`` and made available to code that has no access to
+the flow, such as the LightRAG embedding function, through ``get_embedding_memo()``.
+
+A (model, text) pair is embedded at most once per request. Texts of the same model
+requested within one event loop iteration are coalesced into a single batched
+embedding call.
+"""
+
+import asyncio
+import contextvars
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from aperag.llm.embed.embedding_service import EmbeddingService
+from aperag.llm.llm_error_types import EmptyTextError
+from aperag.utils.single_flight import fail_future
+
+logger = logging.getLogger(__name__)
+
+_current_memo: contextvars.ContextVar[Optional["EmbeddingMemo"]] = contextvars.ContextVar(
+    "aperag_embedding_memo", default=None
+)
+
+
+def get_embedding_memo() -> Optional["EmbeddingMemo"]:
+    """Return the memo of the flow execution running in the current context, if any"""
+    return _current_memo.get()
+
+
+def set_embedding_memo(memo: Optional["EmbeddingMemo"]) -> contextvars.Token:
+    """Make memo the current one, pass the returned token to reset_embedding_memo when done"""
+    return _current_memo.set(memo)
+
+
+def reset_embedding_memo(token: contextvars.Token):
+    _current_memo.reset(token)
+
+
+def _model_key(service: EmbeddingService) -> tuple:
+    return (service.embedding_provider, service.model, service.api_base, service.api_key)
+
+
+class EmbeddingMemo:
+    """Vectors embedded during one request, with batching of concurrent misses"""
+
+    def __init__(self):
+        self._vectors: Dict[Tuple[tuple, str], asyncio.Future] = {}
+        # Texts waiting for the next batch, per model
+        self._pending: Dict[tuple, Tuple[EmbeddingService, List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    async def aembed_query(self, service: EmbeddingService, text: str) -> List[float]:
+        if not text or not text.strip():
+            raise EmptyTextError(1)
+        return (await self.aembed_documents(service, [text]))[0]
+
+    async def aembed_documents(self, service: EmbeddingService, texts: List[str]) -> List[List[float]]:
+        model_key = _model_key(service)
+        futures = []
+        for text in texts:
+            key = (model_key, text)
+            future = self._vectors.get(key)
+            if future is None:
+                self.misses += 1
+                future = asyncio.get_running_loop().create_future()
+                self._vectors[key] = future
+                self._enqueue(model_key, service, text)
+            else:
+                self.hits += 1
+            futures.append(future)
+        # A cancelled caller must not cancel the vectors other callers wait for
+        return list(await asyncio.shield(asyncio.gather(*futures)))
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "batches": self.batches,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _enqueue(self, model_key: tuple, service: EmbeddingService, text: str):
+        if model_key in self._pending:
+            self._pending[model_key][1].append(text)
+            return
+        self._pending[model_key] = (service, [text])
+        asyncio.ensure_future(self._flush(model_key))
+
+    async def _flush(self, model_key: tuple):
+        # Let the other callers of this loop iteration join the batch
+        await asyncio.sleep(0)
+        service, texts = self._pending.pop(model_key)
+        self.batches += 1
+        try:
+            vectors = await service.aembed_documents(texts)
+        except BaseException as e:
+            for text in texts:
+                # Failed texts are embedded again by the next caller
+                fail_future(self._vectors.pop((model_key, text)), e)
+            if not isinstance(e, Exception):
+                raise
+            logger.warning(f"Embedding {len(texts)} texts for {model_key[0]}/{model_key[1]} failed: {e}")
+            return
+        for text, vector in zip(texts, vectors):
+            future = self._vectors[(model_key, text)]
+            if not future.done():
+                future.set_result(vector)
+
+
+async def aembed_query(service: EmbeddingService, text: str, memo: Optional[EmbeddingMemo] = None) -> List[float]:
+    """Embed a query through the given or current request memo, or directly without one"""
+    memo = memo or get_embedding_memo()
+    if memo is None:
+        return await service.aembed_query(text)
+    return await memo.aembed_query(service, text)
+
+
+async def aembed_documents(
+    service: EmbeddingService, texts: List[str], memo: Optional[EmbeddingMemo] = None
+) -> List[List[float]]:
+    """Embed texts through the given or current request memo, or directly without one"""
+    memo = memo or get_embedding_memo()
+    if memo is None:
+        return await service.aembed_documents(texts)
+    return await memo.aembed_documents(service, texts)
@@ -17,10 +17,11 @@ from __future__ import annotations
 import asyncio
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import litellm
 
+from aperag.llm.embed.embedding_cache import EmbeddingCache, get_embedding_cache, make_cache_key
 from aperag.llm.llm_error_types import (
     BatchProcessingError,
     EmbeddingError,
@@ -41,6 +42,7 @@ class EmbeddingService:
         embedding_max_chunks_in_batch: int,
         multimodal: bool = False,
         caching: bool = True,
+        cache: Optional[EmbeddingCache] = None,
     ):
         self.embedding_provider = embedding_provider
         self.model = embedding_model
@@ -50,6 +52,8 @@ class EmbeddingService:
         self.max_workers = 8
         self.multimodal = multimodal
         self.caching = caching
+        # Per-text cache shared across collections; only misses are sent to the provider
+        self.cache = cache if cache is not None else (get_embedding_cache() if caching else None)
 
     def embed_documents(self, contents: List[str]) -> List[List[float]]:
         """
@@ -75,18 +79,36 @@ class EmbeddingService:
         try:
             # Clean contents by replacing newlines with spaces
             clean_contents = [t.replace("\n", " ") if t and t.strip() else " " for t in contents]
-            # Determine batch size (use max_chunks or process all at once if not set)
-            batch_size = self.max_chunks or len(clean_contents)
 
             # Store results with original indices to ensure correct ordering
             results_dict: Dict[int, List[float]] = {}
 
+            # Resolve cached vectors first, then embed each distinct missing text only once
+            cache_keys: List[str] = []
+            if self.cache is not None:
+                cache_keys = [make_cache_key(self.embedding_provider, self.model, t) for t in clean_contents]
+                cached = self.cache.get_many(list(dict.fromkeys(cache_keys)))
+                for i, key in enumerate(cache_keys):
+                    if key in cached:
+                        results_dict[i] = cached[key]
+            pending: Dict[str, List[int]] = {}
+            for i, text in enumerate(clean_contents):
+                if i not in results_dict:
+                    pending.setdefault(text, []).append(i)
+            if not pending:
+                return [results_dict[i] for i in range(len(clean_contents))]
+
+            miss_contents = list(pending.keys())
+            miss_results: Dict[int, List[float]] = {}
+            # Determine batch size (use max_chunks or process all at once if not set)
+            batch_size = self.max_chunks or len(miss_contents)
+
             with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
                 futures = []
 
                 # Submit batches for processing with their starting indices
-                for start in range(0, len(clean_contents), batch_size):
-                    batch = clean_contents[start : start + batch_size]
+                for start in range(0, len(miss_contents), batch_size):
+                    batch = miss_contents[start : start + batch_size]
                     # Pass both the batch and starting index to track position
                     future = pool.submit(self._embed_batch_with_indices, batch, start)
                     futures.append(future)
@@ -98,7 +120,7 @@ class EmbeddingService:
                         # Get results with their original indices
                         batch_results = future.result()
                         for idx, embedding in batch_results:
-                            results_dict[idx] = embedding
+                            miss_results[idx] = embedding
                     except Exception as e:
                         failed_batches.append(str(e))
                         logger.error(f"Batch processing failed: {e}")
@@ -110,6 +132,16 @@ class EmbeddingService:
                         f"contents: {contents}",
                     )
 
+            new_entries: Dict[str, List[float]] = {}
+            for miss_idx, text in enumerate(miss_contents):
+                embedding = miss_results[miss_idx]
+                for i in pending[text]:
+                    results_dict[i] = embedding
+                if self.cache is not None:
+                    new_entries[cache_keys[pending[text][0]]] = embedding
+            if new_entries:
+                self.cache.set_many(new_entries)
+
             # Reconstruct the result list in the original order
             results = [results_dict[i] for i in range(len(clean_contents))]
             return results
@@ -16,7 +16,7 @@
 # -*- coding: utf-8 -*-
 # import faulthandler
 import logging
-from typing import List
+from typing import List, Optional
 
 from langchain_core.embeddings import Embeddings
 from llama_index.core.schema import BaseNode, TextNode
@@ -39,6 +39,7 @@ def create_embeddings_and_store(
     chunk_size: int = None,
     chunk_overlap: int = None,
     tokenizer=None,
+    chunked_parts: Optional[List[Part]] = None,
 ) -> List[str]:
     """
     Processes document parts, rechunks content, generates embeddings,
@@ -51,6 +52,7 @@ def create_embeddings_and_store(
         chunk_size: Size for chunking text (defaults to settings.chunk_size)
         chunk_overlap: Overlap size for chunking (defaults to settings.chunk_overlap_size)
         tokenizer: Tokenizer to use (defaults to default tokenizer)
+        chunked_parts: Parts already rechunked with the same parameters, skips rechunking if given
 
     Returns:
         List[str]: A list of vector store IDs
@@ -67,7 +69,8 @@ def create_embeddings_and_store(
 
     # 1. Rechunk the document parts (resulting in text parts)
     # After rechunk(), parts only contains TextPart
-    chunked_parts = rechunk(parts, chunk_size, chunk_overlap, tokenizer)
+    if chunked_parts is None:
+        chunked_parts = rechunk(parts, chunk_size, chunk_overlap, tokenizer)
 
     # 2. Process each text chunk
     for part in chunked_parts:
@@ -0,0 +1,185 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared keyword extraction for user questions.
+
+Graph search and fulltext search both ask an LLM for the keywords of the same question.
+Both go through ``query_keyword_cache`` with the LightRAG keyword prompt, which yields
+high-level and low-level keywords usable by either retriever.
+
+Results are keyed by the normalized question, the conversation history window, the
+language and the model. A question also gets an entry without the model, so whichever
+retriever extracts first serves the other one. Concurrent requests for the same question
+share a single LLM call. Entries live in an in-process LRU and in Redis.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aperag.utils.single_flight import fail_future
+
+logger = logging.getLogger(__name__)
+
+KEYWORD_CACHE_PREFIX = "aperag:query_keywords"
+# Extracted keywords are kept this many seconds in Redis
+KEYWORD_CACHE_TTL = 3600
+KEYWORD_CACHE_MAX_ENTRIES = 4096
+
+Keywords = Tuple[List[str], List[str]]
+
+
+def normalize_query(text: str) -> str:
+    """Case and whitespace insensitive form of a question, used for cache keys"""
+    return " ".join((text or "").split()).casefold()
+
+
+def build_keywords_prompt(query: str, language: str, history: str = "", example_number: Optional[int] = None) -> str:
+    """Build the LightRAG keyword extraction prompt"""
+    from aperag.graph.lightrag.prompt import PROMPTS
+
+    if example_number and example_number < len(PROMPTS["keywords_extraction_examples"]):
+        examples = "\n".join(PROMPTS["keywords_extraction_examples"][: int(example_number)])
+    else:
+        examples = "\n".join(PROMPTS["keywords_extraction_examples"])
+
+    return PROMPTS["keywords_extraction"].format(query=query, examples=examples, language=language, history=history)
+
+
+def parse_keywords_response(result: str) -> Keywords:
+    """Return the (high level, low level) keywords of an LLM keyword extraction response"""
+    match = re.search(r"\{.*\}", result or "", re.DOTALL)
+    if not match:
+        logger.error("No JSON-like structure found in the LLM respond.")
+        return [], []
+    try:
+        keywords_data = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON parsing error: {e}")
+        return [], []
+
+    return keywords_data.get("high_level_keywords", []), keywords_data.get("low_level_keywords", [])
+
+
+class QueryKeywordCache:
+    """Single-flight keyword extraction backed by an in-process LRU and Redis"""
+
+    def __init__(self, max_entries: int = KEYWORD_CACHE_MAX_ENTRIES, ttl: int = KEYWORD_CACHE_TTL, use_redis=True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Keywords]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_extract(
+        self,
+        query: str,
+        history: str,
+        language: str,
+        model: str,
+        extract: Callable[[], Awaitable[Keywords]],
+    ) -> Keywords:
+        """Return the keywords of a question, calling extract only when nobody has them yet"""
+        question_key = self._make_key(query, history, language)
+        model_key = self._make_key(query, history, language, model)
+
+        cached = self._get_local(model_key) or self._get_local(question_key)
+        if cached:
+            return cached
+
+        inflight = self._inflight.get(question_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[question_key] = future
+        try:
+            keywords = await self._get_remote(model_key, question_key)
+            if not keywords:
+                keywords = await extract()
+                if keywords[0] or keywords[1]:
+                    await self._set_remote([model_key, question_key], keywords)
+            if keywords[0] or keywords[1]:
+                self._set_local([model_key, question_key], keywords)
+            future.set_result(keywords)
+            return keywords
+        except BaseException as e:
+            fail_future(future, e)
+            raise
+        finally:
+            self._inflight.pop(question_key, None)
+
+    def _make_key(self, query: str, history: str, language: str, model: Optional[str] = None) -> str:
+        parts = [normalize_query(query), history or "", language or ""]
+        if model is not None:
+            parts.append(model)
+        digest = hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+        return f"{KEYWORD_CACHE_PREFIX}:{'model' if model is not None else 'question'}:{digest}"
+
+    def _get_local(self, key: str) -> Optional[Keywords]:
+        with self._lock:
+            keywords = self._data.get(key)
+            if keywords is not None:
+                self._data.move_to_end(key)
+            return keywords
+
+    def _set_local(self, keys: List[str], keywords: Keywords):
+        with self._lock:
+            for key in keys:
+                self._data[key] = keywords
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    async def _get_remote(self, *keys: str) -> Optional[Keywords]:
+        if not self.use_redis:
+            return None
+        try:
+            from aperag.db.redis_manager import get_async_redis_client
+
+            client = await get_async_redis_client()
+            for value in await client.mget(list(keys)):
+                if value:
+                    data = json.loads(value)
+                    return data["high_level_keywords"], data["low_level_keywords"]
+        except Exception as e:
+            # A broken cache must never fail a search, treat it as a miss
+            logger.warning(f"Keyword cache lookup failed: {e}")
+        return None
+
+    async def _set_remote(self, keys: List[str], keywords: Keywords):
+        if not self.use_redis:
+            return
+        try:
+            from aperag.db.redis_manager import get_async_redis_client
+
+            client = await get_async_redis_client()
+            value = json.dumps({"high_level_keywords": keywords[0], "low_level_keywords": keywords[1]})
+            pipe = client.pipeline()
+            for key in keys:
+                pipe.set(key, value, ex=self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Keyword cache store failed: {e}")
+
+
+# Global keyword cache shared by graph and fulltext search
+query_keyword_cache = QueryKeywordCache()
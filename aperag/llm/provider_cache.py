@@ -0,0 +1,162 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-process cache of LLM provider configuration.
+
+The query path resolves the same provider API keys, provider rows and provider models on
+every request. This cache keeps the lookups for ``PROVIDER_CACHE_TTL`` seconds and reuses
+the completion, embedding and rerank service objects built from them, so a steady stream
+of queries does no configuration round trips to the database.
+
+Writes through ``llm_provider_service`` call ``invalidate()``, which bumps a version
+counter: entries cached or being loaded before the write are never served afterwards.
+Other processes pick up the change once their entries expire.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from aperag.db.ops import async_db_ops, db_ops
+
+logger = logging.getLogger(__name__)
+
+# How long a configuration lookup is served from the cache, in seconds
+PROVIDER_CACHE_TTL = 60
+# Upper bound for both cached lookups and cached service objects
+PROVIDER_CACHE_MAX_ENTRIES = 1024
+
+_MISSING = object()
+
+
+class ProviderConfigCache:
+    """TTL cache for provider lookups plus an LRU of reusable service objects"""
+
+    def __init__(self, ttl: float = PROVIDER_CACHE_TTL, max_entries: int = PROVIDER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version = 0
+        self._lock = threading.Lock()
+        self._lookups: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._services: "OrderedDict[tuple, Any]" = OrderedDict()
+
+    def invalidate(self):
+        """Drop everything cached, called after provider configuration changes"""
+        with self._lock:
+            self.version += 1
+            self._lookups.clear()
+            self._services.clear()
+
+    def get_api_key(self, provider_name: str, user_id: str = None, need_public: bool = True) -> Optional[str]:
+        return self._load(
+            ("api_key", provider_name, user_id, need_public),
+            lambda: db_ops.query_provider_api_key(provider_name, user_id, need_public),
+        )
+
+    def get_provider(self, provider_name: str):
+        return self._load(("provider", provider_name), lambda: db_ops.query_llm_provider_by_name(provider_name))
+
+    def get_provider_model(self, provider_name: str, api: str, model: str):
+        return self._load(
+            ("model", provider_name, api, model),
+            lambda: db_ops.query_llm_provider_model(provider_name, api, model),
+        )
+
+    async def aget_api_key(self, provider_name: str, user_id: str = None, need_public: bool = True) -> Optional[str]:
+        return await self._aload(
+            ("api_key", provider_name, user_id, need_public),
+            lambda: async_db_ops.query_provider_api_key(provider_name, user_id, need_public),
+        )
+
+    async def aget_provider(self, provider_name: str):
+        return await self._aload(
+            ("provider", provider_name), lambda: async_db_ops.query_llm_provider_by_name(provider_name)
+        )
+
+    async def aget_provider_model(self, provider_name: str, api: str, model: str):
+        return await self._aload(
+            ("model", provider_name, api, model),
+            lambda: async_db_ops.query_llm_provider_model(provider_name, api, model),
+        )
+
+    def get_service(self, key: tuple, factory: Optional[Callable[[], Any]] = None):
+        """
+        Return the service object cached under key, building it with factory on a miss.
+
+        The key must contain every argument the service is built from. Without a factory
+        a miss returns None.
+        """
+        version = self.version
+        with self._lock:
+            service = self._services.get(key)
+            if service is not None:
+                self._services.move_to_end(key)
+                return service
+        if factory is None:
+            return None
+
+        service = factory()
+        with self._lock:
+            if version != self.version:
+                return service
+            service = self._services.setdefault(key, service)
+            self._services.move_to_end(key)
+            while len(self._services) > self.max_entries:
+                self._services.popitem(last=False)
+        return service
+
+    def _get(self, key: tuple):
+        with self._lock:
+            entry = self._lookups.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._lookups[key]
+                return _MISSING
+            self._lookups.move_to_end(key)
+            return value
+
+    def _put(self, key: tuple, value, version: int):
+        with self._lock:
+            # A write happened while the value was loading, it may be stale
+            if version != self.version:
+                return
+            self._lookups[key] = (time.monotonic() + self.ttl, value)
+            self._lookups.move_to_end(key)
+            while len(self._lookups) > self.max_entries:
+                self._lookups.popitem(last=False)
+
+    def _load(self, key: tuple, loader: Callable[[], Any]):
+        version = self.version
+        value = self._get(key)
+        if value is _MISSING:
+            value = loader()
+            self._put(key, value, version)
+        return value
+
+    async def _aload(self, key: tuple, loader: Callable[[], Awaitable[Any]]):
+        version = self.version
+        value = self._get(key)
+        if value is _MISSING:
+            value = await loader()
+            self._put(key, value, version)
+        return value
+
+
+# Global provider configuration cache
+provider_config_cache = ProviderConfigCache()
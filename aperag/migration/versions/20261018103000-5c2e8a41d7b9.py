@@ -0,0 +1,31 @@
+"""index lightrag document and chunk references
+
+Revision ID: 5c2e8a41d7b9
+Revises: 332faa764121
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a41d7b9'
+down_revision: Union[str, None] = '332faa764121'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_lightrag_doc_chunks_workspace_doc', 'lightrag_doc_chunks', ['workspace', 'full_doc_id'], unique=False)
+    op.create_index('idx_lightrag_vdb_entity_chunk_ids', 'lightrag_vdb_entity', ['chunk_ids'], unique=False, postgresql_using='gin')
+    op.create_index('idx_lightrag_vdb_relation_chunk_ids', 'lightrag_vdb_relation', ['chunk_ids'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_lightrag_vdb_relation_chunk_ids', table_name='lightrag_vdb_relation', postgresql_using='gin')
+    op.drop_index('idx_lightrag_vdb_entity_chunk_ids', table_name='lightrag_vdb_entity', postgresql_using='gin')
+    op.drop_index('idx_lightrag_doc_chunks_workspace_doc', table_name='lightrag_doc_chunks')
@@ -0,0 +1,50 @@
+"""add hnsw indexes to lightrag vector tables
+
+Revision ID: 8f3d6b1e2a47
+Revises: 5c2e8a41d7b9
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3d6b1e2a47'
+down_revision: Union[str, None] = '5c2e8a41d7b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('lightrag_doc_chunks', 'lightrag_vdb_entity', 'lightrag_vdb_relation')
+DIMENSIONS = (384, 512, 768, 1024, 1536)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build concurrently so LightRAG writes are not blocked while populated tables are indexed
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            for dim in DIMENSIONS:
+                op.create_index(
+                    f'idx_{table}_vector_{dim}',
+                    table,
+                    [sa.text(f'(content_vector::vector({dim})) vector_cosine_ops')],
+                    unique=False,
+                    postgresql_using='hnsw',
+                    postgresql_where=sa.text(f'vector_dims(content_vector) = {dim}'),
+                    postgresql_concurrently=True,
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            for dim in reversed(DIMENSIONS):
+                op.drop_index(
+                    f'idx_{table}_vector_{dim}',
+                    table_name=table,
+                    postgresql_concurrently=True,
+                )
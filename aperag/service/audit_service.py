@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import json
 import logging
 import re
@@ -19,19 +20,52 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from sqlalchemy import and_, desc, select
+from sqlalchemy import and_, desc, insert, select
 
 from aperag.config import get_async_session
 from aperag.db.models import AuditLog, AuditResource
+from aperag.utils.utils import utc_now
 
 logger = logging.getLogger(__name__)
 
+# Entries waiting for the background writer, beyond this successful calls are dropped
+AUDIT_QUEUE_MAX_SIZE = 10000
+# A batch is written once it has this many entries or is this many seconds old
+AUDIT_BATCH_SIZE = 200
+AUDIT_FLUSH_INTERVAL = 1.0
+# How long a failed call waits for room in a full queue before it is dropped too
+AUDIT_ENQUEUE_TIMEOUT = 0.1
+AUDIT_DROP_LOG_INTERVAL = 1000
+AUDIT_SHUTDOWN_TIMEOUT = 10.0
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+# Client supplied values cut to their column length, so one long value cannot fail a whole batch
+_TRUNCATED_COLUMNS = {
+    name: AuditLog.__table__.c[name].type.length
+    for name in ("username", "api_name", "path", "ip_address", "user_agent", "request_id")
+}
+
 
 class AuditService:
     """Service for handling audit logs"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_queue_size: int = AUDIT_QUEUE_MAX_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+    ):
         self.enabled = True
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Number of entries dropped because the queue was full
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
         # Sensitive fields that should be filtered from logs
         self.sensitive_fields = {
             "password",
@@ -134,44 +168,139 @@ class AuditService:
         user_agent: Optional[str] = None,
         request_id: Optional[str] = None,
     ):
-        """Log an audit entry"""
+        """Queue an audit entry for the background writer"""
         if not self.enabled:
             return
 
-        try:
-            # Create audit log entry
-            audit_log = AuditLog(
-                id=str(uuid.uuid4()),
-                user_id=user_id,
-                username=username,
-                resource_type=resource_type,
-                api_name=api_name,
-                http_method=http_method,
-                path=path,
-                status_code=status_code,
-                start_time=start_time,
-                end_time=end_time,
-                request_data=self._safe_json_serialize(request_data),
-                response_data=self._safe_json_serialize(response_data),
-                error_message=error_message,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_id=request_id or str(uuid.uuid4()),
-            )
+        entry = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "username": username,
+            "resource_type": resource_type,
+            "api_name": api_name,
+            "http_method": http_method,
+            "path": path,
+            "status_code": status_code,
+            "start_time": start_time,
+            "end_time": end_time,
+            "request_data": request_data,
+            "response_data": response_data,
+            "error_message": error_message,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "request_id": request_id or str(uuid.uuid4()),
+            "gmt_created": utc_now(),
+        }
+        for name, length in _TRUNCATED_COLUMNS.items():
+            value = entry[name]
+            if isinstance(value, str) and len(value) > length:
+                entry[name] = value[:length]
+
+        if self._closing:
+            # The writer is gone, save the entry on its own
+            await self._flush([entry])
+            return
 
-            # Save to database with proper session management
-            async def _save_audit_log(session):
-                session.add(audit_log)
-                await session.commit()
-                return audit_log
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(entry)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        # Failed calls are worth waiting for, successful ones are sampled under pressure
+        if status_code is not None and status_code >= 400:
+            try:
+                await asyncio.wait_for(self._queue.put(entry), timeout=AUDIT_ENQUEUE_TIMEOUT)
+                return
+            except asyncio.TimeoutError:
+                pass
+
+        self.dropped += 1
+        if self.dropped % AUDIT_DROP_LOG_INTERVAL == 1:
+            logger.warning(f"Audit queue is full, {self.dropped} audit entries dropped so far")
+
+    def start(self):
+        """Start the background audit writer"""
+        self._closing = False
+        self._ensure_worker()
+
+    async def shutdown(self, timeout: float = AUDIT_SHUTDOWN_TIMEOUT):
+        """Stop accepting queued entries and write everything still in the queue"""
+        self._closing = True
+        worker = self._worker
+        if worker is None or worker.done():
+            return
 
-            # Use get_async_session with proper session management
-            async for session in get_async_session():
-                await _save_audit_log(session)
-                break  # Only process one session
+        async def _drain():
+            await self._queue.put(_STOP)
+            await worker
 
+        try:
+            await asyncio.wait_for(_drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Audit writer did not drain within {timeout}s, {self._queue.qsize()} entries lost")
+        finally:
+            self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is not None and not self._worker.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker = asyncio.create_task(self._run_worker())
+
+    async def _run_worker(self):
+        """Collect queued entries and write them in batches"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is _STOP:
+                break
+
+            batch = [entry]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            await self._flush(batch)
+
+    async def _flush(self, entries):
+        """Serialize the queued entries and insert them with one statement"""
+        try:
+            rows = []
+            for entry in entries:
+                row = dict(entry)
+                row["request_data"] = self._safe_json_serialize(row["request_data"])
+                row["response_data"] = self._safe_json_serialize(row["response_data"])
+                rows.append(row)
+            await self._insert_rows(rows)
+            return
         except Exception as e:
-            logger.error(f"Failed to log audit: {e}")
+            if len(entries) == 1:
+                logger.error(f"Failed to log audit entry for {entries[0].get('path')}: {e}")
+                return
+            logger.warning(f"Failed to log {len(entries)} audit entries in one batch, retrying one by one: {e}")
+
+        # Only the entries that fail on their own are lost
+        for entry in entries:
+            await self._flush([entry])
+
+    async def _insert_rows(self, rows):
+        async for session in get_async_session():
+            await session.execute(insert(AuditLog).values(rows))
+            await session.commit()
+            break  # Only process one session
 
     async def list_audit_logs(
         self,
@@ -70,9 +70,8 @@ class ChatTitleService:
 
         # Read recent conversation turns from Redis
         history = RedisChatMessageHistory(chat_id, redis_client=get_async_redis_client())
-        stored_messages = await history.messages
         # Take most recent N turns
-        recent_turns = stored_messages[-turns:] if turns < len(stored_messages) else stored_messages
+        recent_turns = await history.recent_messages(limit=turns)
         # Convert to OpenAI format messages
         openai_messages = []
         for turn in recent_turns:
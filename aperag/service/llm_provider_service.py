@@ -16,6 +16,7 @@ from typing import Optional
 
 from aperag.db.ops import async_db_ops
 from aperag.exceptions import PermissionDeniedError, ResourceNotFoundException, invalid_param
+from aperag.llm.provider_cache import provider_config_cache
 from aperag.views.utils import generate_random_provider_name, mask_api_key
 
 # Constants
@@ -208,6 +209,8 @@ async def create_llm_provider(provider_data: dict, user_id: str, is_admin: bool
             # Create or update API key for this provider
             await async_db_ops.upsert_msp(name=provider_data["name"], api_key=api_key)
 
+    provider_config_cache.invalidate()
+
     return {
         "name": provider.name,
         "user_id": provider.user_id,
@@ -305,6 +308,8 @@ async def update_llm_provider(provider_name: str, update_data: dict, user_id: st
         if api_key and api_key.strip():
             await async_db_ops.upsert_msp(name=provider_name, api_key=api_key)
 
+    provider_config_cache.invalidate()
+
     return {
         "name": provider.name,
         "user_id": provider.user_id,
@@ -345,6 +350,8 @@ async def delete_llm_provider(provider_name: str, user_id: str, is_admin: bool =
     # Physical delete the API key for this provider
     await async_db_ops.delete_msp_by_name(provider_name)
 
+    provider_config_cache.invalidate()
+
     return True
 
 
@@ -376,6 +383,8 @@ async def publish_llm_provider(provider_name: str, user_id: str):
         user_id=PUBLIC_USER_ID,
     )
 
+    provider_config_cache.invalidate()
+
     return {
         "name": updated_provider.name,
         "user_id": updated_provider.user_id,
@@ -499,6 +508,8 @@ async def create_llm_provider_model(provider_name: str, model_data: dict, user_i
             tags=model_data.get("tags", []),
         )
 
+    provider_config_cache.invalidate()
+
     return {
         "provider_name": model.provider_name,
         "api": model.api,
@@ -551,6 +562,8 @@ async def update_llm_provider_model(
         tags=update_data.get("tags"),
     )
 
+    provider_config_cache.invalidate()
+
     return {
         "provider_name": model_obj.provider_name,
         "api": model_obj.api,
@@ -596,4 +609,6 @@ async def delete_llm_provider_model(
     # Soft delete the model
     await async_db_ops.delete_llm_provider_model(provider_name, api, model)
 
+    provider_config_cache.invalidate()
+
     return True
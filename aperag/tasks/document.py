@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import logging
+from typing import Any, Dict
 
 from aperag.db.models import DocumentIndexType
 from aperag.tasks.models import IndexTaskResult, LocalDocumentInfo, ParsedDocumentData
@@ -36,15 +37,45 @@ class DocumentIndexTask:
         Returns:
             ParsedDocumentData containing all parsed information
         """
-        logger.info(f"Parsing document {document_id}")
+        from aperag.tasks.utils import get_document_and_collection
+
+        document, collection = get_document_and_collection(document_id)
+        return self._parse_document(document, collection)
+
+    def parse_document_to_store(self, document_id: str) -> Dict[str, Any]:
+        """
+        Parse document content and store it in the object store
 
+        Args:
+            document_id: Document ID to parse
+
+        Returns:
+            Small handle of the stored ParsedDocumentData, see aperag/tasks/parsed_data_store.py
+        """
+        from aperag.tasks.parsed_data_store import save_parsed_data
         from aperag.tasks.utils import get_document_and_collection
 
         document, collection = get_document_and_collection(document_id)
+        parsed_data = self._parse_document(document, collection)
+        return save_parsed_data(parsed_data, document.object_store_base_path())
+
+    def _parse_document(self, document, collection) -> ParsedDocumentData:
+        document_id = document.id
+        logger.info(f"Parsing document {document_id}")
+
         content, doc_parts, local_doc = parse_document_content(document, collection)
 
         local_doc_info = LocalDocumentInfo(path=local_doc.path, is_temp=getattr(local_doc, "is_temp", False))
 
+        # Chunk once here so that the vector and fulltext indexers don't rechunk the same parts
+        chunk_artifact_path = None
+        try:
+            from aperag.index.chunk_artifact import save_chunk_artifact
+
+            chunk_artifact_path = save_chunk_artifact(doc_parts, document.object_store_base_path())
+        except Exception as e:
+            logger.warning(f"Failed to build chunk artifact for document {document_id}, indexers will rechunk: {e}")
+
         return ParsedDocumentData(
             document_id=document_id,
             collection_id=collection.id,
@@ -52,8 +83,16 @@ class DocumentIndexTask:
             doc_parts=doc_parts,
             file_path=local_doc.path,
             local_doc_info=local_doc_info,
+            chunk_artifact_path=chunk_artifact_path,
         )
 
+    def _load_chunks(self, parsed_data: ParsedDocumentData):
+        """Load the shared chunks produced by parse_document, or None if indexers must rechunk"""
+        from aperag.index.chunk_artifact import load_chunk_artifact
+
+        artifact = load_chunk_artifact(parsed_data.chunk_artifact_path)
+        return artifact.chunks if artifact is not None else None
+
     def create_index(self, document_id: str, index_type: str, parsed_data: ParsedDocumentData) -> IndexTaskResult:
         """
         Create a single index for a document using parsed data
@@ -83,6 +122,7 @@ class DocumentIndexTask:
                     doc_parts=parsed_data.doc_parts,
                     collection=collection,
                     file_path=parsed_data.file_path,
+                    chunks=self._load_chunks(parsed_data),
                 )
                 if not result.success:
                     raise Exception(result.error)
@@ -97,6 +137,7 @@ class DocumentIndexTask:
                     doc_parts=parsed_data.doc_parts,
                     collection=collection,
                     file_path=parsed_data.file_path,
+                    chunks=self._load_chunks(parsed_data),
                 )
                 if not result.success:
                     raise Exception(result.error)
@@ -273,6 +314,7 @@ class DocumentIndexTask:
                     doc_parts=parsed_data.doc_parts,
                     collection=collection,
                     file_path=parsed_data.file_path,
+                    chunks=self._load_chunks(parsed_data),
                 )
                 if not result.success:
                     raise Exception(result.error)
@@ -287,6 +329,7 @@ class DocumentIndexTask:
                     doc_parts=parsed_data.doc_parts,
                     collection=collection,
                     file_path=parsed_data.file_path,
+                    chunks=self._load_chunks(parsed_data),
                 )
                 if not result.success:
                     raise Exception(result.error)
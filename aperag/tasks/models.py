@@ -53,6 +53,8 @@ class ParsedDocumentData:
     doc_parts: List[Any]
     file_path: str
     local_doc_info: LocalDocumentInfo
+    # Object store path of the shared chunk artifact, see aperag/index/chunk_artifact.py
+    chunk_artifact_path: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dict with proper serialization of doc_parts"""
@@ -63,6 +65,7 @@ class ParsedDocumentData:
             "doc_parts": self._serialize_doc_parts(self.doc_parts),
             "file_path": self.file_path,
             "local_doc_info": self.local_doc_info.to_dict(),
+            "chunk_artifact_path": self.chunk_artifact_path,
         }
 
     def _serialize_doc_parts(self, doc_parts: List[Any]) -> List[Dict[str, Any]]:
@@ -111,6 +114,7 @@ class ParsedDocumentData:
             doc_parts=[],  # Will be set below
             file_path=data["file_path"],
             local_doc_info=local_doc_info,
+            chunk_artifact_path=data.get("chunk_artifact_path"),
         )
         # Deserialize doc_parts to restore object-like behavior
         instance.doc_parts = instance._deserialize_doc_parts(data["doc_parts"])
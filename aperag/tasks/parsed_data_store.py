@@ -0,0 +1,225 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parsed document data passed by reference.
+
+``parse_document_task`` writes the ParsedDocumentData of a document once to the object store as
+zstd-compressed JSON and returns a small handle. The index tasks receive only the handle and load
+the data themselves. Each worker keeps a local copy per document version (the digest of the
+payload), so several index types running on the same worker download it once.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict
+
+import zstandard
+
+from aperag.config import settings
+from aperag.tasks.models import ParsedDocumentData
+
+logger = logging.getLogger(__name__)
+
+PARSED_DATA_FORMAT_VERSION = 1
+
+# Marks a handle in place of a full ParsedDocumentData dict
+HANDLE_KEY = "parsed_data_path"
+
+# Local cache writes between two full scans, which also pick up what other processes wrote
+LOCAL_CACHE_SCAN_INTERVAL = 100
+
+# Estimated size of the local cache, kept up to date by the writes of this process
+_local_cache_lock = threading.Lock()
+_local_cache_usage = {"dir": None, "bytes": None, "writes": 0}
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, bytes):
+        return {"__bytes__": base64.b64encode(obj).decode("ascii")}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__bytes__" in obj:
+        return base64.b64decode(obj["__bytes__"])
+    return obj
+
+
+def encode_parsed_data(parsed_data: ParsedDocumentData) -> bytes:
+    payload = {"version": PARSED_DATA_FORMAT_VERSION, "data": parsed_data.to_dict()}
+    raw = json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+    return zstandard.ZstdCompressor(level=settings.parsed_data_zstd_level).compress(raw)
+
+
+def decode_parsed_data(data: bytes) -> ParsedDocumentData:
+    payload = json.loads(zstandard.ZstdDecompressor().decompress(data), object_hook=_json_object_hook)
+    if payload.get("version") != PARSED_DATA_FORMAT_VERSION:
+        raise ValueError(f"Unsupported parsed data format version: {payload.get('version')}")
+    return ParsedDocumentData.from_dict(payload["data"])
+
+
+def parsed_data_path(object_store_base_path: str, digest: str) -> str:
+    return f"{object_store_base_path}/parsed/{digest}.json.zst"
+
+
+def is_parsed_data_handle(value: Dict[str, Any]) -> bool:
+    return isinstance(value, dict) and HANDLE_KEY in value
+
+
+def save_parsed_data(parsed_data: ParsedDocumentData, object_store_base_path: str) -> Dict[str, Any]:
+    """
+    Store parsed data in the object store and return the handle passed to the index tasks.
+    """
+    from aperag.objectstore.base import get_object_store
+
+    data = encode_parsed_data(parsed_data)
+    digest = hashlib.sha256(data).hexdigest()
+    path = parsed_data_path(object_store_base_path, digest)
+
+    obj_store = get_object_store()
+    if not obj_store.obj_exists(path):
+        # Parsed data of older document versions is not needed anymore
+        obj_store.delete_objects_by_prefix(f"{object_store_base_path}/parsed/")
+        obj_store.put(path, data)
+        logger.info(f"Saved parsed data of document {parsed_data.document_id} to {path}, size: {len(data)}")
+    # The local copy saves the download when an index task runs on this worker
+    _write_local_cache(parsed_data.document_id, digest, data)
+
+    return {"document_id": parsed_data.document_id, HANDLE_KEY: path, "digest": digest, "size": len(data)}
+
+
+def load_parsed_data(handle: Dict[str, Any]) -> ParsedDocumentData:
+    """
+    Load the parsed data referenced by a handle, from the local cache if this worker has it.
+
+    A full ParsedDocumentData dict (from tasks queued before handles were introduced) is accepted too.
+    """
+    if not is_parsed_data_handle(handle):
+        return ParsedDocumentData.from_dict(handle)
+
+    document_id, digest = handle["document_id"], handle["digest"]
+    data = _read_local_cache(document_id, digest)
+    if data is None:
+        from aperag.objectstore.base import get_object_store
+
+        stream = get_object_store().get(handle[HANDLE_KEY])
+        if stream is None:
+            raise FileNotFoundError(f"Parsed data {handle[HANDLE_KEY]} not found")
+        with stream:
+            data = stream.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Parsed data {handle[HANDLE_KEY]} does not match its digest")
+        _write_local_cache(document_id, digest, data)
+    return decode_parsed_data(data)
+
+
+def _local_cache_dir(document_id: str) -> str:
+    return os.path.join(settings.parsed_data_cache_dir, str(document_id))
+
+
+def _read_local_cache(document_id: str, digest: str) -> bytes | None:
+    if not settings.parsed_data_cache_dir:
+        return None
+    path = os.path.join(_local_cache_dir(document_id), f"{digest}.json.zst")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if hashlib.sha256(data).hexdigest() != digest:
+        logger.warning(f"Discarding corrupted local parsed data {path}")
+        return None
+    return data
+
+
+def _write_local_cache(document_id: str, digest: str, data: bytes):
+    if not settings.parsed_data_cache_dir:
+        return
+    try:
+        cache_dir = _local_cache_dir(document_id)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Size change of the cache, for the estimate that decides when to prune
+        added = len(data)
+        # Keep only the current version of each document
+        for name in os.listdir(cache_dir):
+            if not name.startswith(digest):
+                old_path = os.path.join(cache_dir, name)
+                added -= os.path.getsize(old_path)
+                os.remove(old_path)
+
+        path = os.path.join(cache_dir, f"{digest}.json.zst")
+        if os.path.exists(path):
+            added -= len(data)
+
+        # Index tasks of one document load it concurrently, every writer needs its own temp file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f"{digest}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        _account_local_cache_write(added)
+    except OSError as e:
+        logger.warning(f"Failed to write local parsed data cache for document {document_id}: {e}")
+
+
+def _account_local_cache_write(added: int):
+    """Track the cache size and prune once the estimate crosses the limit or a full scan is due"""
+    with _local_cache_lock:
+        usage = _local_cache_usage
+        if usage["dir"] != settings.parsed_data_cache_dir:
+            usage.update(dir=settings.parsed_data_cache_dir, bytes=None, writes=0)
+        usage["writes"] += 1
+        if usage["bytes"] is not None:
+            usage["bytes"] += added
+            if usage["bytes"] <= settings.parsed_data_cache_max_bytes and usage["writes"] % LOCAL_CACHE_SCAN_INTERVAL:
+                return
+        usage["bytes"] = _prune_local_cache()
+
+
+def _prune_local_cache() -> int:
+    """Remove least recently written entries when the cache exceeds PARSED_DATA_CACHE_MAX_BYTES, return its size"""
+    entries = []
+    total = 0
+    for root, _, files in os.walk(settings.parsed_data_cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= settings.parsed_data_cache_max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+    return total
@@ -14,10 +14,13 @@
 
 # Configuration constants
 import json
+import logging
 from typing import Any, List, Tuple
 
 from aperag.exceptions import CollectionNotFoundException, DocumentNotFoundException
 
+logger = logging.getLogger(__name__)
+
 
 class TaskConfig:
     RETRY_COUNTDOWN_COLLECTION = 60
@@ -26,7 +29,9 @@ class TaskConfig:
 
 def parse_document_content(document, collection) -> Tuple[str, List[Any], Any]:
     """Parse document content for indexing (shared across all index types)"""
+    from aperag.config import settings
     from aperag.index.document_parser import document_parser
+    from aperag.index.parse_cache import load_parse_result, parse_cache_key, save_parse_result
     from aperag.schema.utils import parseCollectionConfig
     from aperag.service.setting_service import setting_service
     from aperag.source.base import get_source
@@ -39,17 +44,31 @@ def parse_document_content(document, collection) -> Tuple[str, List[Any], Any]:
 
     try:
         global_settings = setting_service.get_all_settings_sync()
-
-        # Parse document to get content and parts
-        parsing_result = document_parser.process_document_parsing(
-            local_doc.path,
-            local_doc.metadata,
-            document.object_store_base_path(),
-            global_settings,
-        )
+        object_store_base_path = document.object_store_base_path()
+
+        # Skip parsing when these bytes were already parsed with the same parser settings
+        cache_key = None
+        cached = None
+        if settings.parse_cache_enabled:
+            cache_key = parse_cache_key(local_doc.path, local_doc.metadata, global_settings)
+            cached = load_parse_result(cache_key, object_store_base_path)
+
+        if cached is not None:
+            logger.info(f"Reusing parse result of document {document.id}, key {cache_key}")
+            content, doc_parts = cached
+        else:
+            # Parse document to get content and parts
+            parsing_result = document_parser.process_document_parsing(
+                local_doc.path,
+                local_doc.metadata,
+                object_store_base_path,
+                global_settings,
+            )
+            content, doc_parts = parsing_result.content, parsing_result.doc_parts
+            if cache_key is not None:
+                save_parse_result(cache_key, object_store_base_path, content, doc_parts)
 
         # Add chat metadata to all document parts if this is a chat upload
-        doc_parts = parsing_result.doc_parts
         if document.doc_metadata:
             try:
                 doc_metadata = json.loads(document.doc_metadata)
@@ -68,7 +87,7 @@ def parse_document_content(document, collection) -> Tuple[str, List[Any], Any]:
             except json.JSONDecodeError:
                 pass
 
-        return parsing_result.content, doc_parts, local_doc
+        return content, doc_parts, local_doc
     except Exception as e:
         # Cleanup on error
         source.cleanup_document(local_doc.path)
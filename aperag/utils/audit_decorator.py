@@ -206,26 +206,22 @@ async def _log_audit_async(
         # Extract client info
         ip_address, user_agent = _extract_client_info(request)
 
-        # Log audit in background
-        import asyncio
-
-        asyncio.create_task(
-            audit_service.log_audit(
-                user_id=user_id,
-                username=username,
-                resource_type=resource_type,
-                api_name=api_name,
-                http_method=request.method,
-                path=request.url.path,
-                status_code=status_code,
-                start_time=start_time_ms,
-                end_time=end_time_ms,
-                request_data=request_data,
-                response_data=response_data,
-                error_message=error_message,
-                ip_address=ip_address,
-                user_agent=user_agent,
-            )
+        # Queue the entry for the background audit writer
+        await audit_service.log_audit(
+            user_id=user_id,
+            username=username,
+            resource_type=resource_type,
+            api_name=api_name,
+            http_method=request.method,
+            path=request.url.path,
+            status_code=status_code,
+            start_time=start_time_ms,
+            end_time=end_time_ms,
+            request_data=request_data,
+            response_data=response_data,
+            error_message=error_message,
+            ip_address=ip_address,
+            user_agent=user_agent,
         )
     except Exception as audit_error:
         logger.error(f"Failed to log audit: {audit_error}")
@@ -14,9 +14,11 @@
 
 import json
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from aperag.chat.history import (
     StoredChatMessage,
@@ -28,6 +30,9 @@ from aperag.chat.history import (
 
 logger = logging.getLogger(__name__)
 
+# Number of messages read per round trip when filling a token budget
+HISTORY_PAGE_SIZE = 16
+
 
 class BaseChatMessageHistory(ABC):
     """Abstract base class for storing chat message history.
@@ -100,13 +105,49 @@ class BaseChatMessageHistory(ABC):
         raise NotImplementedError()
 
 
+class DecodedHistoryCache:
+    """In-process LRU of decoded recent messages per history key.
+
+    An entry is only valid while the Redis list still has the same length and the
+    same newest item, so appends and clears from any process invalidate it.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (list length, newest raw item, decoded newest items in chronological order)
+        self._data: "OrderedDict[str, Tuple[int, Any, List[Optional[StoredChatMessage]]]]" = OrderedDict()
+
+    def get(self, key: str, length: int, head: Any, window: int) -> Optional[List[Optional[StoredChatMessage]]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != length or entry[1] != head or len(entry[2]) < window:
+                return None
+            self._data.move_to_end(key)
+            return entry[2][len(entry[2]) - window :]
+
+    def put(self, key: str, length: int, head: Any, items: List[Optional[StoredChatMessage]]) -> None:
+        with self._lock:
+            self._data[key] = (length, head, items)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+decoded_history_cache = DecodedHistoryCache()
+
+
 class RedisChatMessageHistory:
     """Chat message history stored in a Redis database using ApeRAG StoredChatMessage format."""
 
     def __init__(
         self,
         session_id: str,
-        url: str = "redis://localhost:6379/0",
+        url: Optional[str] = None,
         key_prefix: str = "message_store:",
         ttl: Optional[int] = None,
         redis_client=None,
@@ -117,8 +158,15 @@ class RedisChatMessageHistory:
             raise ImportError(
                 "Could not import redis.asyncio python package. Please make sure that redis version >= 4.0.0"
             )
+        # Only a client created for an explicit url is owned and closed by this history
+        self._owns_client = redis_client is None and url is not None
         try:
-            self.redis_client = redis_client or redis.Redis.from_url(url)
+            if redis_client:
+                self.redis_client = redis_client
+            elif url:
+                self.redis_client = redis.Redis.from_url(url)
+            else:
+                self.redis_client = get_async_redis_client()
         except Exception as e:
             logger.error(e)
 
@@ -134,21 +182,82 @@ class RedisChatMessageHistory:
     @property
     async def messages(self) -> List[StoredChatMessage]:
         """Retrieve the messages from Redis as StoredChatMessage objects"""
-        _items = await self.redis_client.lrange(self.key, 0, -1)
-        items = [json.loads(m.decode("utf-8")) for m in _items[::-1]]  # Reverse to get chronological order
-        messages = []
-        for item in items:
-            try:
-                message = storage_dict_to_message(item)
-                messages.append(message)
-            except Exception as e:
-                logger.warning(f"Failed to parse message in history for {self.session_id}: {e}")
-                continue
+        messages, _ = await self._read_window(None)
         return messages
 
+    async def recent_messages(
+        self,
+        limit: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        tokenizer: Optional[Callable[[str], List[int]]] = None,
+    ) -> List[StoredChatMessage]:
+        """Retrieve only the most recent messages, in chronological order.
+
+        Args:
+            limit: Maximum number of messages to return, None for no limit.
+            max_tokens: Token budget for the main content of the returned messages. Older
+                messages are dropped once the budget is reached, None for no budget.
+            tokenizer: Function encoding text into tokens, defaults to the default tiktoken encoding.
+        """
+        if limit is not None and limit <= 0:
+            return []
+        if max_tokens is None:
+            messages, _ = await self._read_window(limit)
+            return messages
+
+        if tokenizer is None:
+            from aperag.utils.tokenizer import get_default_tokenizer
+
+            tokenizer = get_default_tokenizer()
+
+        window = min(limit, HISTORY_PAGE_SIZE) if limit else HISTORY_PAGE_SIZE
+        while True:
+            messages, length = await self._read_window(window)
+            selected = []
+            used_tokens = 0
+            budget_reached = False
+            for message in reversed(messages):
+                tokens = len(tokenizer(message.get_main_content() or ""))
+                if used_tokens + tokens > max_tokens:
+                    budget_reached = True
+                    break
+                used_tokens += tokens
+                selected.append(message)
+            if budget_reached or window >= length or (limit and window >= limit):
+                return selected[::-1]
+            window = min(window * 2, limit) if limit else window * 2
+
+    async def _read_window(self, window: Optional[int]) -> Tuple[List[StoredChatMessage], int]:
+        """Read the newest `window` messages (all if None), returns them with the total list length"""
+        pipe = self.redis_client.pipeline()
+        pipe.llen(self.key)
+        pipe.lindex(self.key, 0)
+        length, head = await pipe.execute()
+        if not length:
+            return [], 0
+
+        window = length if window is None else min(window, length)
+        items = decoded_history_cache.get(self.key, length, head, window)
+        if items is None:
+            _items = await self.redis_client.lrange(self.key, 0, window - 1)
+            items = [self._decode_message(m) for m in _items[::-1]]  # Reverse to get chronological order
+            # Only cache a consistent read, the list may have changed since LLEN
+            if _items and _items[0] == head:
+                decoded_history_cache.put(self.key, length, head, items)
+        return [message for message in items if message is not None], length
+
+    def _decode_message(self, raw: Any) -> Optional[StoredChatMessage]:
+        try:
+            item = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+            return storage_dict_to_message(item)
+        except Exception as e:
+            logger.warning(f"Failed to parse message in history for {self.session_id}: {e}")
+            return None
+
     async def add_stored_message(self, message: StoredChatMessage) -> None:
         """Add a StoredChatMessage directly to Redis"""
         message_json = json.dumps(message_to_storage_dict(message))
+        decoded_history_cache.invalidate(self.key)
         await self.redis_client.lpush(self.key, message_json)
         if self.ttl:
             await self.redis_client.expire(self.key, self.ttl)
@@ -189,10 +298,13 @@ class RedisChatMessageHistory:
 
     async def clear(self) -> None:
         """Clear session memory from Redis"""
+        decoded_history_cache.invalidate(self.key)
         await self.redis_client.delete(self.key)
 
     async def release_redis(self):
-        await self.redis_client.close(close_connection_pool=True)
+        """Close the Redis client if this history created it, shared clients stay open"""
+        if self._owns_client:
+            await self.redis_client.close(close_connection_pool=True)
 
 
 async def query_chat_messages(user: str, chat_id: str):
@@ -0,0 +1,33 @@
+# Copyright 2025 ApeCloud, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helpers for single-flight futures, where one caller does the work and concurrent callers await
+its future instead of repeating it.
+"""
+
+import asyncio
+
+
+def fail_future(future: asyncio.Future, error: BaseException):
+    """Pass the failure of the caller doing the work on to the callers waiting for its future"""
+    if future.done():
+        return
+    if isinstance(error, Exception):
+        future.set_exception(error)
+        # Waiters get the error, nobody needs to retrieve it otherwise
+        future.exception()
+    else:
+        # Cancellation and interpreter exits are not results, the waiters are cancelled instead
+        future.cancel()
@@ -18,6 +18,10 @@ from typing import Callable, List
 import tiktoken
 
 
+def get_default_tokenizer_name() -> str:
+    return os.environ.get("DEFAULT_ENCODING_MODEL", "cl100k_base")
+
+
 def get_default_tokenizer() -> Callable[[str], List[int]]:
-    encoding = tiktoken.get_encoding(os.environ.get("DEFAULT_ENCODING_MODEL", "cl100k_base"))
+    encoding = tiktoken.get_encoding(get_default_tokenizer_name())
     return encoding.encode
@@ -1,5 +1,11 @@
+import json
+import threading
+from collections import OrderedDict
 from typing import Any, Dict
 
+# Number of connectors kept by get_connector_adaptor, one per vector collection
+CONNECTOR_POOL_SIZE = 256
+
 
 class VectorStoreConnectorAdaptor:
     def __init__(self, vector_store_type, ctx: Dict[str, Any], **kwargs: Any) -> None:
@@ -14,3 +20,26 @@ class VectorStoreConnectorAdaptor:
                 self.connector = QdrantVectorStoreConnector(ctx, **kwargs)
             case _:
                 raise ValueError("unsupported vector store type:", vector_store_type)
+
+
+_connector_pool: "OrderedDict[tuple, VectorStoreConnectorAdaptor]" = OrderedDict()
+_connector_pool_lock = threading.Lock()
+
+
+def get_connector_adaptor(vector_store_type, ctx: Dict[str, Any]) -> VectorStoreConnectorAdaptor:
+    """Return a pooled adaptor for the vector collection described by ctx"""
+    key = (vector_store_type, json.dumps(ctx, sort_keys=True))
+    with _connector_pool_lock:
+        adaptor = _connector_pool.get(key)
+        if adaptor is not None:
+            _connector_pool.move_to_end(key)
+            return adaptor
+
+    # Creating a connector may talk to the server, keep it outside the lock
+    adaptor = VectorStoreConnectorAdaptor(vector_store_type, ctx)
+    with _connector_pool_lock:
+        adaptor = _connector_pool.setdefault(key, adaptor)
+        _connector_pool.move_to_end(key)
+        while len(_connector_pool) > CONNECTOR_POOL_SIZE:
+            _connector_pool.popitem(last=False)
+        return adaptor
@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import threading
 from typing import Any, Dict
 
 import qdrant_client
@@ -13,6 +14,27 @@ from aperag.vectorstore.base import VectorStoreConnector
 
 logger = logging.getLogger(__name__)
 
+# Clients are thread safe and not bound to a collection, so connectors to the same server share one
+_shared_clients: Dict[tuple, qdrant_client.QdrantClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def _get_shared_client(url, port, grpc_port, prefer_grpc, https, timeout) -> qdrant_client.QdrantClient:
+    key = (url, port, grpc_port, prefer_grpc, https, timeout)
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = qdrant_client.QdrantClient(
+                url=url,
+                port=port,
+                grpc_port=grpc_port,
+                prefer_grpc=prefer_grpc,
+                https=https,
+                timeout=timeout,
+            )
+            _shared_clients[key] = client
+        return client
+
 
 class QdrantVectorStoreConnector(VectorStoreConnector):
     def __init__(self, ctx: Dict[str, Any], **kwargs: Any) -> None:
@@ -31,7 +53,7 @@ class QdrantVectorStoreConnector(VectorStoreConnector):
 
         if self.url == ":memory:":
             self.client = qdrant_client.QdrantClient(":memory:")
-        else:
+        elif kwargs:
             self.client = qdrant_client.QdrantClient(
                 url=self.url,
                 port=self.port,
@@ -41,6 +63,10 @@ class QdrantVectorStoreConnector(VectorStoreConnector):
                 timeout=self.timeout,
                 **kwargs,
             )
+        else:
+            self.client = _get_shared_client(
+                self.url, self.port, self.grpc_port, self.prefer_grpc, self.https, self.timeout
+            )
 
         self.store = QdrantVectorStore(
             client=self.client,
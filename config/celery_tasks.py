@@ -108,10 +108,10 @@ from aperag.tasks.collection import collection_task
 from aperag.tasks.document import document_index_task
 from aperag.tasks.models import (
     IndexTaskResult,
-    ParsedDocumentData,
     TaskStatus,
     WorkflowResult,
 )
+from aperag.tasks.parsed_data_store import load_parsed_data
 from aperag.tasks.utils import TaskConfig
 from aperag.utils.constant import IndexAction
 from config.celery import app
@@ -212,13 +212,13 @@ def parse_document_task(self, document_id: str, index_types: List[str]) -> dict:
         document_id: Document ID to parse
 
     Returns:
-        Serialized ParsedDocumentData
+        Handle of the ParsedDocumentData stored in the object store
     """
     try:
         logger.info(f"Starting to parse document {document_id}")
-        parsed_data = document_index_task.parse_document(document_id)
-        logger.info(f"Successfully parsed document {document_id}")
-        return parsed_data.to_dict()
+        parsed_data_handle = document_index_task.parse_document_to_store(document_id)
+        logger.info(f"Successfully parsed document {document_id}, stored at {parsed_data_handle['parsed_data_path']}")
+        return parsed_data_handle
     except Exception as e:
         error_msg = f"Failed to parse document {document_id}: {str(e)}"
         logger.error(error_msg, exc_info=True)
@@ -238,7 +238,7 @@ def create_index_task(self, document_id: str, index_type: str, parsed_data_dict:
     Args:
         document_id: Document ID to process
         index_type: Type of index to create ('vector', 'fulltext', 'graph')
-        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
+        parsed_data_dict: Handle of the ParsedDocumentData from parse_document_task
         context: Task context including index version
 
     Returns:
@@ -260,8 +260,8 @@ def create_index_task(self, document_id: str, index_type: str, parsed_data_dict:
         if skip_reason:
             return skip_reason
 
-        # Convert dict back to structured data
-        parsed_data = ParsedDocumentData.from_dict(parsed_data_dict)
+        # Load the parsed data referenced by the handle
+        parsed_data = load_parsed_data(parsed_data_dict)
 
         # Execute index creation
         result = document_index_task.create_index(document_id, index_type, parsed_data)
@@ -364,7 +364,7 @@ def update_index_task(self, document_id: str, index_type: str, parsed_data_dict:
     Args:
         document_id: Document ID to process
         index_type: Type of index to update ('vector', 'fulltext', 'graph')
-        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
+        parsed_data_dict: Handle of the ParsedDocumentData from parse_document_task
         context: Task context including index version
 
     Returns:
@@ -386,8 +386,8 @@ def update_index_task(self, document_id: str, index_type: str, parsed_data_dict:
         if skip_reason:
             return skip_reason
 
-        # Convert dict back to structured data
-        parsed_data = ParsedDocumentData.from_dict(parsed_data_dict)
+        # Load the parsed data referenced by the handle
+        parsed_data = load_parsed_data(parsed_data_dict)
 
         # Execute index update
         result = document_index_task.update_index(document_id, index_type, parsed_data)
@@ -426,7 +426,7 @@ def trigger_create_indexes_workflow(self, parsed_data_dict: dict, document_id: s
     creating parallel index creation tasks based on the actual parsed content.
 
     Args:
-        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
+        parsed_data_dict: Handle of the ParsedDocumentData from parse_document_task
         document_id: Document ID to process
         index_types: List of index types to create
 
@@ -503,7 +503,7 @@ def trigger_update_indexes_workflow(self, parsed_data_dict: dict, document_id: s
     Dynamic orchestration task for index update workflow.
 
     Args:
-        parsed_data_dict: Serialized ParsedDocumentData from parse_document_task
+        parsed_data_dict: Handle of the ParsedDocumentData from parse_document_task
         document_id: Document ID to process
         index_types: List of index types to update
 
@@ -0,0 +1,75 @@
+"""
+Unit tests for AsyncioLock implementation.
+
+This module tests acquire/release operations, timeouts and FIFO serialization
+of the asyncio-native lock.
+"""
+
+import asyncio
+
+import pytest
+
+from aperag.concurrent_control import AsyncioLock, create_lock, get_default_lock_manager
+
+
+class TestAsyncioLock:
+    """Test suite for AsyncioLock implementation."""
+
+    def test_asyncio_lock_creation(self):
+        """Test basic AsyncioLock creation."""
+        lock = AsyncioLock(name="test_lock")
+        assert lock.get_name() == "test_lock"
+        assert not lock.is_locked()
+
+        assert AsyncioLock().get_name().startswith("asyncio_lock_")
+
+    @pytest.mark.asyncio
+    async def test_context_manager(self):
+        """Test AsyncioLock as async context manager."""
+        lock = AsyncioLock(name="context_test")
+
+        async with lock:
+            assert lock.is_locked()
+
+        assert not lock.is_locked()
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self):
+        """Test that acquire returns False when the timeout expires."""
+        lock = AsyncioLock(name="timeout_test")
+        await lock.acquire()
+
+        assert await lock.acquire(timeout=0.01) is False
+        assert lock.is_locked()
+
+        await lock.release()
+        assert await lock.acquire(timeout=0.01) is True
+        await lock.release()
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_in_order(self):
+        """Test that waiting coroutines get the lock in arrival order."""
+        lock = AsyncioLock(name="fifo_test")
+        order = []
+
+        async def worker(i):
+            async with lock:
+                order.append(i)
+                await asyncio.sleep(0)
+
+        await lock.acquire()
+        tasks = [asyncio.create_task(worker(i)) for i in range(5)]
+        await asyncio.sleep(0)
+        await lock.release()
+        await asyncio.gather(*tasks)
+
+        assert order == [0, 1, 2, 3, 4]
+
+    def test_factory_functions(self):
+        """Test creating asyncio locks through the factory functions."""
+        lock = create_lock("asyncio")
+        assert isinstance(lock, AsyncioLock)
+
+        managed = get_default_lock_manager().get_or_create_lock("asyncio_factory_test", "asyncio")
+        assert isinstance(managed, AsyncioLock)
+        assert get_default_lock_manager().remove_lock("asyncio_factory_test")
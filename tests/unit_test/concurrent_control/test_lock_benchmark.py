@@ -0,0 +1,69 @@
+"""
+Microbenchmark of lock acquire/release throughput and lock table size.
+
+Run with: pytest -m slow tests/unit_test/concurrent_control/test_lock_benchmark.py
+"""
+
+import asyncio
+
+import pytest
+
+from aperag.concurrent_control import LockManager
+
+ROUNDS = 20000
+KEYS = 100000
+
+
+async def _uncontended(lock, rounds):
+    for _ in range(rounds):
+        async with lock:
+            pass
+    return lock
+
+
+async def _contended(lock, workers, rounds):
+    async def worker():
+        for _ in range(rounds // workers):
+            async with lock:
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*[worker() for _ in range(workers)])
+    return lock
+
+
+def _run_with_new_lock(lock_type, bench, *args):
+    # An asyncio lock that was contended is bound to its event loop, so every round gets its own
+    return asyncio.run(bench(LockManager().get_or_create_lock("bench", lock_type), *args))
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("lock_type", ["threading", "asyncio"])
+def test_uncontended_acquire_release(benchmark, lock_type):
+    lock = benchmark.pedantic(_run_with_new_lock, args=(lock_type, _uncontended, ROUNDS), rounds=3, iterations=1)
+    assert not lock.is_locked()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("lock_type", ["threading", "asyncio"])
+def test_acquire_release_with_8_coroutines(benchmark, lock_type):
+    lock = benchmark.pedantic(_run_with_new_lock, args=(lock_type, _contended, 8, ROUNDS // 10), rounds=3, iterations=1)
+    assert not lock.is_locked()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "options, max_table_size",
+    [({}, KEYS), ({"evict_idle_locks": True}, 0), ({"stripes": 1024}, 1024)],
+    ids=["default", "evict_idle_locks", "stripes"],
+)
+def test_lock_table_size_with_per_key_locks(options, max_table_size):
+    manager = LockManager(**options)
+
+    async def run():
+        for i in range(KEYS):
+            async with manager.get_or_create_lock(f"entity:{i}:workspace"):
+                pass
+
+    asyncio.run(run())
+    table_size = len(manager._locks) + sum(len(s) for s in manager._stripes.values())
+    assert table_size <= max_table_size
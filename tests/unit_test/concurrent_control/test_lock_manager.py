@@ -5,6 +5,9 @@ This module tests the LockManager functionality including lock creation,
 management, and lifecycle operations.
 """
 
+import asyncio
+import gc
+
 import pytest
 
 from aperag.concurrent_control import LockManager, RedisLock, ThreadingLock, get_default_lock_manager
@@ -316,3 +319,57 @@ class TestLockManagerEdgeCases:
         assert lock2._key == "custom_redis_key"
         assert lock2._expire_time == 300
         assert lock2._retry_times == 10
+
+    def test_evict_idle_locks_drops_unreferenced_locks(self):
+        """Test that an evicting manager keeps locks only while they are referenced."""
+        manager = LockManager(evict_idle_locks=True)
+
+        lock = manager.get_or_create_lock("entity:a", "threading")
+        assert manager.get_or_create_lock("entity:a", "threading") is lock
+        assert manager.list_locks() == {"entity:a": "ThreadingLock"}
+
+        del lock
+        gc.collect()
+        assert manager.list_locks() == {}
+
+    @pytest.mark.asyncio
+    async def test_evict_idle_locks_keeps_held_locks(self):
+        """Test that a held lock is not evicted and still excludes other callers."""
+        manager = LockManager(evict_idle_locks=True)
+        order = []
+
+        async def worker(i):
+            async with manager.get_or_create_lock("entity:shared", "threading"):
+                order.append(("enter", i))
+                await asyncio.sleep(0.01)
+                gc.collect()
+                order.append(("exit", i))
+
+        await asyncio.gather(worker(1), worker(2))
+
+        assert order in (
+            [("enter", 1), ("exit", 1), ("enter", 2), ("exit", 2)],
+            [("enter", 2), ("exit", 2), ("enter", 1), ("exit", 1)],
+        )
+        gc.collect()
+        assert len(manager._locks) == 0
+
+    def test_striped_locks_have_fixed_size(self):
+        """Test that a striped manager maps any number of ids onto a fixed set of locks."""
+        manager = LockManager(stripes=8)
+
+        locks = {id(manager.get_or_create_lock(f"entity:{i}", "threading")) for i in range(1000)}
+        assert len(locks) == 8
+        assert manager.get_or_create_lock("entity:1", "threading") is manager.get_or_create_lock(
+            "entity:1", "threading"
+        )
+        assert manager._locks == {}
+
+        # Redis locks are not striped
+        redis_lock = manager.get_or_create_lock("redis_lock", "redis", key="redis_key")
+        assert isinstance(redis_lock, RedisLock)
+
+    def test_striped_locks_reject_negative_size(self):
+        """Test stripe count validation."""
+        with pytest.raises(ValueError, match="stripes"):
+            LockManager(stripes=-1)
@@ -0,0 +1,231 @@
+"""
+Unit tests for RedisLockGroup.
+
+The Lua scripts run server side, so these tests use an in-memory fake client
+that implements the same semantics for the group and RedisLock scripts.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from aperag.concurrent_control.redis_lock import (
+    LOCK_RELEASE_CHANNEL_PREFIX,
+    RedisLock,
+    RedisLockGroup,
+    redis_lock_with_renewal,
+)
+from aperag.concurrent_control.utils import LockAcquisitionError
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self._redis = redis
+        self.channels = set()
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+        self._redis.subscribers.append(self)
+
+    async def unsubscribe(self, *channels):
+        self.channels.difference_update(channels or set(self.channels))
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self._redis.subscribers.remove(self)
+
+
+class FakeRedis:
+    """Evaluates the lock scripts of RedisLock and RedisLockGroup against a dict"""
+
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+        self.subscribers = []
+        self.calls = []
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def _publish(self, channel):
+        for pubsub in self.subscribers:
+            if channel in pubsub.channels:
+                pubsub.messages.put_nowait({"type": "message", "channel": channel, "data": 1})
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = list(args[:numkeys]), list(args[numkeys:])
+        self.calls.append((script, keys))
+        if script == RedisLockGroup.ACQUIRE_SCRIPT:
+            for i, key in enumerate(keys, start=1):
+                if key in self.data:
+                    return [i, self.expires[key] * 1000]
+            for key in keys:
+                self.data[key] = argv[0]
+                self.expires[key] = argv[1]
+            return [0, 0]
+        if script == RedisLockGroup.RELEASE_SCRIPT:
+            released = 0
+            for key in keys:
+                if self.data.get(key) == argv[0]:
+                    del self.data[key]
+                    released += 1
+                    self._publish(argv[1] + key)
+            return released
+        if script == RedisLockGroup.RENEW_SCRIPT:
+            if any(self.data.get(key) != argv[0] for key in keys):
+                return 0
+            for key in keys:
+                self.expires[key] = argv[1]
+            return 1
+        if script == RedisLock.RELEASE_SCRIPT:
+            if self.data.get(keys[0]) == argv[0]:
+                del self.data[keys[0]]
+                self._publish(LOCK_RELEASE_CHANNEL_PREFIX + keys[0])
+                return 1
+            return 0
+        raise AssertionError("unexpected script")
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        self.expires[key] = ex
+        return True
+
+
+class TestRedisLockGroup:
+    """Test atomic acquisition and release of multiple keys."""
+
+    @pytest.fixture
+    def redis_client(self):
+        return FakeRedis()
+
+    def test_keys_are_sorted_and_deduplicated(self):
+        group = RedisLockGroup(["entity:b", "entity:a", "entity:b"])
+        assert group.get_keys() == ["entity:a", "entity:b"]
+        assert group.get_name() == "redis_lock_group_entity:a_2"
+
+    def test_empty_keys(self):
+        with pytest.raises(ValueError):
+            RedisLockGroup([])
+        with pytest.raises(ValueError):
+            RedisLockGroup(["entity:a", ""])
+
+    @pytest.mark.asyncio
+    async def test_acquire_is_one_round_trip(self, redis_client):
+        keys = [f"entity:{i}" for i in range(300)]
+        group = RedisLockGroup(keys, redis_client=redis_client)
+
+        assert await group.acquire() is True
+        assert group.is_locked()
+        assert len(redis_client.calls) == 1
+        assert set(redis_client.data) == set(keys)
+
+        await group.release()
+        assert not group.is_locked()
+        assert redis_client.data == {}
+
+    @pytest.mark.asyncio
+    async def test_all_or_nothing(self, redis_client):
+        holder = RedisLockGroup(["entity:c"], redis_client=redis_client)
+        await holder.acquire()
+
+        group = RedisLockGroup(["entity:a", "entity:b", "entity:c"], redis_client=redis_client)
+        assert await group.acquire(timeout=0.05) is False
+        assert not group.is_locked()
+        # None of the free keys were taken
+        assert set(redis_client.data) == {"entity:c"}
+        assert redis_client.subscribers == []
+
+    @pytest.mark.asyncio
+    async def test_waiter_wakes_on_release(self, redis_client):
+        holder = RedisLockGroup(["entity:a", "entity:b"], redis_client=redis_client)
+        await holder.acquire()
+        # Without a release notification the waiter would sleep for max_wait
+        waiter = RedisLockGroup(["entity:b", "entity:c"], max_wait=5.0, redis_client=redis_client)
+
+        async def release_later():
+            await asyncio.sleep(0.05)
+            await holder.release()
+
+        start = time.time()
+        acquired, _ = await asyncio.gather(waiter.acquire(timeout=2.0), release_later())
+        assert acquired is True
+        assert time.time() - start < 1.0
+        assert set(redis_client.data) == {"entity:b", "entity:c"}
+
+    @pytest.mark.asyncio
+    async def test_waiter_wakes_on_single_lock_release(self, redis_client):
+        single = RedisLock(key="entity:a", redis_client=redis_client)
+        await single.acquire()
+        waiter = RedisLockGroup(["entity:a", "entity:b"], max_wait=5.0, redis_client=redis_client)
+
+        async def release_later():
+            await asyncio.sleep(0.05)
+            await single.release()
+
+        start = time.time()
+        acquired, _ = await asyncio.gather(waiter.acquire(timeout=2.0), release_later())
+        assert acquired is True
+        assert time.time() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_context_manager_acquire_failure(self, redis_client):
+        group = RedisLockGroup(["entity:a"], redis_client=redis_client)
+        group.acquire = lambda timeout=None: asyncio.sleep(0, result=False)
+
+        with pytest.raises(LockAcquisitionError):
+            async with group:
+                pass
+
+    @pytest.mark.asyncio
+    async def test_redis_error_during_acquire(self, redis_client):
+        async def failing_eval(*args):
+            raise Exception("Redis error")
+
+        redis_client.eval = failing_eval
+        group = RedisLockGroup(["entity:a"], redis_client=redis_client)
+        assert await group.acquire() is False
+        assert not group.is_locked()
+
+
+class TestRedisLockGroupRenewal:
+    """Test watchdog renewal of a whole group."""
+
+    @pytest.mark.asyncio
+    async def test_group_is_renewed(self):
+        redis_client = FakeRedis()
+        group = RedisLockGroup(["entity:a", "entity:b"], expire_time=5, redis_client=redis_client)
+
+        async with redis_lock_with_renewal(group, renewal_interval=0.01):
+            redis_client.expires = {key: 1 for key in redis_client.expires}
+            await asyncio.sleep(0.05)
+            assert redis_client.expires == {"entity:a": 5, "entity:b": 5}
+
+        assert redis_client.data == {}
+
+    @pytest.mark.asyncio
+    async def test_partially_lost_group_is_marked_lost(self):
+        redis_client = FakeRedis()
+        group = RedisLockGroup(["entity:a", "entity:b"], redis_client=redis_client)
+
+        async with redis_lock_with_renewal(group, renewal_interval=0.01):
+            redis_client.data["entity:b"] = "stolen"
+            await asyncio.sleep(0.05)
+            assert not group.is_locked()
+
+        # The key now held by someone else is left alone
+        assert redis_client.data["entity:b"] == "stolen"
+
+    @pytest.mark.asyncio
+    async def test_rejects_other_locks(self):
+        with pytest.raises(TypeError):
+            async with redis_lock_with_renewal(object()):
+                pass
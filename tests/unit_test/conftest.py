@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from dotenv import load_dotenv
 
 # Configure pytest-asyncio
@@ -37,3 +38,20 @@ def pytest_configure(config):
     config.option.log_cli_level = "INFO"
     print("\npytest_configure: Loading test environment...")
     load_test_environment()
+
+
+@pytest.fixture
+def object_store_targets():
+    """Where get_object_store is patched, override it in modules whose code imports the function directly"""
+    return ["aperag.objectstore.base.get_object_store"]
+
+
+@pytest.fixture
+def object_store(monkeypatch, tmp_path, object_store_targets):
+    """A local object store in a temporary directory, returned by get_object_store"""
+    from aperag.objectstore.local import Local, LocalConfig
+
+    store = Local(LocalConfig(root_dir=str(tmp_path / "object_store")))
+    for target in object_store_targets:
+        monkeypatch.setattr(target, lambda: store)
+    return store
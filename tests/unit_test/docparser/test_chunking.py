@@ -1,5 +1,9 @@
+import random
+import re
 from typing import List
 
+import pytest
+
 from aperag.docparser.base import Part, TitlePart
 from aperag.docparser.chunking import Group, Rechunker, SimpleSemanticSplitter
 
@@ -396,3 +400,57 @@ def test_merge_consecutive_title_groups():
     assert len(merged7) == 2
     assert len(merged7[0].items) == 1
     assert len(merged7[1].items) == 2
+
+
+def regex_tokenizer(text: str) -> List[str]:
+    # Mimics BPE pre-tokenization: counts are not additive across the split points
+    return re.findall(r"'s|'t|'re|'ve|'m|'ll|'d| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+", text)
+
+
+def make_random_text(seed: int, size: int, punctuation: bool = True) -> str:
+    rnd = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "index", "vector", "graph", "chunk", "数据", "检索", "x" * 30]
+    out = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rnd.choice(words) for _ in range(rnd.randint(1, 30)))
+        sentence += rnd.choice([". ", "! ", "。", "，", "; ", "\n", "\n\n", " "]) if punctuation else " "
+        out.append(sentence)
+        length += len(sentence)
+    return "".join(out)
+
+
+@pytest.mark.parametrize("tokenizer", [mock_tokenizer, mock_char_tokenizer, regex_tokenizer])
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(8, 0), (20, 5), (64, 8), (400, 20)])
+@pytest.mark.parametrize("punctuation", [True, False])
+def test_incremental_splitter_output_identical(tokenizer, chunk_size, chunk_overlap, punctuation):
+    for seed in range(3):
+        text = make_random_text(seed, 20000, punctuation)
+        expected = SimpleSemanticSplitter(tokenizer).split(text, chunk_size, chunk_overlap)
+        actual = SimpleSemanticSplitter(tokenizer, incremental=True).split(text, chunk_size, chunk_overlap)
+        assert actual == expected
+
+
+def test_incremental_cut_right_side_identical():
+    text = make_random_text(7, 3000)
+    for size in (1, 3, 10, 50, 200):
+        expected = SimpleSemanticSplitter(regex_tokenizer)._cut_right_side(text, size)
+        actual = SimpleSemanticSplitter(regex_tokenizer, incremental=True)._cut_right_side(text, size)
+        assert actual == expected
+
+
+def test_incremental_rechunker_output_identical():
+    parts = [
+        TitlePart(content="# Title", level=1),
+        Part(content=make_random_text(1, 30000), metadata={}),
+        TitlePart(content="## Sub", level=2),
+        Part(content=make_random_text(2, 5000, punctuation=False), metadata={}),
+    ]
+    expected = Rechunker(chunk_size=100, chunk_overlap=10, tokenizer=regex_tokenizer)(
+        [p.model_copy(deep=True) for p in parts]
+    )
+    actual = Rechunker(chunk_size=100, chunk_overlap=10, tokenizer=regex_tokenizer, incremental=True)(
+        [p.model_copy(deep=True) for p in parts]
+    )
+    assert [p.content for p in actual] == [p.content for p in expected]
+    assert [p.metadata for p in actual] == [p.metadata for p in expected]
@@ -0,0 +1,44 @@
+import random
+import re
+
+import pytest
+
+from aperag.docparser.base import Part
+from aperag.docparser.chunking import rechunk
+
+FIVE_MB = 5 * 1024 * 1024
+
+# Mimics BPE pre-tokenization so token counts are not additive across split points
+TOKEN_PATTERN = re.compile(r"'s|'t|'re|'ve|'m|'ll|'d| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+")
+
+
+def regex_tokenizer(text):
+    return TOKEN_PATTERN.findall(text)
+
+
+def make_unstructured_text(seed: int, size: int) -> str:
+    rnd = random.Random(seed)
+    words = ["alpha", "beta", "gamma", "delta", "index", "vector", "graph", "chunk", "数据", "检索"]
+    out = []
+    length = 0
+    while length < size:
+        word = rnd.choice(words) + " "
+        out.append(word)
+        length += len(word)
+    return "".join(out)
+
+
+@pytest.mark.slow
+def test_incremental_rechunk_5mb_unstructured_text(benchmark):
+    # A single large section without punctuation or newlines is the worst case for the
+    # splitter: every piece is a single word and is merged back one at a time.
+    text = make_unstructured_text(42, FIVE_MB)
+
+    def run(incremental: bool):
+        return rechunk([Part(content=text, metadata={})], 400, 20, regex_tokenizer, incremental=incremental)
+
+    legacy_chunks = run(incremental=False)
+    incremental_chunks = benchmark.pedantic(run, kwargs={"incremental": True}, rounds=1, iterations=1)
+
+    assert [c.content for c in incremental_chunks] == [c.content for c in legacy_chunks]
+    assert [c.metadata for c in incremental_chunks] == [c.metadata for c in legacy_chunks]
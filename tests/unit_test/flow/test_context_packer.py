@@ -0,0 +1,84 @@
+"""
+Unit tests for the token budget packing of the flow LLM runner.
+"""
+
+import pytest
+
+from aperag.flow.runners.llm import ContextPacker
+from aperag.query.query import DocumentWithScore
+
+
+class CountingTokenizer:
+    """One token per whitespace separated word"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return text.split()
+
+
+def doc(words, recall_type="vector_search", score=None):
+    return DocumentWithScore(text=" ".join(words) + " ", score=score, metadata={"recall_type": recall_type})
+
+
+def test_fills_budget_and_skips_documents_that_do_not_fit():
+    packer = ContextPacker(CountingTokenizer())
+    docs = [doc(["a"] * 6), doc(["b"] * 8), doc(["c"] * 3)]
+
+    # The template and query take 2 tokens, leaving 10 for the context
+    prompt, packed = packer.pack("{query} {context}", "question?", docs, max_input_tokens=11)
+
+    assert packed == [docs[0], docs[2]]
+    assert prompt == "question? " + docs[0].text + docs[2].text
+    assert len(prompt.split()) <= 11
+
+
+def test_source_quotas_cap_each_recall_type():
+    packer = ContextPacker(CountingTokenizer())
+    docs = [
+        doc(["g"] * 5, recall_type="graph_search"),
+        doc(["g2"] * 5, recall_type="graph_search"),
+        doc(["v"] * 5),
+        doc(["v2"] * 5),
+    ]
+
+    _, packed = packer.pack("{context}", "q", docs, max_input_tokens=20, source_quotas={"graph_search": 0.5})
+    assert packed == docs
+
+    _, packed = packer.pack("{context}", "q", docs, max_input_tokens=20, source_quotas={"graph_search": 0.25})
+    assert packed == [docs[0], docs[2], docs[3]]
+
+
+def test_document_token_counts_are_cached():
+    tokenizer = CountingTokenizer()
+    packer = ContextPacker(tokenizer)
+    docs = [doc(["x"] * 3), doc(["y"] * 3)]
+
+    packer.pack("{context}", "q", docs, max_input_tokens=100)
+    calls = tokenizer.calls
+    packer.pack("{context}", "q", docs, max_input_tokens=100)
+
+    # Only the template and the final prompt are measured again
+    assert tokenizer.calls - calls == 2
+
+
+def test_final_prompt_is_checked_against_the_limit():
+    # One token per character, plus one where "b" is followed by "a"
+    packer = ContextPacker(lambda text: list(text) + ["ba"] * text.count("ba"))
+    docs = [
+        DocumentWithScore(text="xb", metadata={}),
+        DocumentWithScore(text="ay", metadata={}),
+    ]
+
+    # Separately the documents fit exactly, joined they need one more token
+    prompt, packed = packer.pack("{context}", "", docs, max_input_tokens=4)
+    assert packed == [docs[0]]
+    assert prompt == "xb"
+
+
+def test_prompt_without_context_exceeding_limit_raises():
+    packer = ContextPacker(CountingTokenizer())
+    with pytest.raises(Exception, match="exceeds the calculated input limit"):
+        packer.pack("{query} {context}", "a very long question indeed", [], max_input_tokens=3)
@@ -0,0 +1,133 @@
+"""
+Unit tests for the concurrent and cached image loading of the flow LLM runner.
+"""
+
+import asyncio
+import base64
+import io
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from aperag.flow.runners import llm as llm_module
+from aperag.flow.runners.llm import ImageURICache, downscale_image, load_image_data_uris
+from aperag.query.query import DocumentWithScore
+
+
+def png_bytes(width, height):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(output, format="PNG")
+    return output.getvalue()
+
+
+class FakeObjectStore:
+    def __init__(self, objects):
+        self.objects = objects
+        self.gets = []
+        self.running = 0
+        self.max_running = 0
+
+    async def get(self, path):
+        self.gets.append(path)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if path not in self.objects:
+            return None
+
+        async def stream():
+            yield self.objects[path]
+
+        return stream(), len(self.objects[path])
+
+
+class FakeDbOps:
+    def __init__(self):
+        self.queries = []
+
+    async def query_document(self, user, collection_id, document_id):
+        self.queries.append(document_id)
+        return SimpleNamespace(object_store_base_path=lambda: f"{collection_id}/{document_id}")
+
+
+def image_doc(asset_id, document_id="doc"):
+    return DocumentWithScore(
+        text=f"page {asset_id}",
+        metadata={"asset_id": asset_id, "mimetype": "image/png", "collection_id": "col", "document_id": document_id},
+    )
+
+
+@pytest.fixture
+def stores(monkeypatch):
+    objects = {f"col/doc/assets/a{i}": png_bytes(4, 4) for i in range(10)}
+    object_store = FakeObjectStore(objects)
+    db_ops = FakeDbOps()
+    monkeypatch.setattr(llm_module, "get_async_object_store", lambda: object_store)
+    monkeypatch.setattr(llm_module, "async_db_ops", db_ops)
+    monkeypatch.setattr(llm_module, "image_uri_cache", ImageURICache())
+    return object_store, db_ops
+
+
+def test_images_are_fetched_concurrently_in_order(stores):
+    object_store, db_ops = stores
+    docs = [image_doc("a0"), image_doc("missing"), image_doc("a1"), image_doc("a2")]
+
+    loaded = asyncio.run(load_image_data_uris("user", docs, limit=2))
+
+    assert [doc.metadata["asset_id"] for doc, _ in loaded] == ["a0", "a1"]
+    assert loaded[0][1].startswith("data:image/png;base64,")
+    # The first batch ran together, the missing image was replaced from the rest
+    assert object_store.max_running == 2
+    assert object_store.gets == ["col/doc/assets/a0", "col/doc/assets/missing", "col/doc/assets/a1"]
+    # One document lookup shared by all of its images
+    assert db_ops.queries == ["doc"]
+
+
+def test_encoded_images_are_cached(stores):
+    object_store, db_ops = stores
+    docs = [image_doc("a0"), image_doc("a1")]
+
+    first = asyncio.run(load_image_data_uris("user", docs))
+    second = asyncio.run(load_image_data_uris("user", docs))
+
+    assert first == second
+    assert len(object_store.gets) == 2
+    # The document is still checked for every request
+    assert db_ops.queries == ["doc", "doc"]
+
+
+def test_cache_is_bounded_by_size():
+    cache = ImageURICache(max_bytes=10)
+    cache.put("a", "12345")
+    cache.put("b", "12345")
+    cache.get("a")
+    cache.put("c", "12345")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "12345"
+    assert cache.get("c") == "12345"
+    cache.put("too-big", "x" * 11)
+    assert cache.get("too-big") is None
+
+
+def test_downscale_keeps_format_and_small_images():
+    small = png_bytes(100, 50)
+    assert downscale_image(small, max_side=200) is small
+
+    resized = Image.open(io.BytesIO(downscale_image(png_bytes(400, 200), max_side=200)))
+    assert resized.size == (200, 100)
+    assert resized.format == "PNG"
+
+    assert downscale_image(b"not an image", max_side=200) == b"not an image"
+
+
+def test_images_are_downscaled_before_encoding(stores):
+    object_store, _ = stores
+    object_store.objects["col/doc/assets/big"] = png_bytes(3000, 1500)
+
+    [(_, image_uri)] = asyncio.run(load_image_data_uris("user", [image_doc("big")]))
+
+    image = Image.open(io.BytesIO(base64.b64decode(image_uri.split(",", 1)[1])))
+    assert image.size == (llm_module.MAX_IMAGE_SIDE, llm_module.MAX_IMAGE_SIDE // 2)
@@ -0,0 +1,119 @@
+"""
+Unit tests for the scatter-gather search of the flow vector search runner.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.flow.runners import vector_search as vector_search_module
+from aperag.flow.runners.vector_search import VectorSearchService
+from aperag.llm.llm_error_types import EmbeddingError
+from aperag.query.query import DocumentWithScore
+
+
+class FakeEmbeddingModel:
+    def __init__(self, model):
+        self.embedding_provider = "openai"
+        self.model = model
+        self.api_base = "http://embed"
+        self.api_key = "key"
+        self.calls = 0
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [[float(len(self.model))] for _ in texts]
+
+
+class FakeContextManager:
+    def __init__(self, collection_id, scores, delay=0.0, error=None):
+        self.collection_id = collection_id
+        self.scores = scores
+        self.delay = delay
+        self.error = error
+        self.vectors = []
+
+    def query(self, query, score_threshold, topk, vector, index_types, chat_id):
+        self.vectors.append(vector)
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return [
+            DocumentWithScore(text=f"{self.collection_id}-{i}", score=score, metadata={})
+            for i, score in enumerate(self.scores[:topk])
+        ]
+
+
+class FakeRepository:
+    async def get_collection(self, user, collection_id):
+        if collection_id == "missing":
+            return None
+        return SimpleNamespace(id=collection_id, model=MODELS[collection_id])
+
+
+MODELS = {}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    small, large = FakeEmbeddingModel("small"), FakeEmbeddingModel("large-model")
+    MODELS.clear()
+    MODELS.update({"a": small, "b": small, "c": large, "slow": small, "broken": large})
+    managers = {
+        "a": FakeContextManager("a", [0.9, 0.5]),
+        "b": FakeContextManager("b", [0.8, 0.7]),
+        "c": FakeContextManager("c", [0.6]),
+        "slow": FakeContextManager("slow", [1.0], delay=0.3),
+        "broken": FakeContextManager("broken", [1.0], error=EmbeddingError("boom")),
+    }
+
+    async def get_embedding_service(collection):
+        return collection.model, 3
+
+    monkeypatch.setattr(vector_search_module, "get_collection_embedding_service", get_embedding_service)
+    monkeypatch.setattr(vector_search_module, "VECTOR_SEARCH_COLLECTION_TIMEOUT", 0.2)
+    service = VectorSearchService(FakeRepository())
+    monkeypatch.setattr(service, "_get_context_manager", lambda collection, model: managers[collection.id])
+    return service, managers, small, large
+
+
+def search(service, collection_ids, top_k=3):
+    return asyncio.run(service.execute_vector_search("user", "question", top_k, 0.2, collection_ids=collection_ids))
+
+
+def test_results_from_all_collections_are_merged_by_score(service):
+    service, managers, small, large = service
+
+    docs = search(service, ["a", "b", "c", "missing"])
+
+    assert [doc.text for doc in docs] == ["a-0", "b-0", "b-1"]
+    assert all(doc.metadata["recall_type"] == "vector_search" for doc in docs)
+    # One query embedding per distinct model
+    assert small.calls == 1 and large.calls == 1
+    assert managers["a"].vectors == managers["b"].vectors == [[5.0]]
+    assert managers["c"].vectors == [[11.0]]
+
+
+def test_slow_and_failing_collections_do_not_block_the_answer(service):
+    service, _, _, _ = service
+
+    async def run():
+        started = time.monotonic()
+        docs = await service.execute_vector_search(
+            "user", "question", 3, 0.2, collection_ids=["slow", "broken", "c", "a"]
+        )
+        return docs, time.monotonic() - started
+
+    docs, elapsed = asyncio.run(run())
+
+    assert elapsed < 0.3
+    assert [doc.text for doc in docs] == ["a-0", "c-0", "a-1"]
+
+
+def test_no_collections(service):
+    service, _, _, _ = service
+    assert search(service, []) == []
+    assert search(service, ["missing"]) == []
@@ -0,0 +1,160 @@
+"""
+Unit tests for the concurrent, largest-first and streamed merging of connected components in LightRAG.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.graph.lightrag import lightrag as lightrag_module
+from aperag.graph.lightrag.lightrag import LightRAG
+from aperag.graph.lightrag.utils import LightRAGLogger
+
+
+def make_rag(max_parallel_merge=4, merge_stream_chunks=0):
+    rag = SimpleNamespace(
+        max_parallel_merge=max_parallel_merge,
+        merge_stream_chunks=merge_stream_chunks,
+        workspace="ws",
+        chunk_entity_relation_graph=None,
+        entities_vdb=None,
+        relationships_vdb=None,
+        llm_model_func=None,
+        tokenizer=None,
+        llm_model_max_token_size=0,
+        summary_to_max_tokens=0,
+        language="English",
+        force_llm_summary_on_merge=10,
+        entity_extract_max_gleaning=0,
+        entity_types=[],
+        example_number=None,
+        llm_model_max_async=4,
+        lightrag_logger=LightRAGLogger(workspace="ws"),
+    )
+    for name in ("_find_connected_components", "_grouping_process_chunk_results"):
+        setattr(rag, name, getattr(LightRAG, name).__get__(rag))
+    return rag
+
+
+def chain(*names):
+    """Chunk result whose entities form one connected component"""
+    nodes = {name: [{"entity_name": name}] for name in names}
+    edges = {(a, b): [{"src_id": a, "tgt_id": b}] for a, b in zip(names, names[1:])}
+    return nodes, edges
+
+
+class RecordingMerge:
+    def __init__(self):
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, chunk_results, component, **kwargs):
+        self.started.append(sorted(component))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return {"entity_count": len(component), "relation_count": len(component) - 1}
+
+
+@pytest.fixture
+def recording_merge(monkeypatch):
+    merge = RecordingMerge()
+    monkeypatch.setattr(lightrag_module, "merge_nodes_and_edges", merge)
+    return merge
+
+
+def test_components_are_merged_concurrently_largest_first(recording_merge):
+    rag = make_rag(max_parallel_merge=2)
+    chunk_results = [chain("A"), chain("B", "C", "D"), chain("E", "F"), chain("G", "H", "I", "J")]
+
+    result = asyncio.run(rag._grouping_process_chunk_results(chunk_results, "col"))
+
+    assert result["groups_processed"] == 4
+    assert result["total_entities"] == 10
+    assert recording_merge.started == [["G", "H", "I", "J"], ["B", "C", "D"], ["E", "F"], ["A"]]
+    assert recording_merge.max_running == 2
+
+
+def test_merge_starts_before_extraction_finishes(monkeypatch, recording_merge):
+    rag = make_rag(max_parallel_merge=4, merge_stream_chunks=2)
+    rag.aprocess_graph_indexing = LightRAG.aprocess_graph_indexing.__get__(rag)
+    events = []
+
+    async def fake_extract_entities(chunks, on_chunk_extracted=None, **kwargs):
+        results = []
+        for chunk_id in chunks:
+            result = chain(f"{chunk_id}-x", f"{chunk_id}-y")
+            results.append(result)
+            await on_chunk_extracted(result)
+            await asyncio.sleep(0.02)
+            events.append(("extracted", chunk_id, len(recording_merge.started)))
+        return results
+
+    monkeypatch.setattr(lightrag_module, "extract_entities", fake_extract_entities)
+    chunks = {f"c{i}": {"content": f"text {i}"} for i in range(5)}
+
+    result = asyncio.run(rag.aprocess_graph_indexing(chunks, "col"))
+
+    assert result["groups_processed"] == 5
+    assert result["entities_extracted"] == 10
+    assert len(recording_merge.started) == 5
+    # The first two chunks were merged while the last chunk was still being extracted
+    assert events[-1][2] >= 2
+
+
+def test_failed_merge_stops_extraction(monkeypatch):
+    rag = make_rag(merge_stream_chunks=1)
+    rag.aprocess_graph_indexing = LightRAG.aprocess_graph_indexing.__get__(rag)
+    extracted = []
+
+    async def failing_merge(chunk_results, component, **kwargs):
+        raise RuntimeError("storage down")
+
+    async def fake_extract_entities(chunks, on_chunk_extracted=None, **kwargs):
+        for chunk_id in chunks:
+            await on_chunk_extracted(chain(chunk_id))
+            extracted.append(chunk_id)
+            await asyncio.sleep(0.01)
+        return []
+
+    monkeypatch.setattr(lightrag_module, "merge_nodes_and_edges", failing_merge)
+    monkeypatch.setattr(lightrag_module, "extract_entities", fake_extract_entities)
+    with pytest.raises(RuntimeError, match="storage down"):
+        asyncio.run(rag.aprocess_graph_indexing({f"c{i}": {"content": "x"} for i in range(10)}, "col"))
+    assert len(extracted) < 10
+
+
+def test_failed_merge_cancels_the_other_batches(monkeypatch):
+    rag = make_rag(merge_stream_chunks=1)
+    rag.aprocess_graph_indexing = LightRAG.aprocess_graph_indexing.__get__(rag)
+    events = []
+
+    async def merge(chunk_results, component, **kwargs):
+        if component == ["bad"]:
+            raise RuntimeError("storage down")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        events.append("written")
+
+    async def fake_extract_entities(chunks, on_chunk_extracted=None, **kwargs):
+        results = [chain(chunk_id) for chunk_id in chunks]
+        for result in results:
+            await on_chunk_extracted(result)
+        return results
+
+    monkeypatch.setattr(lightrag_module, "merge_nodes_and_edges", merge)
+    monkeypatch.setattr(lightrag_module, "extract_entities", fake_extract_entities)
+
+    async def run():
+        with pytest.raises(RuntimeError, match="storage down"):
+            await rag.aprocess_graph_indexing({"slow": {"content": "x"}, "bad": {"content": "y"}}, "col")
+        # The slow batch was stopped before the failure was reported, not when the loop closed
+        return list(events)
+
+    assert asyncio.run(run()) == ["cancelled"]
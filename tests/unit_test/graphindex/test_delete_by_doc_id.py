@@ -0,0 +1,160 @@
+"""
+Unit tests for LightRAG.adelete_by_doc_id with in-memory storages.
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+from aperag.graph.lightrag.lightrag import LightRAG
+from aperag.graph.lightrag.prompt import GRAPH_FIELD_SEP
+
+
+class FakeTextChunks:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.scanned = False
+
+    async def get_all(self):
+        self.scanned = True
+        return dict(self.chunks)
+
+    async def get_chunk_ids_by_doc_id(self, doc_id):
+        return [chunk_id for chunk_id, chunk in self.chunks.items() if chunk["full_doc_id"] == doc_id]
+
+    async def delete(self, ids):
+        for chunk_id in ids:
+            self.chunks.pop(chunk_id, None)
+
+
+class FakeVectorStorage:
+    def __init__(self, records):
+        self.records = records
+        self.scanned = False
+
+    async def get_all(self):
+        self.scanned = True
+        return dict(self.records)
+
+    async def get_by_chunk_ids(self, chunk_ids):
+        return [dict(r) for r in self.records.values() if set(r.get("chunk_ids", [])) & set(chunk_ids)]
+
+    async def delete_entity(self, entity_name):
+        self.records = {k: v for k, v in self.records.items() if v.get("entity_name") != entity_name}
+
+    async def delete(self, ids):
+        for record_id in ids:
+            self.records.pop(record_id, None)
+
+    async def upsert(self, data):
+        self.records.update(data)
+
+
+class FakeGraph:
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+
+    async def get_all_labels(self):
+        raise AssertionError("deletion must not scan the whole graph")
+
+    async def get_nodes_batch(self, node_ids):
+        return {n: dict(self.nodes[n]) for n in node_ids if n in self.nodes}
+
+    async def get_edges_batch(self, pairs):
+        return {
+            (p["src"], p["tgt"]): dict(self.edges[(p["src"], p["tgt"])])
+            for p in pairs
+            if (p["src"], p["tgt"]) in self.edges
+        }
+
+    async def remove_nodes(self, nodes):
+        for node in nodes:
+            self.nodes.pop(node, None)
+            self.edges = {k: v for k, v in self.edges.items() if node not in k}
+
+    async def remove_edges(self, edges):
+        for edge in edges:
+            self.edges.pop(edge, None)
+
+    async def upsert_node(self, node_id, node_data):
+        self.nodes[node_id] = node_data
+
+    async def upsert_edge(self, src, tgt, edge_data):
+        self.edges[(src, tgt)] = edge_data
+
+
+def make_rag():
+    chunks = {
+        "c1": {"full_doc_id": "doc-a"},
+        "c2": {"full_doc_id": "doc-a"},
+        "c3": {"full_doc_id": "doc-b"},
+    }
+    entities = {
+        "ent-alice": {"id": "ent-alice", "entity_name": "Alice", "content": "Alice", "chunk_ids": ["c1"]},
+        "ent-bob": {"id": "ent-bob", "entity_name": "Bob", "content": "Bob", "chunk_ids": ["c2", "c3"]},
+        "ent-carol": {"id": "ent-carol", "entity_name": "Carol", "content": "Carol", "chunk_ids": ["c3"]},
+    }
+    relations = {
+        "rel-ab": {"id": "rel-ab", "source_id": "Alice", "target_id": "Bob", "content": "ab", "chunk_ids": ["c1"]},
+        "rel-bc": {
+            "id": "rel-bc",
+            "source_id": "Bob",
+            "target_id": "Carol",
+            "content": "bc",
+            "chunk_ids": ["c2", "c3"],
+        },
+    }
+    graph = FakeGraph(
+        nodes={
+            "Alice": {"source_id": "c1"},
+            "Bob": {"source_id": GRAPH_FIELD_SEP.join(["c2", "c3"])},
+            "Carol": {"source_id": "c3"},
+        },
+        # Stored the other way round than the vector record
+        edges={
+            ("Bob", "Alice"): {"source_id": "c1"},
+            ("Bob", "Carol"): {"source_id": GRAPH_FIELD_SEP.join(["c2", "c3"])},
+        },
+    )
+    return SimpleNamespace(
+        text_chunks=FakeTextChunks(chunks),
+        chunks_vdb=FakeVectorStorage({k: {"id": k} for k in chunks}),
+        entities_vdb=FakeVectorStorage(entities),
+        relationships_vdb=FakeVectorStorage(relations),
+        chunk_entity_relation_graph=graph,
+        lightrag_logger=logging.getLogger("test"),
+    )
+
+
+def test_delete_only_touches_document_references():
+    rag = make_rag()
+    asyncio.run(LightRAG.adelete_by_doc_id(rag, "doc-a"))
+
+    assert set(rag.text_chunks.chunks) == {"c3"}
+    assert set(rag.chunks_vdb.records) == {"c3"}
+    assert not rag.text_chunks.scanned
+    assert not rag.entities_vdb.scanned
+    assert not rag.relationships_vdb.scanned
+
+    # Alice only came from doc-a, Bob keeps the doc-b chunk, Carol is untouched
+    assert set(rag.entities_vdb.records) == {"ent-bob", "ent-carol"}
+    assert rag.entities_vdb.records["ent-bob"]["chunk_ids"] == ["c3"]
+    assert rag.entities_vdb.records["ent-bob"]["source_id"] == "c3"
+
+    assert set(rag.relationships_vdb.records) == {"rel-bc"}
+    rel = rag.relationships_vdb.records["rel-bc"]
+    assert (rel["src_id"], rel["tgt_id"], rel["source_id"]) == ("Bob", "Carol", "c3")
+
+    graph = rag.chunk_entity_relation_graph
+    assert graph.nodes == {"Bob": {"source_id": "c3"}, "Carol": {"source_id": "c3"}}
+    assert graph.edges == {("Bob", "Carol"): {"source_id": "c3"}}
+
+
+def test_delete_unknown_document_is_noop():
+    rag = make_rag()
+    asyncio.run(LightRAG.adelete_by_doc_id(rag, "doc-missing"))
+
+    assert len(rag.text_chunks.chunks) == 3
+    assert len(rag.entities_vdb.records) == 3
+    assert len(rag.chunk_entity_relation_graph.edges) == 2
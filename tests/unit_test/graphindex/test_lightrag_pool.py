@@ -0,0 +1,131 @@
+"""
+Unit tests for the pool of LightRAG instances used by graph search.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.graph import lightrag_manager
+from aperag.graph.lightrag_manager import LightRAGPool
+from aperag.llm.provider_cache import provider_config_cache
+
+
+class FakeRAG:
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.finalized = False
+
+    async def finalize_storages(self):
+        self.finalized = True
+
+
+@pytest.fixture
+def created(monkeypatch):
+    created = []
+
+    async def create_lightrag_instance(collection):
+        await asyncio.sleep(0.01)
+        rag = FakeRAG(collection.id)
+        created.append(rag)
+        return rag
+
+    monkeypatch.setattr(lightrag_manager, "create_lightrag_instance", create_lightrag_instance)
+    return created
+
+
+def collection(collection_id, config='{"enable_knowledge_graph": true}'):
+    return SimpleNamespace(id=collection_id, config=config, user="user")
+
+
+async def query(pool, coll):
+    async with pool.lease(coll) as rag:
+        return rag
+
+
+def test_instances_are_reused_per_collection(created):
+    pool = LightRAGPool()
+
+    async def run():
+        first = await asyncio.gather(*(query(pool, collection("a")) for _ in range(5)))
+        second = await query(pool, collection("a"))
+        other = await query(pool, collection("b"))
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+
+    # Concurrent misses share one creation
+    assert len(created) == 2
+    assert all(rag is second for rag in first)
+    assert other is not second
+    stats = pool.get_stats()
+    assert (stats["misses"], stats["hits"], stats["size"]) == (2, 5, 2)
+
+
+def test_config_change_replaces_instance(created):
+    pool = LightRAGPool()
+
+    async def run():
+        old = await query(pool, collection("a"))
+        changed = await query(pool, collection("a", config='{"enable_knowledge_graph": true, "language": "en"}'))
+        provider_config_cache.invalidate()
+        after_provider_change = await query(
+            pool, collection("a", config='{"enable_knowledge_graph": true, "language": "en"}')
+        )
+        return old, changed, after_provider_change
+
+    old, changed, after_provider_change = asyncio.run(run())
+
+    assert old is not changed and changed is not after_provider_change
+    assert old.finalized and changed.finalized
+    assert not after_provider_change.finalized
+
+
+def test_lru_and_idle_eviction_finalize_unused_instances(created):
+    pool = LightRAGPool(max_size=2, idle_ttl=0.2)
+
+    async def run():
+        a = await query(pool, collection("a"))
+        b = await query(pool, collection("b"))
+        await query(pool, collection("a"))
+        await query(pool, collection("c"))
+        assert b.finalized and not a.finalized
+
+        await asyncio.sleep(0.3)
+        await query(pool, collection("d"))
+        return a
+
+    a = asyncio.run(run())
+    assert a.finalized
+    assert pool.get_stats()["size"] == 1
+
+
+def test_instance_in_use_is_finalized_after_release(created):
+    pool = LightRAGPool(max_size=1)
+
+    async def run():
+        async with pool.lease(collection("a")) as a:
+            await query(pool, collection("b"))
+            assert not a.finalized
+        return a
+
+    assert asyncio.run(run()).finalized
+
+
+def test_failed_creation_is_not_pooled(monkeypatch):
+    attempts = []
+
+    async def create_lightrag_instance(collection):
+        attempts.append(collection.id)
+        raise RuntimeError("storage unavailable")
+
+    monkeypatch.setattr(lightrag_manager, "create_lightrag_instance", create_lightrag_instance)
+    pool = LightRAGPool()
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            asyncio.run(query(pool, collection("a")))
+
+    assert attempts == ["a", "a"]
+    assert pool.get_stats()["size"] == 0
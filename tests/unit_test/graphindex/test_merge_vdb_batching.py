@@ -0,0 +1,203 @@
+"""
+Unit tests for the bulk vector writes of _merge_nodes_and_edges_impl.
+"""
+
+import asyncio
+
+from aperag.graph.lightrag.operate import _merge_lock_manager, _merge_nodes_and_edges_impl
+from aperag.graph.lightrag.utils import LightRAGLogger, compute_mdhash_id
+
+
+class FakeGraph:
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+
+    async def get_node(self, node_id):
+        return self.nodes.get(node_id)
+
+    async def has_node(self, node_id):
+        return node_id in self.nodes
+
+    async def upsert_node(self, node_id, node_data):
+        self.nodes[node_id] = node_data
+
+    async def has_edge(self, src, tgt):
+        return (src, tgt) in self.edges
+
+    async def get_edge(self, src, tgt):
+        return self.edges.get((src, tgt))
+
+    async def upsert_edge(self, src, tgt, edge_data):
+        self.edges[(src, tgt)] = edge_data
+
+
+class RecordingVectorStorage:
+    def __init__(self):
+        self.upserts = []
+
+    async def upsert(self, data):
+        self.upserts.append(dict(data))
+
+
+def make_node(name, chunk_id):
+    return {
+        "entity_name": name,
+        "entity_type": "PERSON",
+        "description": f"{name} description",
+        "source_id": chunk_id,
+        "file_path": "doc.txt",
+    }
+
+
+def make_edge(src, tgt, chunk_id):
+    return {
+        "src_id": src,
+        "tgt_id": tgt,
+        "weight": 1.0,
+        "description": f"{src} knows {tgt}",
+        "keywords": "knows",
+        "source_id": chunk_id,
+        "file_path": "doc.txt",
+    }
+
+
+def merge(chunk_results, graph, entity_vdb, relationships_vdb):
+    return asyncio.run(
+        _merge_nodes_and_edges_impl(
+            chunk_results,
+            "ws",
+            graph,
+            entity_vdb,
+            relationships_vdb,
+            llm_model_func=None,
+            tokenizer=None,
+            llm_model_max_token_size=0,
+            summary_to_max_tokens=0,
+            language="English",
+            force_llm_summary_on_merge=100,
+            lightrag_logger=None,
+        )
+    )
+
+
+def test_vector_records_are_written_once_per_component():
+    names = [f"Person{i}" for i in range(20)]
+    chunk_results = [
+        (
+            {name: [make_node(name, f"c{i}")]},
+            {(name, names[(i + 1) % len(names)]): [make_edge(name, names[(i + 1) % len(names)], f"c{i}")]},
+        )
+        for i, name in enumerate(names)
+    ]
+    graph = FakeGraph()
+    entity_vdb = RecordingVectorStorage()
+    relationships_vdb = RecordingVectorStorage()
+
+    result = merge(chunk_results, graph, entity_vdb, relationships_vdb)
+
+    assert result == {"entity_count": 20, "relation_count": 20}
+    assert len(entity_vdb.upserts) == 1
+    assert len(relationships_vdb.upserts) == 1
+
+    entities = entity_vdb.upserts[0]
+    assert set(entities) == {compute_mdhash_id(name, prefix="ent-", workspace="ws") for name in names}
+    person = entities[compute_mdhash_id("Person3", prefix="ent-", workspace="ws")]
+    assert person["content"] == "Person3\nPerson3 description"
+    assert person["source_id"] == "c3"
+
+    relations = relationships_vdb.upserts[0]
+    assert len(relations) == 20
+    assert all(r["src_id"] < r["tgt_id"] for r in relations.values())
+    assert len(graph.nodes) == 20
+    assert len(graph.edges) == 20
+
+
+class LockCheckingGraph(FakeGraph):
+    """Records which other entity locks are held while a node is merged"""
+
+    def __init__(self):
+        super().__init__()
+        self.held_during_upsert = {}
+
+    async def upsert_node(self, node_id, node_data):
+        self.held_during_upsert[node_id] = [
+            name
+            for name in ("A", "B", "C")
+            if name != node_id and _merge_lock_manager.get_or_create_lock(f"entity:{name}:ws").is_locked()
+        ]
+        await super().upsert_node(node_id, node_data)
+
+
+def test_only_the_merged_key_is_locked():
+    chunk_results = [({name: [make_node(name, "c1")]}, {}) for name in ("A", "B", "C")]
+    graph = LockCheckingGraph()
+
+    merge(chunk_results, graph, RecordingVectorStorage(), RecordingVectorStorage())
+
+    assert graph.held_during_upsert == {"A": [], "B": [], "C": []}
+
+
+class ConcurrentlyUpdatedGraph(FakeGraph):
+    """Another merge rewrites entity A while this one is merging its relationships"""
+
+    async def upsert_edge(self, src, tgt, edge_data):
+        await super().upsert_edge(src, tgt, edge_data)
+        self.nodes["A"] = dict(self.nodes["A"], description="newer description", source_id="c1<SEP>c2")
+
+
+def test_vector_records_are_built_from_the_current_graph_state():
+    chunk_results = [
+        ({"A": [make_node("A", "c1")], "B": [make_node("B", "c1")]}, {("A", "B"): [make_edge("A", "B", "c1")]})
+    ]
+    graph = ConcurrentlyUpdatedGraph()
+    entity_vdb = RecordingVectorStorage()
+
+    merge(chunk_results, graph, entity_vdb, RecordingVectorStorage())
+
+    record = entity_vdb.upserts[0][compute_mdhash_id("A", prefix="ent-", workspace="ws")]
+    assert record["content"] == "A\nnewer description"
+    assert record["source_id"] == "c1<SEP>c2"
+
+
+class SlowFirstUpsertStorage:
+    """Keeps the last record per id, the first upsert lands after the others"""
+
+    def __init__(self):
+        self.records = {}
+        self.calls = 0
+
+    async def upsert(self, data):
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(0.05)
+        self.records.update(data)
+
+
+def test_racing_components_leave_the_final_graph_state_in_the_vector_record():
+    graph = FakeGraph()
+    entity_vdb = SlowFirstUpsertStorage()
+    first = [({"X": [dict(make_node("X", "c1"), description="from the first batch")]}, {})]
+    second = [({"X": [dict(make_node("X", "c2"), description="from the second batch")]}, {})]
+
+    async def run():
+        kwargs = dict(
+            llm_model_func=None,
+            tokenizer=None,
+            llm_model_max_token_size=0,
+            summary_to_max_tokens=0,
+            language="English",
+            force_llm_summary_on_merge=100,
+            lightrag_logger=LightRAGLogger(),
+        )
+        await asyncio.gather(
+            _merge_nodes_and_edges_impl(first, "ws", graph, entity_vdb, None, **kwargs),
+            _merge_nodes_and_edges_impl(second, "ws", graph, entity_vdb, None, **kwargs),
+        )
+
+    asyncio.run(run())
+
+    record = entity_vdb.records[compute_mdhash_id("X", prefix="ent-", workspace="ws")]
+    assert "from the second batch" in graph.nodes["X"]["description"]
+    assert record["content"] == f"X\n{graph.nodes['X']['description']}"
+    assert record["source_id"] == graph.nodes["X"]["source_id"]
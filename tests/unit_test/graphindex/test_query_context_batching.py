@@ -0,0 +1,161 @@
+"""
+Unit tests for the batched chunk and graph lookups used while building a LightRAG query context.
+"""
+
+import asyncio
+from collections import Counter
+
+from aperag.graph.lightrag.base import QueryParam
+from aperag.graph.lightrag.operate import (
+    _build_query_context_from_keywords,
+    _find_related_text_unit_from_relationships,
+    _GraphQueryMemo,
+)
+from aperag.graph.lightrag.prompt import GRAPH_FIELD_SEP
+
+
+class WordTokenizer:
+    def encode(self, text):
+        return text.split()
+
+
+class CountingTextChunks:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = Counter()
+
+    async def get_by_id(self, id):
+        self.calls["get_by_id"] += 1
+        return self.chunks.get(id)
+
+    async def get_by_ids(self, ids):
+        self.calls["get_by_ids"] += 1
+        return [{"id": c_id, **self.chunks[c_id]} for c_id in ids if c_id in self.chunks]
+
+
+class CountingGraph:
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+        self.calls = Counter()
+        self.requested = Counter()
+
+    def _neighbors(self, node):
+        return [(node, tgt) for src, tgt in self.edges if src == node] + [
+            (node, src) for src, tgt in self.edges if tgt == node
+        ]
+
+    def _edge(self, src, tgt):
+        return self.edges.get((src, tgt)) or self.edges.get((tgt, src))
+
+    async def get_nodes_batch(self, node_ids):
+        self.calls["get_nodes_batch"] += 1
+        self.requested.update(node_ids)
+        return {n: dict(self.nodes[n]) for n in node_ids if n in self.nodes}
+
+    async def node_degrees_batch(self, node_ids):
+        self.calls["node_degrees_batch"] += 1
+        return {n: len(self._neighbors(n)) for n in node_ids}
+
+    async def get_nodes_edges_batch(self, node_ids):
+        self.calls["get_nodes_edges_batch"] += 1
+        return {n: self._neighbors(n) for n in node_ids}
+
+    async def get_edges_batch(self, pairs):
+        self.calls["get_edges_batch"] += 1
+        return {
+            (p["src"], p["tgt"]): dict(self._edge(p["src"], p["tgt"])) for p in pairs if self._edge(p["src"], p["tgt"])
+        }
+
+    async def edge_degrees_batch(self, edge_pairs):
+        self.calls["edge_degrees_batch"] += 1
+        return {(s, t): len(self._neighbors(s)) + len(self._neighbors(t)) for s, t in edge_pairs}
+
+
+class FakeVectorStorage:
+    cosine_better_than_threshold = 0.2
+
+    def __init__(self, results):
+        self.results = results
+
+    async def query(self, query, top_k, ids=None):
+        return self.results
+
+
+def make_storages():
+    chunks = {f"c{i}": {"content": f"chunk number {i}", "file_path": "doc.txt"} for i in range(1, 7)}
+    nodes = {
+        "Alice": {"entity_type": "PERSON", "description": "Alice", "source_id": GRAPH_FIELD_SEP.join(["c1", "c2"])},
+        "Bob": {"entity_type": "PERSON", "description": "Bob", "source_id": GRAPH_FIELD_SEP.join(["c2", "c3"])},
+        "Carol": {"entity_type": "PERSON", "description": "Carol", "source_id": "c4"},
+    }
+    edges = {
+        ("Alice", "Bob"): {"description": "friends", "keywords": "k", "weight": 1.0, "source_id": "c2"},
+        ("Bob", "Carol"): {
+            "description": "colleagues",
+            "keywords": "k",
+            "weight": 2.0,
+            "source_id": GRAPH_FIELD_SEP.join(["c5", "c6"]),
+        },
+    }
+    return CountingTextChunks(chunks), CountingGraph(nodes, edges)
+
+
+def test_hybrid_query_uses_one_chunk_lookup_per_path():
+    text_chunks, graph = make_storages()
+    entities_vdb = FakeVectorStorage([{"entity_name": "Alice"}, {"entity_name": "Bob"}])
+    relationships_vdb = FakeVectorStorage([{"src_id": "Bob", "tgt_id": "Carol"}])
+
+    result = asyncio.run(
+        _build_query_context_from_keywords(
+            "alice, bob",
+            "work",
+            graph,
+            entities_vdb,
+            relationships_vdb,
+            text_chunks,
+            QueryParam(mode="hybrid"),
+            WordTokenizer(),
+        )
+    )
+
+    entities_context, relations_context, text_units_context = result
+    assert {e["entity"] for e in entities_context} == {"Alice", "Bob", "Carol"}
+    assert {t["content"] for t in text_units_context} == {f"chunk number {i}" for i in (1, 2, 3, 5, 6)}
+
+    assert text_chunks.calls["get_by_id"] == 0
+    assert text_chunks.calls["get_by_ids"] == 2
+    # Adjacency is looked up once for the local path and shared by both of its consumers
+    assert graph.calls["get_nodes_edges_batch"] == 1
+    # Bob is needed by both paths but fetched once
+    assert graph.requested["Bob"] == 1
+
+
+def test_memo_only_fetches_missing_keys():
+    _, graph = make_storages()
+    memo = _GraphQueryMemo(graph)
+
+    async def run():
+        first = await memo.get_nodes_batch(["Alice", "Missing"])
+        second = await memo.get_nodes_batch(["Alice", "Bob", "Missing"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert set(first) == {"Alice"}
+    assert set(second) == {"Alice", "Bob"}
+    assert graph.requested == Counter({"Alice": 1, "Missing": 1, "Bob": 1})
+
+
+def test_relationship_chunks_keep_first_order():
+    text_chunks, _ = make_storages()
+    edge_datas = [
+        {"source_id": GRAPH_FIELD_SEP.join(["c5", "c2"])},
+        {"source_id": GRAPH_FIELD_SEP.join(["c2", "missing", "c1"])},
+    ]
+
+    chunks = asyncio.run(
+        _find_related_text_unit_from_relationships(edge_datas, QueryParam(), text_chunks, WordTokenizer())
+    )
+
+    assert [c["content"] for c in chunks] == ["chunk number 5", "chunk number 2", "chunk number 1"]
+    assert text_chunks.calls == Counter({"get_by_ids": 1})
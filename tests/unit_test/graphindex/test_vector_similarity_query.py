@@ -0,0 +1,187 @@
+"""
+Unit tests for the ANN similarity queries on the LightRAG vector tables.
+"""
+
+import math
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from aperag.db.models import LIGHTRAG_VECTOR_INDEX_DIMENSIONS, LightRAGVDBEntityModel
+from aperag.db.repositories import lightrag as lightrag_module
+from aperag.db.repositories.lightrag import LightragRepositoryMixin
+
+
+class FakeRow:
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+
+class FakeResult(list):
+    def scalar(self):
+        return self[0] if self else None
+
+
+def similarity(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+
+
+class SimulatedSession:
+    """
+    Entity table shared by several workspaces, with a global HNSW index.
+
+    Index scans return the ef_search nearest rows of the whole table and filter them
+    afterwards, or with iterative scan keep going until top_k rows pass the filters or
+    max_scan_tuples rows were visited, as pgvector does.
+    """
+
+    def __init__(self, rows, query_vector, pgvector_version="0.8.0"):
+        self.rows = rows
+        self.query_vector = query_vector
+        self.pgvector_version = pgvector_version
+        self.settings = {}
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append((sql, params))
+        if "pg_extension" in sql:
+            return FakeResult([self.pgvector_version])
+        if "set_config" in sql:
+            self.settings.update({"ef_search": int(params["ef_search"])})
+            if "iterative_scan" in sql:
+                self.settings["max_scan_tuples"] = int(params["max_scan_tuples"])
+            return FakeResult()
+
+        ranked = sorted(self.rows, key=lambda row: -similarity(row["vector"], self.query_vector))
+        in_workspace = [row for row in ranked if row["workspace"] == params["workspace"]]
+        if "ORDER BY distance DESC" in sql:
+            # Exact scan of the workspace
+            matches = [
+                row for row in in_workspace if similarity(row["vector"], self.query_vector) > params["threshold"]
+            ]
+        elif "max_scan_tuples" in self.settings:
+            visited = ranked[: self.settings["max_scan_tuples"]]
+            matches = [row for row in visited if row["workspace"] == params["workspace"]]
+        else:
+            matches = [row for row in ranked[: self.settings["ef_search"]] if row["workspace"] == params["workspace"]]
+        return FakeResult(
+            FakeRow({"entity_name": row["name"], "distance": similarity(row["vector"], self.query_vector)})
+            for row in matches[: params["top_k"]]
+        )
+
+    def executed(self, fragment):
+        return [sql for sql, _ in self.statements if fragment in sql]
+
+
+class Repository(LightragRepositoryMixin):
+    def __init__(self, session):
+        self.session = session
+
+    def _execute_query(self, query_func):
+        return query_func(self.session)
+
+
+@pytest.fixture(autouse=True)
+def reset_version_detection(monkeypatch):
+    monkeypatch.setattr(lightrag_module, "_hnsw_iterative_scan", None)
+
+
+def make_rows():
+    # A large tenant right next to the query and a small one a bit further away
+    rows = [{"workspace": "big", "name": f"big-{i}", "vector": [1.0, 0.001 * i]} for i in range(1000)]
+    rows += [{"workspace": "small", "name": f"small-{i}", "vector": [1.0, 0.5 + 0.01 * i]} for i in range(5)]
+    return rows
+
+
+QUERY = [1.0, 0.0]
+
+
+def search(session, workspace, top_k=3, **kwargs):
+    return Repository(session).query_lightrag_vdb_entity_similarity(
+        workspace, QUERY, top_k, threshold=0.2, ef_search=100, **kwargs
+    )
+
+
+def test_large_workspace_is_served_by_the_index():
+    session = SimulatedSession(make_rows(), QUERY)
+
+    results = search(session, "big")
+
+    assert [row["entity_name"] for row in results] == ["big-0", "big-1", "big-2"]
+    assert not session.executed("ORDER BY distance DESC")
+    (query,) = session.executed("LIMIT :top_k")
+    distance = "t.content_vector::vector(2) <=> '[1.0,0.0]'::vector(2)"
+    assert f"ORDER BY {distance} LIMIT :top_k" in query
+    assert "vector_dims(t.content_vector) = 2" in query
+    (set_config,) = session.executed("set_config")
+    assert "'hnsw.iterative_scan', 'relaxed_order'" in set_config
+
+
+def test_small_workspace_keeps_full_recall(monkeypatch):
+    monkeypatch.setattr(lightrag_module, "HNSW_MAX_SCAN_TUPLES", 200)
+    session = SimulatedSession(make_rows(), QUERY)
+
+    results = search(session, "small", top_k=5)
+
+    # The index scan gave up before reaching the small tenant, the exact scan found all of it
+    assert [row["entity_name"] for row in results] == [f"small-{i}" for i in range(5)]
+    assert session.executed("ORDER BY distance DESC")
+
+
+def test_old_pgvector_uses_exact_scans():
+    session = SimulatedSession(make_rows(), QUERY, pgvector_version="0.7.4")
+
+    results = search(session, "small", top_k=5)
+
+    assert len(results) == 5
+    assert not session.executed("set_config")
+    # The version is detected once per process
+    search(session, "big")
+    assert len(session.executed("pg_extension")) == 1
+
+
+def test_document_filter_uses_exact_scan():
+    session = SimulatedSession(make_rows(), QUERY)
+
+    Repository(session).query_lightrag_doc_chunks_similarity("big", QUERY, 3, doc_ids=["doc-a"], ef_search=40)
+
+    (query,) = session.executed("LIMIT :top_k")
+    assert "t.full_doc_id = ANY(:doc_ids)" in query
+    assert "ORDER BY distance DESC" in query
+    assert session.statements[-1][1]["doc_ids"] == ["doc-a"]
+
+
+def test_ef_search_covers_top_k():
+    session = SimulatedSession(make_rows(), QUERY)
+
+    search(session, "big", top_k=200)
+
+    assert session.settings["ef_search"] == 200
+
+
+def test_ef_search_defaults_to_one_constant():
+    from dataclasses import fields
+
+    from aperag.graph.lightrag.kg.pg_ops_sync_vector_storage import PGOpsSyncVectorStorage
+    from aperag.graph.lightrag_manager import LightRAGConfig
+
+    storage_default = next(f.default for f in fields(PGOpsSyncVectorStorage) if f.name == "ef_search")
+    assert storage_default == LightRAGConfig.VECTOR_EF_SEARCH == lightrag_module.HNSW_EF_SEARCH
+    session = SimulatedSession(make_rows(), QUERY)
+    Repository(session).query_lightrag_doc_chunks_similarity("big", QUERY, 3)
+    assert session.settings["ef_search"] == lightrag_module.HNSW_EF_SEARCH
+
+
+def test_hnsw_index_per_dimension():
+    indexes = {
+        index.name: " ".join(str(CreateIndex(index).compile(dialect=postgresql.dialect())).split())
+        for index in LightRAGVDBEntityModel.__table__.indexes
+    }
+
+    for dim in LIGHTRAG_VECTOR_INDEX_DIMENSIONS:
+        ddl = indexes[f"idx_lightrag_vdb_entity_vector_{dim}"]
+        assert f"USING hnsw ((content_vector::vector({dim})) vector_cosine_ops)" in ddl
+        assert ddl.endswith(f"WHERE vector_dims(content_vector) = {dim}")
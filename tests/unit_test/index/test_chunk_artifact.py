@@ -0,0 +1,97 @@
+import pytest
+
+from aperag.config import settings
+from aperag.docparser.base import TextPart, TitlePart
+from aperag.docparser.chunking import rechunk
+from aperag.index import chunk_artifact
+from aperag.index.chunk_artifact import (
+    ChunkArtifact,
+    build_chunk_artifact,
+    chunk_artifact_key,
+    load_chunk_artifact,
+    save_chunk_artifact,
+)
+
+
+def mock_tokenizer(text):
+    return text.split()
+
+
+@pytest.fixture(autouse=True)
+def patch_tokenizer(monkeypatch):
+    monkeypatch.setattr(chunk_artifact, "get_default_tokenizer", lambda: mock_tokenizer)
+
+
+def make_parts():
+    return [
+        TitlePart(content="# Manual", level=1, metadata={"md_source_map": [0, 1]}),
+        TextPart(content="Intro paragraph. " * 40, metadata={"md_source_map": [1, 2]}),
+        TitlePart(content="## Install", level=2, metadata={"md_source_map": [2, 3]}),
+        TextPart(content="Run the installer and follow the prompts. " * 80, metadata={"md_source_map": [3, 9]}),
+    ]
+
+
+def test_artifact_matches_rechunk_output():
+    expected = rechunk(make_parts(), settings.chunk_size, settings.chunk_overlap_size, mock_tokenizer)
+    artifact = build_chunk_artifact(make_parts())
+
+    restored = ChunkArtifact.from_bytes(artifact.to_bytes())
+    assert [c.content for c in restored.chunks] == [c.content for c in expected]
+    assert [c.metadata for c in restored.chunks] == [c.metadata for c in expected]
+
+
+def test_key_depends_on_content_and_params():
+    key = chunk_artifact_key(make_parts(), 400, 20, "cl100k_base")
+    assert key == chunk_artifact_key(make_parts(), 400, 20, "cl100k_base")
+    assert key != chunk_artifact_key(make_parts(), 300, 20, "cl100k_base")
+    assert key != chunk_artifact_key(make_parts(), 400, 0, "cl100k_base")
+    assert key != chunk_artifact_key(make_parts(), 400, 20, "o200k_base")
+
+    edited = make_parts()
+    edited[1].content += " Edited."
+    assert key != chunk_artifact_key(edited, 400, 20, "cl100k_base")
+
+    labelled = make_parts()
+    labelled[1].metadata["labels"] = [{"key": "k", "value": "v"}]
+    assert key != chunk_artifact_key(labelled, 400, 20, "cl100k_base")
+
+
+def test_save_and_load_roundtrip(object_store):
+    path = save_chunk_artifact(make_parts(), "user-u/col/doc")
+    assert path.startswith("user-u/col/doc/chunks/")
+
+    artifact = load_chunk_artifact(path)
+    assert artifact is not None
+    assert [c.content for c in artifact.chunks] == [c.content for c in build_chunk_artifact(make_parts()).chunks]
+
+
+def test_save_reuses_existing_artifact(object_store, monkeypatch):
+    path = save_chunk_artifact(make_parts(), "user-u/col/doc")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not rechunk")
+
+    monkeypatch.setattr(chunk_artifact, "build_chunk_artifact", fail)
+    assert save_chunk_artifact(make_parts(), "user-u/col/doc") == path
+
+
+def test_new_version_replaces_old_artifact(object_store):
+    old_path = save_chunk_artifact(make_parts(), "user-u/col/doc")
+    edited = make_parts()
+    edited[3].content = "Completely rewritten section."
+    new_path = save_chunk_artifact(edited, "user-u/col/doc")
+
+    assert new_path != old_path
+    assert not object_store.obj_exists(old_path)
+    assert object_store.obj_exists(new_path)
+
+
+def test_load_ignores_mismatched_params(object_store, monkeypatch):
+    path = save_chunk_artifact(make_parts(), "user-u/col/doc")
+    monkeypatch.setattr(settings, "chunk_size", settings.chunk_size + 100)
+    assert load_chunk_artifact(path) is None
+
+
+def test_load_missing_artifact(object_store):
+    assert load_chunk_artifact(None) is None
+    assert load_chunk_artifact("user-u/col/doc/chunks/missing.json") is None
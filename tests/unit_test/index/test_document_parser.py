@@ -0,0 +1,93 @@
+import hashlib
+import io
+import types
+
+import pypdfium2 as pdfium
+import pytest
+
+from aperag.config import settings
+from aperag.docparser.base import AssetBinPart, AssetRefPart
+from aperag.index import document_parser as document_parser_module
+from aperag.index.document_parser import DocumentParser
+
+
+def make_pdf(page_count: int) -> bytes:
+    pdf = pdfium.PdfDocument.new()
+    for i in range(page_count):
+        pdf.new_page(100 + i * 10, 150)
+    with io.BytesIO() as buffer:
+        pdf.save(buffer)
+        return buffer.getvalue()
+
+
+@pytest.fixture
+def object_store_targets():
+    return ["aperag.index.document_parser.get_object_store"]
+
+
+def read(store, path):
+    with store.get(path) as stream:
+        return stream.read()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_pages_are_spilled_to_object_store(object_store, monkeypatch, workers):
+    monkeypatch.setattr(settings, "pdf_render_workers", workers)
+
+    pages = DocumentParser().render_pdf_pages(make_pdf(5), {"name": "a.pdf"}, "user-u/col/doc")
+    assert isinstance(pages, types.GeneratorType)
+
+    pages = list(pages)
+    assert [p.asset_id for p in pages] == [f"page_{i}.png" for i in range(5)]
+    for i, page in enumerate(pages):
+        assert isinstance(page, AssetRefPart)
+        assert page.path == f"user-u/col/doc/assets/page_{i}.png"
+        assert page.metadata["page_idx"] == i
+        assert page.metadata["name"] == "a.pdf"
+        data = read(object_store, page.path)
+        assert data.startswith(b"\x89PNG")
+        assert page.metadata["content_hash"] == hashlib.sha256(data).hexdigest()
+
+
+def test_pool_output_matches_in_process_rendering(object_store, monkeypatch):
+    pdf = make_pdf(4)
+    monkeypatch.setattr(settings, "pdf_render_workers", 1)
+    serial = [p.metadata["content_hash"] for p in DocumentParser().render_pdf_pages(pdf, {}, "b1")]
+    monkeypatch.setattr(settings, "pdf_render_workers", 2)
+    # A tiny budget keeps a single page in flight
+    monkeypatch.setattr(settings, "pdf_render_memory_budget", 1)
+    pooled = [p.metadata["content_hash"] for p in DocumentParser().render_pdf_pages(pdf, {}, "b2")]
+    assert serial == pooled
+
+
+def test_page_cap_and_dpi(object_store, monkeypatch):
+    monkeypatch.setattr(settings, "pdf_render_workers", 1)
+    monkeypatch.setattr(settings, "pdf_render_max_pages", 2)
+    monkeypatch.setattr(settings, "pdf_render_dpi", 144)
+
+    pages = list(DocumentParser().render_pdf_pages(make_pdf(5), {}, "user-u/col/doc"))
+    assert len(pages) == 2
+
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(read(object_store, pages[0].path)))
+    assert image.size == (200, 300)
+
+
+def test_without_object_store_pages_stay_in_memory(monkeypatch):
+    monkeypatch.setattr(settings, "pdf_render_workers", 1)
+    pages = list(DocumentParser().render_pdf_pages(make_pdf(2), {}, None))
+    assert all(isinstance(p, AssetBinPart) and p.data.startswith(b"\x89PNG") for p in pages)
+
+
+def test_documents_share_one_spawned_render_pool(object_store, monkeypatch):
+    monkeypatch.setattr(settings, "pdf_render_workers", 2)
+    parser = DocumentParser()
+
+    list(parser.render_pdf_pages(make_pdf(3), {}, "user-u/col/doc-a"))
+    executor = document_parser_module._get_render_executor()
+    list(parser.render_pdf_pages(make_pdf(3), {}, "user-u/col/doc-b"))
+
+    assert document_parser_module._get_render_executor() is executor
+    # Celery runs tasks in threads, forking such a process is not safe
+    assert executor._mp_context.get_start_method() == "spawn"
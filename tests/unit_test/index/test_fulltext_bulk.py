@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from elasticsearch import Elasticsearch
+from elasticsearch._sync.client.indices import IndicesClient
+
+from aperag.config import settings
+from aperag.docparser.base import TextPart
+from aperag.index.fulltext_index import FulltextIndexer
+
+
+class FakeCluster:
+    """Records the HTTP calls the indexer makes instead of talking to Elasticsearch"""
+
+    def __init__(self, monkeypatch, index_exists=True, rejected_ids=()):
+        self.bulk_requests = []
+        self.exists_calls = 0
+        self.refresh_calls = 0
+        self.index_exists = index_exists
+        self.rejected_ids = set(rejected_ids)
+        cluster = self
+
+        def bulk(client, *args, operations, **kwargs):
+            lines = [json.loads(line) for line in operations]
+            cluster.bulk_requests.append(lines)
+            items = []
+            for header in lines[::2]:
+                chunk_id = header["index"]["_id"]
+                if chunk_id in cluster.rejected_ids:
+                    items.append({"index": {"_id": chunk_id, "status": 400, "error": {"type": "mapper_parsing"}}})
+                else:
+                    items.append({"index": {"_id": chunk_id, "status": 201}})
+            return SimpleNamespace(body={"errors": bool(cluster.rejected_ids), "items": items})
+
+        def exists(indices, index):
+            cluster.exists_calls += 1
+            return SimpleNamespace(body=cluster.index_exists)
+
+        def refresh(indices, index):
+            cluster.refresh_calls += 1
+
+        monkeypatch.setattr(Elasticsearch, "bulk", bulk)
+        monkeypatch.setattr(IndicesClient, "exists", exists)
+        monkeypatch.setattr(IndicesClient, "refresh", refresh)
+
+    @property
+    def indexed_ids(self):
+        return [line["index"]["_id"] for request in self.bulk_requests for line in request[::2]]
+
+
+def make_chunks(n):
+    return [TextPart(content=f"chunk {i} " * 10, metadata={"titles": ["Doc", f"Section {i}"]}) for i in range(n)]
+
+
+@pytest.fixture
+def indexer():
+    return FulltextIndexer(es_host="http://localhost:9200")
+
+
+def test_chunks_are_sent_in_bulk_batches(indexer, monkeypatch):
+    cluster = FakeCluster(monkeypatch)
+    monkeypatch.setattr(settings, "es_bulk_chunk_size", 100)
+
+    chunk_count, total_length = indexer._process_chunks(7, [], "doc.md", "collection-index", make_chunks(250))
+
+    assert chunk_count == 250
+    assert total_length == sum(len(c.content.strip()) for c in make_chunks(250))
+    assert [len(r) // 2 for r in cluster.bulk_requests] == [100, 100, 50]
+    assert cluster.indexed_ids == [f"7_{i}" for i in range(250)]
+    assert cluster.exists_calls == 1
+    assert cluster.refresh_calls == 1
+
+    source = cluster.bulk_requests[0][1]
+    assert source["document_id"] == 7
+    assert source["name"] == "doc.md"
+    assert source["title"] == "Doc > Section 0"
+
+
+def test_batches_are_bounded_by_size(indexer, monkeypatch):
+    cluster = FakeCluster(monkeypatch)
+    monkeypatch.setattr(settings, "es_bulk_max_bytes", 2000)
+
+    indexer._process_chunks(7, [], "doc.md", "collection-index", make_chunks(20))
+
+    assert len(cluster.bulk_requests) > 1
+    assert cluster.indexed_ids == [f"7_{i}" for i in range(20)]
+
+
+def test_refresh_can_be_disabled(indexer, monkeypatch):
+    cluster = FakeCluster(monkeypatch)
+    monkeypatch.setattr(settings, "es_bulk_refresh", False)
+
+    indexer._process_chunks(7, [], "doc.md", "collection-index", make_chunks(3))
+    assert cluster.refresh_calls == 0
+
+
+def test_partial_failures_are_reported_per_chunk(indexer, monkeypatch):
+    FakeCluster(monkeypatch, rejected_ids={"7_1", "7_4"})
+
+    with pytest.raises(Exception) as exc_info:
+        indexer._process_chunks(7, [], "doc.md", "collection-index", make_chunks(6))
+
+    message = str(exc_info.value)
+    assert "2 of 6 chunks failed" in message
+    assert "7_1" in message and "7_4" in message
+
+
+def test_missing_index_is_skipped(indexer, monkeypatch):
+    cluster = FakeCluster(monkeypatch, index_exists=False)
+
+    assert indexer._process_chunks(7, [], "doc.md", "collection-index", make_chunks(3)) == (0, 0)
+    assert cluster.bulk_requests == []
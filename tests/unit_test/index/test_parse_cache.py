@@ -0,0 +1,119 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.config import settings
+from aperag.docparser.base import AssetBinPart, AssetRefPart, MarkdownPart, TextPart, TitlePart
+from aperag.index.document_parser import DocumentParsingResult, document_parser
+from aperag.index.parse_cache import load_parse_result, parse_cache_key, parse_cache_path, save_parse_result
+from aperag.service.setting_service import setting_service
+from aperag.tasks.utils import parse_document_content
+
+BASE_PATH = "user-u/col/doc"
+
+
+@pytest.fixture
+def object_store_targets():
+    return ["aperag.objectstore.base.get_object_store", "aperag.index.document_parser.get_object_store"]
+
+
+@pytest.fixture
+def source_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "manual.md")
+        with open(path, "wb") as f:
+            f.write(b"# Manual\n\nIntro paragraph.")
+        yield path
+
+
+def make_parts():
+    return [
+        MarkdownPart(markdown="# Manual\n\nIntro paragraph."),
+        TitlePart(content="# Manual", level=1, metadata={"md_source_map": [0, 1]}),
+        TextPart(content="Intro paragraph.", metadata={"md_source_map": [2, 3]}),
+        AssetBinPart(asset_id="figure.png", data=b"png", mime_type="image/png", metadata={"vision_index": True}),
+        AssetBinPart(asset_id="logo.png", data=b"png", mime_type="image/png", metadata={}),
+    ]
+
+
+def test_key_depends_on_content_metadata_and_parser_config(source_file, monkeypatch):
+    key = parse_cache_key(source_file, {"name": "manual.md"}, {"use_mineru": False})
+    assert key == parse_cache_key(source_file, {"name": "manual.md"}, {"use_mineru": False})
+    assert key != parse_cache_key(source_file, {"name": "other.md"}, {"use_mineru": False})
+    assert key != parse_cache_key(source_file, {"name": "manual.md"}, {"use_mineru": True})
+
+    monkeypatch.setattr(settings, "pdf_render_dpi", settings.pdf_render_dpi * 2)
+    assert key != parse_cache_key(source_file, {"name": "manual.md"}, {"use_mineru": False})
+    monkeypatch.undo()
+
+    with open(source_file, "ab") as f:
+        f.write(b" Edited.")
+    assert key != parse_cache_key(source_file, {"name": "manual.md"}, {"use_mineru": False})
+
+
+def test_saved_result_restores_parts_with_asset_references(object_store):
+    doc_parts = make_parts()
+    content = document_parser.save_processed_content_and_assets(doc_parts, BASE_PATH)
+    save_parse_result("k1", BASE_PATH, content, doc_parts)
+
+    cached_content, cached_parts = load_parse_result("k1", BASE_PATH)
+
+    assert cached_content == content
+    assert [type(part) for part in cached_parts] == [TitlePart, TextPart, AssetRefPart]
+    assert cached_parts[0].level == 1
+    assert cached_parts[1].metadata == {"md_source_map": [2, 3]}
+    assert cached_parts[2].path == f"{BASE_PATH}/assets/figure.png"
+    assert object_store.obj_exists(cached_parts[2].path)
+
+    assert load_parse_result("other", BASE_PATH) is None
+    # Entries whose parsed content was removed are not trusted
+    object_store.delete(f"{BASE_PATH}/parsed.md")
+    assert load_parse_result("k1", BASE_PATH) is None
+
+
+def test_unchanged_document_is_parsed_once(object_store, source_file, monkeypatch):
+    parses = []
+
+    def process_document_parsing(filepath, file_metadata, object_store_base_path, parser_config):
+        parses.append(filepath)
+        doc_parts = make_parts()
+        content = document_parser.save_processed_content_and_assets(doc_parts, object_store_base_path)
+        return DocumentParsingResult(doc_parts=doc_parts, content=content)
+
+    source = SimpleNamespace(
+        prepare_document=lambda name, metadata: SimpleNamespace(path=source_file, metadata=metadata),
+        cleanup_document=lambda path: None,
+    )
+    monkeypatch.setattr("aperag.source.base.get_source", lambda config: source)
+    monkeypatch.setattr(document_parser, "process_document_parsing", process_document_parsing)
+    monkeypatch.setattr(setting_service, "get_all_settings_sync", lambda: {"use_mineru": False})
+
+    document = SimpleNamespace(
+        id="doc",
+        name="manual.md",
+        doc_metadata='{"file_type": "chat_upload", "chat_id": "chat-1"}',
+        object_store_base_path=lambda: BASE_PATH,
+    )
+    collection = SimpleNamespace(config="{}")
+
+    first_content, first_parts, _ = parse_document_content(document, collection)
+    second_content, second_parts, _ = parse_document_content(document, collection)
+
+    assert len(parses) == 1
+    assert second_content == first_content
+    assert [part.content for part in second_parts] == [part.content for part in first_parts]
+    # Chat metadata is still applied to the cached parts
+    assert all(part.metadata["chat_id"] == "chat-1" for part in second_parts)
+
+    metadata = {"file_type": "chat_upload", "chat_id": "chat-1", "doc_id": "doc"}
+    old_entry = parse_cache_path(BASE_PATH, parse_cache_key(source_file, metadata, {"use_mineru": False}))
+    assert object_store.obj_exists(old_entry)
+
+    with open(source_file, "ab") as f:
+        f.write(b" Edited.")
+    parse_document_content(document, collection)
+    assert len(parses) == 2
+    # The entry of the old file content was replaced
+    assert not object_store.obj_exists(old_entry)
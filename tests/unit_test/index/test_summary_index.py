@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+from aperag.config import settings
+from aperag.index import summary_index
+from aperag.index.summary_index import SummaryIndexer, make_chunk_summary_cache_key
+
+
+def word_tokenizer(text):
+    return text.split()
+
+
+class FakeCompletionService:
+    provider = "openai"
+    model = "gpt-test"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate(self, history, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if prompt.startswith("Summarize this text chunk"):
+            text = prompt.split("Text content:\n", 1)[1].rsplit("\n\nSummary:", 1)[0]
+            return f"summary of {text.split()[0]}"
+        section = prompt.split("Section summaries:\n", 1)[1].rsplit("\n\nFinal summary:", 1)[0]
+        return f"combined {len(section.split())} words"
+
+    def chunk_prompts(self):
+        return [p for p in self.prompts if p.startswith("Summarize this text chunk")]
+
+    def reduce_prompts(self):
+        return [p for p in self.prompts if p.startswith("Combine these section summaries")]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr("aperag.db.redis_manager.get_sync_redis_client", lambda: fake)
+    monkeypatch.setattr(summary_index, "get_default_tokenizer", lambda: word_tokenizer)
+    return fake
+
+
+def make_chunks(n):
+    return [f"part{i} " + "filler " * 20 for i in range(n)]
+
+
+def test_map_phase_runs_concurrently_and_keeps_order(redis, monkeypatch):
+    monkeypatch.setattr(settings, "summary_map_concurrency", 4)
+    service = FakeCompletionService(delay=0.02)
+
+    summaries = SummaryIndexer()._map_summaries(make_chunks(12), service)
+
+    assert summaries == [f"summary of part{i}" for i in range(12)]
+    assert 1 < service.max_in_flight <= 4
+
+
+def test_unchanged_chunks_are_not_resummarized(redis):
+    indexer = SummaryIndexer()
+    service = FakeCompletionService()
+    indexer._map_summaries(make_chunks(5), service)
+    assert len(service.chunk_prompts()) == 5
+
+    service = FakeCompletionService()
+    edited = make_chunks(5)
+    edited[2] = "edited " + edited[2]
+    summaries = indexer._map_summaries(edited + ["new chunk"], service)
+
+    assert len(service.chunk_prompts()) == 2
+    assert summaries[2] == "summary of edited"
+    assert summaries[5] == "summary of new"
+    assert make_chunk_summary_cache_key("openai", "gpt-test", make_chunks(5)[0]) in redis.data
+
+
+def test_duplicate_chunks_are_summarized_once(redis):
+    service = FakeCompletionService()
+    summaries = SummaryIndexer()._map_summaries(["same text"] * 3, service)
+    assert summaries == ["summary of same"] * 3
+    assert len(service.chunk_prompts()) == 1
+
+
+def test_cache_key_depends_on_model():
+    assert make_chunk_summary_cache_key("openai", "a", "text") != make_chunk_summary_cache_key("openai", "b", "text")
+
+
+def test_reduce_tree_respects_token_budget(redis, monkeypatch):
+    monkeypatch.setattr(settings, "summary_reduce_max_tokens", 50)
+    service = FakeCompletionService()
+    summaries = [f"summary {i} " + "word " * 8 for i in range(40)]
+
+    result = SummaryIndexer()._reduce_summary_tree(summaries, service)
+
+    assert result.startswith("combined")
+    assert len(service.reduce_prompts()) > 1
+    for prompt in service.reduce_prompts():
+        section = prompt.split("Section summaries:\n", 1)[1].rsplit("\n\nFinal summary:", 1)[0]
+        assert len(section.split()) <= 50
+
+
+def test_small_input_is_reduced_once(redis):
+    service = FakeCompletionService()
+    SummaryIndexer()._reduce_summary_tree(["a b c", "d e f"], service)
+    assert len(service.reduce_prompts()) == 1
+
+
+def test_oversized_summaries_are_truncated(redis):
+    groups = SummaryIndexer()._group_summaries(["word " * 100, "word " * 100, "short"], word_tokenizer, 40)
+    for group in groups:
+        assert sum(len(s.split()) for s in group) <= 40
+    assert len(groups) < 3
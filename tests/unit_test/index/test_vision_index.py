@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.config import settings
+from aperag.index import vision_index
+from aperag.index.vision_index import (
+    VisionIndexer,
+    VisionToTextError,
+    make_vision_text_cache_key,
+    vision_text_path,
+)
+from aperag.llm.llm_error_types import AuthenticationError, RateLimitError
+
+
+class FakeVisionService:
+    provider = "openai"
+    model = "gpt-vision"
+
+    def __init__(self, failures=None):
+        # image bytes -> list of exceptions raised on successive calls
+        self.failures = failures or {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def agenerate(self, history, prompt, images=None, memory=False):
+        self.calls.append(images[0])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            for data, errors in self.failures.items():
+                if images[0].endswith(data) and errors:
+                    raise errors.pop(0)
+            return f"description of {images[0][-8:]}"
+        finally:
+            self.in_flight -= 1
+
+
+def make_image(i):
+    return SimpleNamespace(data=f"image-{i:02d}".encode(), mime_type="image/png", asset_id=f"asset-{i}", metadata={})
+
+
+def b64(part):
+    import base64
+
+    return base64.b64encode(part.data).decode()
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    sleep = asyncio.sleep
+
+    async def no_wait(delay, *args, **kwargs):
+        await sleep(0)
+
+    monkeypatch.setattr(vision_index.asyncio, "sleep", no_wait)
+    yield
+
+
+def describe(parts, service, base_path):
+    return asyncio.run(VisionIndexer()._describe_images(parts, service, base_path))
+
+
+def test_images_are_described_concurrently_in_order(object_store, monkeypatch):
+    monkeypatch.setattr(settings, "vision_to_text_concurrency", 3)
+    parts = [make_image(i) for i in range(10)]
+    service = FakeVisionService()
+
+    descriptions = describe(parts, service, "user-u/col/doc")
+
+    assert descriptions == [f"description of {b64(p)[-8:]}" for p in parts]
+    assert service.max_in_flight == 3
+
+
+def test_results_are_persisted_and_reused(object_store):
+    parts = [make_image(i) for i in range(4)]
+    describe(parts, FakeVisionService(), "user-u/col/doc")
+
+    key = make_vision_text_cache_key("openai", "gpt-vision", hashlib.sha256(parts[0].data).hexdigest())
+    assert object_store.obj_exists(vision_text_path("user-u/col/doc", key))
+
+    service = FakeVisionService()
+    describe(parts + [make_image(9)], service, "user-u/col/doc")
+    assert len(service.calls) == 1
+
+
+def test_identical_images_are_described_once(object_store):
+    service = FakeVisionService()
+    descriptions = describe([make_image(1), make_image(1)], service, "user-u/col/doc")
+    assert len(service.calls) == 1
+    assert descriptions[0] == descriptions[1]
+
+
+def test_retryable_errors_are_retried(object_store):
+    parts = [make_image(i) for i in range(3)]
+    service = FakeVisionService(failures={b64(parts[1]): [RateLimitError("openai"), RateLimitError("openai")]})
+
+    descriptions = describe(parts, service, "user-u/col/doc")
+    assert all(descriptions)
+    assert len(service.calls) == 5
+
+
+def test_failed_task_resumes_from_completed_images(object_store):
+    parts = [make_image(i) for i in range(5)]
+    service = FakeVisionService(failures={b64(parts[2]): [AuthenticationError("openai")]})
+
+    with pytest.raises(VisionToTextError):
+        describe(parts, service, "user-u/col/doc")
+
+    retry = FakeVisionService()
+    assert all(describe(parts, retry, "user-u/col/doc"))
+    assert retry.calls == [f"data:image/png;base64,{b64(parts[2])}"]
+
+
+def test_without_base_path_nothing_is_persisted(object_store):
+    parts = [make_image(1)]
+    describe(parts, FakeVisionService(), None)
+
+    service = FakeVisionService()
+    describe(parts, service, None)
+    assert len(service.calls) == 1
+
+
+def test_referenced_images_are_loaded_from_object_store(object_store):
+    part = make_image(3)
+    object_store.put("user-u/col/doc/assets/page_3.png", part.data)
+    ref = SimpleNamespace(
+        path="user-u/col/doc/assets/page_3.png",
+        mime_type="image/png",
+        asset_id="page_3.png",
+        metadata={"content_hash": hashlib.sha256(part.data).hexdigest()},
+    )
+
+    service = FakeVisionService()
+    assert describe([ref], service, "user-u/col/doc") == describe([part], FakeVisionService(), None)
+    assert service.calls == [f"data:image/png;base64,{b64(part)}"]
@@ -0,0 +1,125 @@
+import time
+from array import array
+
+import pytest
+
+from aperag.llm.embed.embedding_cache import MemoryEmbeddingCache, make_cache_key
+from aperag.llm.embed.embedding_service import EmbeddingService
+
+
+class CountingEmbeddingService(EmbeddingService):
+    """EmbeddingService whose provider call is replaced with a deterministic fake."""
+
+    def __init__(self, cache, max_chunks=2):
+        super().__init__("openai", "text-embedding-3-small", "http://localhost", "sk-test", max_chunks, cache=cache)
+        self.embedded = []
+
+    def _embed_batch(self, batch):
+        self.embedded.extend(batch)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in batch]
+
+
+def test_cache_key_depends_on_provider_model_and_text():
+    key = make_cache_key("openai", "m1", "hello")
+    assert key == make_cache_key("openai", "m1", "hello")
+    assert key != make_cache_key("openai", "m2", "hello")
+    assert key != make_cache_key("azure", "m1", "hello")
+    assert key != make_cache_key("openai", "m1", "hello!")
+
+
+def test_only_misses_are_sent_to_provider():
+    cache = MemoryEmbeddingCache()
+    svc = CountingEmbeddingService(cache)
+
+    first = svc.embed_documents(["a", "bb", "ccc"])
+    assert svc.embedded == ["a", "bb", "ccc"]
+
+    svc.embedded.clear()
+    # Shifted batch boundaries and a new text: only the new text is embedded
+    second = svc.embed_documents(["dddd", "ccc", "a", "bb"])
+    assert svc.embedded == ["dddd"]
+    assert second[1:] == [first[2], first[0], first[1]]
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 4
+    assert stats["added"] == 4
+
+
+def test_cache_is_shared_across_service_instances():
+    cache = MemoryEmbeddingCache()
+    CountingEmbeddingService(cache).embed_documents(["shared manual text"])
+
+    other = CountingEmbeddingService(cache)
+    other.embed_documents(["shared manual text"])
+    assert other.embedded == []
+
+
+def test_duplicate_texts_are_embedded_once():
+    svc = CountingEmbeddingService(MemoryEmbeddingCache())
+    result = svc.embed_documents(["x", "y", "x", "x"])
+    assert svc.embedded == ["x", "y"]
+    assert result[0] == result[2] == result[3]
+
+
+def test_newlines_are_normalized_before_keying():
+    svc = CountingEmbeddingService(MemoryEmbeddingCache())
+    svc.embed_documents(["line one\nline two"])
+    svc.embedded.clear()
+    svc.embed_documents(["line one line two"])
+    assert svc.embedded == []
+
+
+def test_memory_cache_lru_eviction_by_bytes():
+    entry_size = MemoryEmbeddingCache.entry_size("a", array("f", [0.0] * 256))
+    cache = MemoryEmbeddingCache(max_bytes=2 * entry_size)
+    cache.set_many({"a": [1.0] * 256, "b": [2.0] * 256})
+    cache.get_many(["a"])
+    cache.set_many({"c": [3.0] * 256})
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+    assert cache.size_bytes == 2 * entry_size
+
+    # Replacing an entry does not count it twice, an entry larger than the cache is not stored
+    cache.set_many({"a": [4.0] * 256, "huge": [0.0] * 1024})
+    assert cache.size_bytes == 2 * entry_size
+    assert cache.get_many(["a", "huge"]) == {"a": [4.0] * 256}
+
+
+def test_memory_cache_stores_float32_arrays():
+    cache = MemoryEmbeddingCache()
+    cache.set_many({"a": [0.1] * 1536})
+
+    _, stored = cache._data["a"]
+    assert stored.itemsize == 4 and len(stored) == 1536
+    assert cache.get_many(["a"])["a"] == pytest.approx([0.1] * 1536, rel=1e-6)
+
+
+def test_memory_cache_ttl_expiry(monkeypatch):
+    cache = MemoryEmbeddingCache(ttl=10)
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache.set_many({"a": [1.0]})
+    assert cache.get_many(["a"]) == {"a": [1.0]}
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get_many(["a"]) == {}
+    assert len(cache) == 0
+
+
+def test_broken_cache_falls_back_to_provider():
+    class BrokenCache(MemoryEmbeddingCache):
+        def _get_many(self, keys):
+            raise ConnectionError("redis down")
+
+    svc = CountingEmbeddingService(BrokenCache())
+    assert len(svc.embed_documents(["a", "b"])) == 2
+    assert svc.embedded == ["a", "b"]
+
+
+@pytest.mark.parametrize("max_chunks", [1, 3, 10])
+def test_results_keep_input_order(max_chunks):
+    svc = CountingEmbeddingService(MemoryEmbeddingCache(), max_chunks=max_chunks)
+    texts = [f"text-{i}" * (i + 1) for i in range(7)]
+    svc.embed_documents(texts[::2])
+    result = svc.embed_documents(texts)
+    assert result == svc._embed_batch(texts)
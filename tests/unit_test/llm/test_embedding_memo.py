@@ -0,0 +1,129 @@
+"""
+Unit tests for the request-scoped embedding memo shared by the flow retrievers.
+"""
+
+import asyncio
+
+import pytest
+
+from aperag.flow.base.models import SystemInput
+from aperag.flow.engine import FlowEngine
+from aperag.llm.embed.embedding_memo import (
+    EmbeddingMemo,
+    aembed_documents,
+    aembed_query,
+    get_embedding_memo,
+    reset_embedding_memo,
+    set_embedding_memo,
+)
+from aperag.llm.llm_error_types import EmbeddingError, EmptyTextError
+
+
+class FakeEmbeddingService:
+    def __init__(self, model="small", fail=False):
+        self.embedding_provider = "openai"
+        self.model = model
+        self.api_base = "http://embed"
+        self.api_key = "key"
+        self.fail = fail
+        self.batches = []
+
+    async def aembed_documents(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise EmbeddingError("boom")
+        return [[float(len(text))] for text in texts]
+
+    async def aembed_query(self, text):
+        return (await self.aembed_documents([text]))[0]
+
+
+def test_concurrent_texts_are_coalesced_into_one_batch():
+    memo = EmbeddingMemo()
+    service = FakeEmbeddingService()
+
+    async def run():
+        return await asyncio.gather(
+            memo.aembed_query(service, "question"),
+            memo.aembed_documents(service, ["entity keywords", "question"]),
+            memo.aembed_documents(service, ["relation keywords"]),
+        )
+
+    query, documents, relations = asyncio.run(run())
+
+    assert query == [8.0]
+    assert documents == [[15.0], [8.0]]
+    assert relations == [[17.0]]
+    assert service.batches == [["question", "entity keywords", "relation keywords"]]
+    assert memo.get_stats()["hits"] == 1
+
+
+def test_repeated_texts_are_embedded_once_per_model():
+    memo = EmbeddingMemo()
+    small, large = FakeEmbeddingService("small"), FakeEmbeddingService("large")
+
+    async def run():
+        await memo.aembed_query(small, "question")
+        await memo.aembed_query(small, "question")
+        await memo.aembed_query(large, "question")
+
+    asyncio.run(run())
+    assert small.batches == [["question"]]
+    assert large.batches == [["question"]]
+
+
+def test_failed_embeddings_are_retried_by_the_next_caller():
+    memo = EmbeddingMemo()
+    service = FakeEmbeddingService(fail=True)
+
+    async def run():
+        with pytest.raises(EmbeddingError):
+            await memo.aembed_query(service, "question")
+        service.fail = False
+        return await memo.aembed_query(service, "question")
+
+    assert asyncio.run(run()) == [8.0]
+    assert len(service.batches) == 2
+
+    with pytest.raises(EmptyTextError):
+        asyncio.run(memo.aembed_query(service, "  "))
+
+
+def test_helpers_use_the_current_memo_only_when_set():
+    service = FakeEmbeddingService()
+
+    async def run():
+        await aembed_query(service, "question")
+        await aembed_query(service, "question")
+        token = set_embedding_memo(EmbeddingMemo())
+        try:
+            await aembed_documents(service, ["question"])
+            await aembed_documents(service, ["question"])
+        finally:
+            reset_embedding_memo(token)
+
+    asyncio.run(run())
+    # Two direct calls without a memo, one through it
+    assert len(service.batches) == 3
+
+
+def test_flow_execution_shares_its_memo_with_every_node(monkeypatch):
+    engine = FlowEngine()
+    seen = []
+
+    async def run():
+        async def execute_node_group(flow, node_group):
+            seen.append(get_embedding_memo())
+
+        monkeypatch.setattr(engine, "_execute_node_group", execute_node_group)
+        monkeypatch.setattr(engine, "_topological_sort", lambda flow: ["start"])
+        monkeypatch.setattr(engine, "_find_parallel_groups", lambda flow, nodes: [{"start"}])
+        flow = type("Flow", (), {"name": "flow"})()
+        await engine.execute_flow(flow, {"query": "question", "user": "user"})
+        return get_embedding_memo()
+
+    assert asyncio.run(run()) is None
+    assert seen == [engine.embedding_memo]
+    sys_input = SystemInput(**engine.context.global_variables, embedding_memo=engine.embedding_memo)
+    assert sys_input.embedding_memo is engine.embedding_memo
@@ -0,0 +1,125 @@
+"""
+Unit tests for the keyword extraction shared by graph and fulltext search.
+"""
+
+import asyncio
+
+from aperag.db import redis_manager
+from aperag.llm.keyword_extraction import QueryKeywordCache, build_keywords_prompt, parse_keywords_response
+
+
+class CountingExtractor:
+    def __init__(self, keywords=(["theme"], ["entity"])):
+        self.keywords = keywords
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.keywords
+
+
+def test_repeated_question_is_extracted_once():
+    cache = QueryKeywordCache(use_redis=False)
+    extract = CountingExtractor()
+
+    async def run():
+        first = await cache.get_or_extract("What is  ApeRAG?", "", "English", "openai/gpt", extract)
+        second = await cache.get_or_extract("what is aperag?", "", "English", "openai/gpt", extract)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == (["theme"], ["entity"])
+    assert extract.calls == 1
+
+
+def test_retrievers_with_different_models_share_one_call():
+    cache = QueryKeywordCache(use_redis=False)
+    graph, fulltext = CountingExtractor(), CountingExtractor()
+
+    async def run():
+        return await asyncio.gather(
+            cache.get_or_extract("question", "", "English", "openai/gpt", graph),
+            cache.get_or_extract("question", "", "English", "openai/mini", fulltext),
+        )
+
+    results = asyncio.run(run())
+    assert results[0] == results[1]
+    assert graph.calls + fulltext.calls == 1
+
+
+def test_history_and_language_are_part_of_the_key():
+    cache = QueryKeywordCache(use_redis=False)
+    extract = CountingExtractor()
+
+    async def run():
+        await cache.get_or_extract("question", "", "English", "m", extract)
+        await cache.get_or_extract("question", "user: earlier turn", "English", "m", extract)
+        await cache.get_or_extract("question", "", "simplified chinese", "m", extract)
+
+    asyncio.run(run())
+    assert extract.calls == 3
+
+
+def test_empty_results_are_not_cached():
+    cache = QueryKeywordCache(use_redis=False)
+    extract = CountingExtractor(keywords=([], []))
+
+    async def run():
+        for _ in range(2):
+            await cache.get_or_extract("question", "", "English", "m", extract)
+
+    asyncio.run(run())
+    assert extract.calls == 2
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        self.redis.data.update(self.commands)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+def test_keywords_are_shared_through_redis(monkeypatch):
+    redis = FakeRedis()
+
+    async def get_async_redis_client():
+        return redis
+
+    monkeypatch.setattr(redis_manager, "get_async_redis_client", get_async_redis_client)
+    extract = CountingExtractor()
+
+    async def run():
+        # Two processes, each with its own in-process cache
+        await QueryKeywordCache().get_or_extract("question", "", "English", "m", extract)
+        return await QueryKeywordCache().get_or_extract("question", "", "English", "other", extract)
+
+    assert asyncio.run(run()) == (["theme"], ["entity"])
+    assert extract.calls == 1
+    assert len(redis.data) == 2
+
+
+def test_prompt_and_response_parsing():
+    prompt = build_keywords_prompt("How does trade work?", "English", history="user: hi")
+    assert "Current Query: How does trade work?" in prompt
+    assert "user: hi" in prompt
+
+    response = 'Output:\n{"high_level_keywords": ["trade"], "low_level_keywords": ["tariff"]}'
+    assert parse_keywords_response(response) == (["trade"], ["tariff"])
+    assert parse_keywords_response("no json here") == ([], [])
@@ -0,0 +1,124 @@
+"""
+Unit tests for the provider configuration cache used on the query path.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from aperag.llm import provider_cache as provider_cache_module
+from aperag.llm.provider_cache import ProviderConfigCache
+
+
+class FakeDbOps:
+    def __init__(self):
+        self.calls = []
+        self.api_keys = {"openai": "sk-1"}
+
+    def query_provider_api_key(self, provider_name, user_id=None, need_public=True):
+        self.calls.append(("api_key", provider_name, user_id))
+        return self.api_keys.get(provider_name)
+
+    def query_llm_provider_by_name(self, name):
+        self.calls.append(("provider", name))
+        return SimpleNamespace(name=name, base_url="http://llm")
+
+    def query_llm_provider_model(self, provider_name, api, model):
+        self.calls.append(("model", provider_name, api, model))
+        return None
+
+
+class FakeAsyncDbOps:
+    def __init__(self, db_ops):
+        self.db_ops = db_ops
+
+    async def query_provider_api_key(self, *args):
+        await asyncio.sleep(0)
+        return self.db_ops.query_provider_api_key(*args)
+
+    async def query_llm_provider_by_name(self, name):
+        return self.db_ops.query_llm_provider_by_name(name)
+
+    async def query_llm_provider_model(self, *args):
+        return self.db_ops.query_llm_provider_model(*args)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db_ops = FakeDbOps()
+    monkeypatch.setattr(provider_cache_module, "db_ops", db_ops)
+    monkeypatch.setattr(provider_cache_module, "async_db_ops", FakeAsyncDbOps(db_ops))
+    return db_ops
+
+
+def test_lookups_are_cached_including_misses(db):
+    cache = ProviderConfigCache()
+
+    for _ in range(3):
+        assert cache.get_api_key("openai", "user") == "sk-1"
+        assert cache.get_api_key("missing", "user") is None
+        assert cache.get_provider_model("openai", "completion", "gpt") is None
+
+    assert len(db.calls) == 3
+
+
+def test_sync_and_async_lookups_share_entries(db):
+    cache = ProviderConfigCache()
+
+    provider = asyncio.run(cache.aget_provider("openai"))
+    assert cache.get_provider("openai") is provider
+    assert db.calls == [("provider", "openai")]
+
+
+def test_entries_expire_after_ttl(db, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(provider_cache_module.time, "monotonic", lambda: now[0])
+    cache = ProviderConfigCache(ttl=10)
+
+    cache.get_provider("openai")
+    now[0] += 5
+    cache.get_provider("openai")
+    now[0] += 10
+    cache.get_provider("openai")
+
+    assert len(db.calls) == 2
+
+
+def test_invalidate_drops_lookups_and_services(db):
+    cache = ProviderConfigCache()
+    cache.get_api_key("openai", "user")
+    service = cache.get_service(("completion", "openai"), object)
+    assert cache.get_service(("completion", "openai"), object) is service
+
+    db.api_keys["openai"] = "sk-2"
+    cache.invalidate()
+
+    assert cache.get_api_key("openai", "user") == "sk-2"
+    assert cache.get_service(("completion", "openai")) is None
+
+
+def test_value_loaded_across_a_write_is_not_cached(db):
+    cache = ProviderConfigCache()
+
+    async def run():
+        # The write lands while the lookup is waiting for the database
+        lookup = asyncio.ensure_future(cache.aget_api_key("openai", "user"))
+        await asyncio.sleep(0)
+        db.api_keys["openai"] = "sk-2"
+        cache.invalidate()
+        await lookup
+        return await cache.aget_api_key("openai", "user")
+
+    assert asyncio.run(run()) == "sk-2"
+
+
+def test_service_cache_is_bounded():
+    cache = ProviderConfigCache(max_entries=2)
+    first = cache.get_service(("a",), object)
+    cache.get_service(("b",), object)
+    cache.get_service(("a",))
+    cache.get_service(("c",), object)
+
+    assert cache.get_service(("a",)) is first
+    assert cache.get_service(("b",)) is None
@@ -0,0 +1,165 @@
+"""
+Unit tests for the batched background writer of AuditService.
+"""
+
+import asyncio
+import json
+
+from aperag.service.audit_service import AuditService
+
+
+class RecordingAuditService(AuditService):
+    def __init__(self, insert_delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.insert_delay = insert_delay
+        self.batches = []
+
+    async def _insert_rows(self, rows):
+        await asyncio.sleep(self.insert_delay)
+        self.batches.append(rows)
+
+
+async def log(service, path, status_code=200, request_data=None):
+    await service.log_audit(
+        user_id="user",
+        username="alice",
+        resource_type="collection",
+        api_name="update",
+        http_method="PUT",
+        path=path,
+        status_code=status_code,
+        start_time=0,
+        end_time=1,
+        request_data=request_data,
+    )
+
+
+def test_entries_are_written_in_batches_by_size():
+    service = RecordingAuditService(batch_size=3, flush_interval=10)
+
+    async def run():
+        service.start()
+        for i in range(7):
+            await log(service, f"/p{i}")
+        await service.shutdown()
+
+    asyncio.run(run())
+
+    assert [len(batch) for batch in service.batches] == [3, 3, 1]
+    assert [row["path"] for batch in service.batches for row in batch] == [f"/p{i}" for i in range(7)]
+
+
+def test_partial_batch_is_written_after_flush_interval():
+    service = RecordingAuditService(batch_size=100, flush_interval=0.05)
+
+    async def run():
+        service.start()
+        await log(service, "/a")
+        await asyncio.sleep(0.2)
+        written = list(service.batches)
+        await service.shutdown()
+        return written
+
+    written = asyncio.run(run())
+    assert [[row["path"] for row in batch] for batch in written] == [["/a"]]
+
+
+def test_payloads_are_serialized_and_filtered_by_the_writer():
+    service = RecordingAuditService()
+
+    async def run():
+        await log(service, "/a", request_data={"name": "c", "api_key": "sk-123"})
+        await service.shutdown()
+
+    asyncio.run(run())
+
+    [[row]] = service.batches
+    assert json.loads(row["request_data"]) == {"name": "c", "api_key": "***FILTERED***"}
+    assert row["response_data"] is None
+    assert row["id"] and row["request_id"] and row["gmt_created"]
+
+
+def test_full_queue_drops_successful_calls_and_keeps_failures():
+    service = RecordingAuditService(insert_delay=0.05, max_queue_size=2, batch_size=1, flush_interval=0)
+
+    async def run():
+        service.start()
+        for i in range(5):
+            await log(service, f"/ok{i}")
+        await log(service, "/failed", status_code=500)
+        await service.shutdown()
+
+    asyncio.run(run())
+
+    paths = [row["path"] for batch in service.batches for row in batch]
+    assert service.dropped == 3
+    # The failed call waited for the writer to make room
+    assert paths == ["/ok0", "/ok1", "/failed"]
+
+
+def test_entries_after_shutdown_are_written_directly():
+    service = RecordingAuditService()
+
+    async def run():
+        service.start()
+        await service.shutdown()
+        await log(service, "/late")
+
+    asyncio.run(run())
+    assert [[row["path"] for row in batch] for batch in service.batches] == [["/late"]]
+
+
+def test_long_client_values_are_cut_to_their_column_length():
+    service = RecordingAuditService()
+
+    async def run():
+        await service.log_audit(
+            user_id="user",
+            username="alice",
+            resource_type="collection",
+            api_name="update",
+            http_method="PUT",
+            path="/" + "p" * 1000,
+            status_code=200,
+            start_time=0,
+            ip_address="1" * 100,
+            user_agent="agent " * 200,
+        )
+        await service.shutdown()
+
+    asyncio.run(run())
+
+    [[row]] = service.batches
+    assert len(row["path"]) == 512
+    assert len(row["ip_address"]) == 45
+    assert len(row["user_agent"]) == 500
+    assert row["username"] == "alice"
+
+
+class FailingRowAuditService(RecordingAuditService):
+    """Rejects every insert that contains the path /bad"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.attempts = []
+
+    async def _insert_rows(self, rows):
+        self.attempts.append([row["path"] for row in rows])
+        if any(row["path"] == "/bad" for row in rows):
+            raise ValueError("value too long")
+        await super()._insert_rows(rows)
+
+
+def test_failed_batch_is_retried_row_by_row():
+    service = FailingRowAuditService(batch_size=3, flush_interval=10)
+
+    async def run():
+        service.start()
+        for path in ("/a", "/bad", "/b"):
+            await log(service, path)
+        await service.shutdown()
+
+    asyncio.run(run())
+
+    assert service.attempts == [["/a", "/bad", "/b"], ["/a"], ["/bad"], ["/b"]]
+    assert [[row["path"] for row in batch] for batch in service.batches] == [["/a"], ["/b"]]
@@ -0,0 +1,113 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from aperag.config import settings
+from aperag.docparser.base import AssetBinPart, AssetRefPart, TextPart, TitlePart
+from aperag.tasks import parsed_data_store
+from aperag.tasks.models import LocalDocumentInfo, ParsedDocumentData
+from aperag.tasks.parsed_data_store import load_parsed_data, save_parsed_data
+
+
+def make_parsed_data(text="Run the installer. " * 200):
+    return ParsedDocumentData(
+        document_id="doc1",
+        collection_id="col1",
+        content=text,
+        doc_parts=[
+            TitlePart(content="# Manual", level=1, metadata={"titles": ["Manual"]}),
+            TextPart(content=text, metadata={"md_source_map": [1, 9]}),
+            AssetBinPart(asset_id="file.png", data=b"\x89PNG\x00\xff", mime_type="image/png", metadata={}),
+            AssetRefPart(asset_id="page_0.png", path="user-u/col1/doc1/assets/page_0.png", mime_type="image/png"),
+        ],
+        file_path="/tmp/manual.md",
+        local_doc_info=LocalDocumentInfo(path="/tmp/manual.md", is_temp=True),
+        chunk_artifact_path="user-u/col1/doc1/chunks/abc.json",
+    )
+
+
+@pytest.fixture(autouse=True)
+def local_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "parsed_data_cache_dir", str(tmp_path / "parsed_data_cache"))
+
+
+def test_handle_is_small_and_roundtrips(object_store):
+    parsed_data = make_parsed_data()
+    handle = save_parsed_data(parsed_data, "user-u/col1/doc1")
+
+    assert handle["parsed_data_path"].startswith("user-u/col1/doc1/parsed/")
+    assert len(str(handle)) < 300
+    assert handle["size"] < len(parsed_data.content)
+
+    loaded = load_parsed_data(handle)
+    assert loaded.to_dict() == ParsedDocumentData.from_dict(parsed_data.to_dict()).to_dict()
+    assert loaded.doc_parts[2].data == b"\x89PNG\x00\xff"
+    assert loaded.doc_parts[3].path == "user-u/col1/doc1/assets/page_0.png"
+    assert loaded.chunk_artifact_path == "user-u/col1/doc1/chunks/abc.json"
+
+
+def test_load_uses_local_cache(object_store, monkeypatch):
+    handle = save_parsed_data(make_parsed_data(), "user-u/col1/doc1")
+    monkeypatch.setattr("aperag.objectstore.base.get_object_store", lambda: None)
+    assert load_parsed_data(handle).document_id == "doc1"
+
+
+def test_load_downloads_when_cache_is_missing(object_store):
+    handle = save_parsed_data(make_parsed_data(), "user-u/col1/doc1")
+    cache_file = os.path.join(settings.parsed_data_cache_dir, "doc1", f"{handle['digest']}.json.zst")
+    os.remove(cache_file)
+
+    assert load_parsed_data(handle).content == make_parsed_data().content
+    assert os.path.exists(cache_file)
+
+
+def test_new_version_replaces_old_one(object_store):
+    old = save_parsed_data(make_parsed_data("old text"), "user-u/col1/doc1")
+    new = save_parsed_data(make_parsed_data("new text"), "user-u/col1/doc1")
+
+    assert old["digest"] != new["digest"]
+    assert not object_store.obj_exists(old["parsed_data_path"])
+    assert os.listdir(os.path.join(settings.parsed_data_cache_dir, "doc1")) == [f"{new['digest']}.json.zst"]
+
+
+def test_local_cache_size_is_bounded(object_store, monkeypatch):
+    monkeypatch.setattr(settings, "parsed_data_cache_max_bytes", 1)
+    handle = save_parsed_data(make_parsed_data(), "user-u/col1/doc1")
+    assert parsed_data_store._read_local_cache("doc1", handle["digest"]) is None
+    assert load_parsed_data(handle).document_id == "doc1"
+
+
+def test_concurrent_writers_of_one_document_do_not_share_a_temp_file(object_store, caplog):
+    data = parsed_data_store.encode_parsed_data(make_parsed_data())
+    digest = parsed_data_store.hashlib.sha256(data).hexdigest()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: parsed_data_store._write_local_cache("doc1", digest, data), range(64)))
+
+    assert "Failed to write local parsed data cache" not in caplog.text
+    assert os.listdir(os.path.join(settings.parsed_data_cache_dir, "doc1")) == [f"{digest}.json.zst"]
+    assert parsed_data_store._read_local_cache("doc1", digest) == data
+
+
+def test_local_cache_is_scanned_only_when_the_estimate_requires_it(object_store, monkeypatch):
+    scans = []
+    prune = parsed_data_store._prune_local_cache
+    monkeypatch.setattr(parsed_data_store, "_prune_local_cache", lambda: scans.append(1) or prune())
+    monkeypatch.setattr(parsed_data_store, "LOCAL_CACHE_SCAN_INTERVAL", 1000)
+    data = parsed_data_store.encode_parsed_data(make_parsed_data())
+
+    for i in range(50):
+        parsed_data_store._write_local_cache(f"doc{i}", f"digest{i}", data)
+    # Only the first write scans, to learn the size of what is already cached
+    assert len(scans) == 1
+
+    monkeypatch.setattr(settings, "parsed_data_cache_max_bytes", 10 * len(data))
+    parsed_data_store._write_local_cache("doc50", "digest50", data)
+    assert len(scans) == 2
+    assert sum(len(files) for _, _, files in os.walk(settings.parsed_data_cache_dir)) <= 10
+
+
+def test_legacy_dict_is_accepted(object_store):
+    parsed_data = make_parsed_data()
+    assert load_parsed_data(parsed_data.to_dict()).content == parsed_data.content
@@ -0,0 +1,122 @@
+"""
+Unit tests for the windowed and cached reads of RedisChatMessageHistory.
+"""
+
+import asyncio
+
+import pytest
+
+from aperag.utils.history import RedisChatMessageHistory, decoded_history_cache
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def llen(self, key):
+        self.commands.append(lambda: len(self.redis.lists.get(key, [])))
+        return self
+
+    def lindex(self, key, index):
+        def run():
+            items = self.redis.lists.get(key, [])
+            return items[index] if -len(items) <= index < len(items) else None
+
+        self.commands.append(run)
+        return self
+
+    async def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.lists = {}
+        self.fetched = 0
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value.encode("utf-8"))
+
+    async def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        items = items[start:] if end == -1 else items[start : end + 1]
+        self.fetched += len(items)
+        return items
+
+    async def delete(self, key):
+        self.lists.pop(key, None)
+
+
+@pytest.fixture
+def history():
+    decoded_history_cache._data.clear()
+    history = RedisChatMessageHistory("chat-1", redis_client=FakeRedis())
+
+    async def fill():
+        for i in range(50):
+            await history.add_user_message(f"question {i}", f"q{i}", files=[])
+
+    asyncio.run(fill())
+    return history
+
+
+def contents(messages):
+    return [m.get_main_content() for m in messages]
+
+
+def test_recent_messages_reads_only_the_window(history):
+    messages = asyncio.run(history.recent_messages(limit=4))
+
+    assert contents(messages) == [f"question {i}" for i in range(46, 50)]
+    assert history.redis_client.fetched == 4
+
+
+def test_repeated_reads_are_served_from_cache(history):
+    async def run():
+        first = await history.recent_messages(limit=10)
+        second = await history.recent_messages(limit=5)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert contents(second) == contents(first)[-5:]
+    assert history.redis_client.fetched == 10
+
+
+def test_write_from_another_process_invalidates_cache(history):
+    async def run():
+        await history.recent_messages(limit=3)
+        # Bypass the history object, as a writer in another process would
+        other = RedisChatMessageHistory("chat-1", redis_client=FakeRedis())
+        await other.add_user_message("new question", "q-new", files=[])
+        await history.redis_client.lpush(history.key, other.redis_client.lists[other.key][0].decode("utf-8"))
+        return await history.recent_messages(limit=3)
+
+    messages = asyncio.run(run())
+    assert contents(messages) == ["question 48", "question 49", "new question"]
+
+
+def test_token_budget_keeps_newest_messages(history):
+    def tokenizer(text):
+        return text.split()
+
+    # Every message is two tokens
+    messages = asyncio.run(history.recent_messages(max_tokens=41, tokenizer=tokenizer))
+
+    assert contents(messages) == [f"question {i}" for i in range(30, 50)]
+    # The budget was filled by growing the window, not by reading the whole list
+    assert history.redis_client.fetched < 50
+
+
+def test_full_history_and_clear(history):
+    async def run():
+        all_messages = await history.messages
+        await history.clear()
+        return all_messages, await history.messages
+
+    all_messages, cleared = asyncio.run(run())
+    assert contents(all_messages) == [f"question {i}" for i in range(50)]
+    assert cleared == []
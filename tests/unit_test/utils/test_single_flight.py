@@ -0,0 +1,40 @@
+"""
+Unit tests for the single-flight future helpers.
+"""
+
+import asyncio
+
+import pytest
+
+from aperag.utils.single_flight import fail_future
+
+
+def test_waiters_get_the_error_of_the_caller_doing_the_work():
+    async def run():
+        future = asyncio.get_running_loop().create_future()
+        waiter = asyncio.ensure_future(asyncio.shield(future))
+        await asyncio.sleep(0)
+        fail_future(future, ValueError("llm down"))
+        with pytest.raises(ValueError, match="llm down"):
+            await waiter
+
+    asyncio.run(run())
+
+
+def test_cancellation_cancels_the_waiters():
+    async def run():
+        future = asyncio.get_running_loop().create_future()
+        fail_future(future, asyncio.CancelledError())
+        assert future.cancelled()
+
+    asyncio.run(run())
+
+
+def test_finished_future_is_left_alone():
+    async def run():
+        future = asyncio.get_running_loop().create_future()
+        future.set_result("keywords")
+        fail_future(future, ValueError("late failure"))
+        assert future.result() == "keywords"
+
+    asyncio.run(run())